@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
+
+from bersama import SharedDataset, current_segment
+from grafik import FigureCache
+from metrik import cache_miss, instrument_page, span
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -10,32 +12,21 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Cache data dengan TTL untuk optimasi performa
-@st.cache_data(ttl=600, show_spinner=False)
+# Dataset bersama (memory-mapped) per versi data; replika di host yang sama berbagi satu salinan
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_shared_dataset(segment):
+    cache_miss("load_dataset")
+    return SharedDataset.attach(segment)
+
 def load_dataset():
     """Memuat dan memproses data penelitian stunting"""
     try:
-        data = pd.read_excel("penelitian_bersih.xlsx")
-        
-        # Normalisasi kolom
-        data.columns = [col.lower().replace(' ', '_') for col in data.columns]
+        # Jabat tangan versi setiap rerun: segmen berganti begitu data diperbarui
+        data, report = load_shared_dataset(current_segment()).select()
         
-        # Preprocessing risiko stunting
-        if 'risiko_stunting' in data.columns:
-            data['risiko_stunting'] = data['risiko_stunting'].fillna('Tidak Diketahui')
-            data['risiko_stunting'] = data['risiko_stunting'].astype(str).str.strip()
-            
-            # Mapping berbagai format ke standar
-            risk_mapping = {
-                '1': 'Berisiko', '0': 'Tidak Berisiko',
-                'true': 'Berisiko', 'false': 'Tidak Berisiko',
-                'ya': 'Berisiko', 'tidak': 'Tidak Berisiko',
-                'yes': 'Berisiko', 'no': 'Tidak Berisiko',
-                'tinggi': 'Berisiko', 'rendah': 'Tidak Berisiko'
-            }
-            
-            data['risiko_stunting'] = data['risiko_stunting'].str.lower().map(risk_mapping).fillna(data['risiko_stunting'])
-            data['risiko_stunting'] = data['risiko_stunting'].str.title()
+        bad_rows = len(report['bad_rows'])
+        if bad_rows:
+            st.warning(f"{bad_rows:,} dari {report['rows']:,} baris memiliki data tidak valid atau kosong.")
         
         return data
     
@@ -113,10 +104,15 @@ def display_metrics(stats):
             </div>
         """, unsafe_allow_html=True)
 
-def display_bar_chart(stats):
-    """Menampilkan diagram batang distribusi risiko stunting"""
-    st.markdown("### Distribusi Risiko Stunting")
-    
+@st.cache_resource(show_spinner=False)
+def load_figure_cache():
+    """Cache spesifikasi figur bersama untuk semua sesi"""
+    return FigureCache()
+
+def bar_chart_figure(stats):
+    """Membangun diagram batang distribusi risiko stunting"""
+    import plotly.express as px
+
     # Persiapkan data untuk chart
     chart_data = pd.DataFrame({
         'Kategori': ['Tidak Berisiko', 'Berisiko'],
@@ -160,25 +156,42 @@ def display_bar_chart(stats):
     
     fig.update_xaxes(showgrid=False)
     fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
-    
+    return fig
+
+def display_bar_chart(stats):
+    """Menampilkan diagram batang distribusi risiko stunting"""
+    st.markdown("### Distribusi Risiko Stunting")
+
+    # Figur hanya bergantung pada tiga angka ini, sehingga angka yang sama memakai spesifikasi tersimpan
+    key = ("home_bar", int(stats['total']), int(stats['high_risk']), int(stats['low_risk']))
+
+    def build():
+        cache_miss("figure_cache")
+        return bar_chart_figure(stats)
+
+    fig = load_figure_cache().figure(key, build)
     st.plotly_chart(fig, use_container_width=True)
 
 # Eksekusi aplikasi utama
+@instrument_page("Home")
 def main():
     display_header()
     
     # Load dan proses data
-    with st.spinner('Memuat dataset...'):
+    with st.spinner('Memuat dataset...'), span("load_dataset", cache="load_dataset"):
         dataset = load_dataset()
     
     # Hitung statistik
-    statistics = calculate_statistics(dataset)
+    with span("calculate_statistics"):
+        statistics = calculate_statistics(dataset)
     
     # Tampilkan metrik
-    display_metrics(statistics)
+    with span("display_metrics"):
+        display_metrics(statistics)
     
     # Tampilkan diagram batang
-    display_bar_chart(statistics)
+    with span("display_bar_chart", cache="figure_cache"):
+        display_bar_chart(statistics)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
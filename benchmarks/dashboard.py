@@ -0,0 +1,309 @@
+"""Benchmark jalur data dashboard pada data sintetis berbagai ukuran.
+
+Contoh:
+    python benchmarks/dashboard.py
+    python benchmarks/dashboard.py --sizes 10000 100000 --repeat 3
+    python benchmarks/dashboard.py --sizes 1000000 --no-memory
+
+Untuk setiap ukuran, data sintetis ditulis ke store terpartisi sementara lalu
+fungsi-fungsi berikut dijalankan di luar Streamlit (``st.*`` diganti tiruan,
+sehingga setiap panggilan adalah cache miss):
+
+- ``bersama.publish`` (baca store + normalisasi + tulis segmen bersama)
+- ``Home.load_dataset`` (hanya memetakan segmen yang sudah diterbitkan ke memori)
+- ``Home.calculate_statistics``
+- ``CountCube.from_frame`` (kubus yang melayani halaman visualisasi)
+- ``visualisasi.generate_map`` (peta dasar dan layer viewport seluruh wilayah, termasuk render HTML)
+- ``DensityGrid.from_frame``, ``PointIndex.from_frame`` dan ``visualisasi.viewport_layer`` untuk viewport padat
+  (zoom ``POINT_MIN_ZOOM``, sekitar 500 m di pusat data, dengan layer kepadatan)
+- ``visualisasi.create_distribution_charts``
+- tabel ringkasan (``view.summary()`` + kolom Total dan pengurutan)
+
+Waktu (terbaik dari ``--repeat`` kali) dan memori dicatat ke ``benchmarks/history.json``
+bersama commit git, lalu dibandingkan dengan entri sebelumnya agar regresi antar commit
+terlihat. Memori diukur pada eksekusi terpisah: ``peak_mb`` adalah puncak heap Python
+(tracemalloc), yang tidak melihat buffer Arrow/Parquet maupun halaman mmap. Karena itu
+dicatat juga ``rss_mb`` (puncak RSS selama tahap di atas RSS awal; di Linux puncak
+diatur ulang lewat ``/proc/self/clear_refs``, di sistem lain hanya kenaikan
+``ru_maxrss``) dan ``arrow_mb`` (kenaikan ``pyarrow.total_allocated_bytes()``, memori
+Arrow yang masih dipegang setelah tahap).
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stub_streamlit  # noqa: E402
+
+HISTORY_PATH = os.path.join(ROOT, "benchmarks", "history.json")
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# Tahun gelombang data sintetis (satu partisi per tahun)
+SYNTHETIC_YEARS = (2021, 2022, 2023, 2024)
+
+# Ambang perubahan waktu yang ditandai sebagai regresi saat membandingkan run
+REGRESSION_RATIO = 1.2
+
+
+def prepare_store(n_rows, directory):
+    """Menulis data sintetis (``sintetis.py``) ke store terpartisi di ``directory``"""
+    from partisi import STORE_PATH, ingest
+    from sintetis import write_dataset
+
+    source = os.path.join(directory, "sintetis.parquet")
+    write_dataset(source, n_rows, chunk_size=1_000_000, years=SYNTHETIC_YEARS)
+    ingest(source, store_path=os.path.join(directory, STORE_PATH))
+    os.remove(source)
+
+
+def load_pages():
+    """Meng-import Home dan halaman visualisasi dengan streamlit tiruan"""
+    stub_streamlit.install()
+    # Segmen bersama selalu ditulis relatif ke direktori sementara run, bukan ke STUNTING_SHARED_PATH asli
+    os.environ["STUNTING_SHARED_PATH"] = "data_bersama"
+    import Home
+
+    spec = importlib.util.spec_from_file_location("visualisasi", os.path.join(ROOT, "pages", "visualisasi.py"))
+    visualisasi = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(visualisasi)
+
+    # Library yang dimuat malas oleh halaman di-import di sini agar waktu tahap tidak
+    # ikut menghitung biaya import (diukur terpisah oleh benchmarks/startup.py)
+    import folium  # noqa: F401
+    import plotly.express  # noqa: F401
+    return Home, visualisasi
+
+
+def summary_table(view):
+    """Tabel ringkasan seperti di halaman visualisasi"""
+    summary_df = view.summary()
+    summary_df["Total"] = summary_df.get("Berisiko", 0) + summary_df.get("Tidak Berisiko", 0)
+    return summary_df.sort_values("Total", ascending=False)
+
+
+def render_map(visualisasi, view):
+    map_obj = visualisasi.generate_map(view)
+    if map_obj is not None:
+        visualisasi.viewport_layer(visualisasi.viewport_content(view, {})).add_to(map_obj)
+        map_obj.get_root().render()
+    return map_obj
+
+
+def dense_viewport(visualisasi, state):
+    """Layer viewport ~500 m di pusat data pada zoom drill-down"""
+    from spasial import POINT_MIN_ZOOM
+
+    center = state["view"].center()
+    if center is None:
+        return None
+    half = 0.0025
+    bounds = ((center[0] - half, center[1] - half), (center[0] + half, center[1] + half))
+    content = visualisasi.viewport_content(
+        state["view"], {}, bounds=bounds, zoom=POINT_MIN_ZOOM, grid=state["grid"], points=state["points"]
+    )
+    map_obj = visualisasi.generate_map(state["view"])
+    visualisasi.viewport_layer(content).add_to(map_obj)
+    return map_obj.get_root().render()
+
+
+def publish_segment(shared_path):
+    """Menerbitkan ulang segmen bersama dari awal (segmen lama dihapus dulu)"""
+    from bersama import publish
+
+    shutil.rmtree(shared_path, ignore_errors=True)
+    return publish(shared_path=shared_path)
+
+
+def stages(home, visualisasi):
+    """Daftar (nama, fungsi(state)) yang dijalankan berurutan; hasil disimpan di state"""
+    from bersama import SHARED_PATH
+    from kubus import CountCube
+    from spasial import DensityGrid, PointIndex
+
+    return [
+        ("bersama.publish", lambda state: publish_segment(SHARED_PATH)),
+        ("Home.load_dataset (attach)", lambda state: state.update(df=home.load_dataset())),
+        ("Home.calculate_statistics", lambda state: home.calculate_statistics(state["df"])),
+        ("CountCube.from_frame", lambda state: state.update(view=CountCube.from_frame(state["df"]).select())),
+        ("visualisasi.generate_map", lambda state: render_map(visualisasi, state["view"])),
+        ("DensityGrid.from_frame", lambda state: state.update(grid=DensityGrid.from_frame(state["df"]))),
+        ("PointIndex.from_frame", lambda state: state.update(points=PointIndex.from_frame(state["df"]))),
+        ("visualisasi.viewport_layer", lambda state: dense_viewport(visualisasi, state)),
+        ("visualisasi.create_distribution_charts",
+         lambda state: visualisasi.create_distribution_charts(state["view"])),
+        ("summary_table", lambda state: summary_table(state["view"])),
+    ]
+
+
+def proc_status_mb(field):
+    """Nilai ``field`` (mis. VmRSS, VmHWM) dari /proc/self/status dalam MB; None di luar Linux"""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Mengatur ulang puncak RSS (VmHWM) proses; False jika tidak didukung"""
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def max_rss_mb():
+    # ru_maxrss dalam KB di Linux, dalam byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if sys.platform == "darwin" else rss / 2 ** 10
+
+
+def measure_memory_usage(func, state):
+    """Menjalankan ``func`` sekali dan mengukur heap Python, puncak RSS, dan alokasi Arrow"""
+    import pyarrow as pa
+
+    if reset_peak_rss():
+        rss_before = proc_status_mb("VmRSS")
+        peak_rss = lambda: proc_status_mb("VmHWM")  # noqa: E731
+    else:
+        # Tanpa reset, hanya kenaikan puncak RSS seumur proses yang terlihat (batas bawah)
+        rss_before = max_rss_mb()
+        peak_rss = max_rss_mb
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    func(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_mb": peak / 2 ** 20,
+        "rss_mb": peak_rss() - rss_before,
+        "arrow_mb": (pa.total_allocated_bytes() - arrow_before) / 2 ** 20,
+    }
+
+
+def run_size(n_rows, home, visualisasi, repeat=1, measure_memory=True):
+    """Menjalankan semua tahap untuk satu ukuran data; mengembalikan {tahap: hasil}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        prepare_store(n_rows, directory)
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            state = {}
+            for name, func in stages(home, visualisasi):
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    func(state)
+                    timings.append(time.perf_counter() - start)
+                result = {"seconds": min(timings)}
+
+                if measure_memory:
+                    result.update(measure_memory_usage(func, state))
+                results[name] = result
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=HISTORY_PATH):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+def append_history(entry, path=HISTORY_PATH):
+    history = load_history(path)
+    history.append(entry)
+    with open(path, "w") as file:
+        json.dump(history, file, indent=2)
+    return history
+
+
+def previous_result(history, size, stage):
+    """Hasil terakhir sebelum run ini untuk ukuran dan tahap yang sama"""
+    for entry in reversed(history[:-1]):
+        result = entry["results"].get(str(size), {}).get(stage)
+        if result is not None:
+            return entry["commit"], result
+    return None, None
+
+
+def print_report(entry, history):
+    for size, results in entry["results"].items():
+        print(f"\n{int(size):,} baris")
+        for stage, result in results.items():
+            line = f"  {stage:<42} {result['seconds']:>9.3f} s"
+            if "peak_mb" in result:
+                line += f" {result['peak_mb']:>10.1f} MB"
+            if "rss_mb" in result:
+                line += f" {result['rss_mb']:>9.1f} MB RSS {result['arrow_mb']:>+8.1f} MB Arrow"
+            commit, previous = previous_result(history, size, stage)
+            if previous is not None and previous["seconds"] > 0:
+                ratio = result["seconds"] / previous["seconds"]
+                flag = "  REGRESI" if ratio > REGRESSION_RATIO else ""
+                line += f"  ({ratio:.2f}x vs {commit}){flag}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jalur data dashboard")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Jumlah baris per run")
+    parser.add_argument("--repeat", type=int, default=1, help="Ulangan per tahap (diambil yang tercepat)")
+    parser.add_argument("--no-memory", action="store_true", help="Lewati pengukuran puncak memori")
+    parser.add_argument("--history", default=HISTORY_PATH, help="File riwayat JSON")
+    args = parser.parse_args()
+
+    home, visualisasi = load_pages()
+    entry = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": {},
+    }
+    for n_rows in args.sizes:
+        entry["results"][str(n_rows)] = run_size(
+            n_rows, home, visualisasi, repeat=args.repeat, measure_memory=not args.no_memory
+        )
+
+    history = append_history(entry, args.history)
+    print_report(entry, history)
+
+
+if __name__ == "__main__":
+    main()
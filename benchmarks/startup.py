@@ -0,0 +1,165 @@
+"""Benchmark waktu muat, render pertama, dan memori setiap halaman pada proses baru.
+
+Contoh:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 5
+
+Setiap halaman diukur dua kali, masing-masing di proses Python baru:
+
+- ``import``: Streamlit mode bare; setelah ``import streamlit`` dicatat sebagai
+  titik awal, skrip halaman dieksekusi tanpa menjalankan ``main()``. Ini biaya
+  yang dibayar setiap proses baru sebelum halaman mulai tampil.
+- ``render``: ``st`` diganti tiruan dari ``benchmarks/stub_streamlit.py`` (widget
+  bernilai bawaan, setiap cache miss), skrip halaman dieksekusi lalu ``main()``
+  dipanggil sekali. Yang diukur hanya ``main()``, yaitu render pertama beserta
+  import yang ditunda (plotly.express, folium, bundel model) dan pemuatan data.
+
+Untuk keduanya dicatat waktu dan kenaikan RSS puncak di atas titik awal. Median
+dari ``--repeat`` proses dibandingkan dengan ``BUDGETS``; library di ``FORBIDDEN``
+tidak boleh ikut termuat pada tahap tersebut. Keluar dengan kode 1 jika ada
+halaman yang melampaui anggaran.
+"""
+import argparse
+import json
+import os
+import resource
+import runpy
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    "Home": "Home.py",
+    "visualisasi": os.path.join("pages", "visualisasi.py"),
+    "Klasifikasi": os.path.join("pages", "Klasifikasi.py"),
+}
+
+MODES = ("import", "render")
+
+# Anggaran per halaman dan tahap: waktu (ms) dan kenaikan RSS (MB)
+BUDGETS = {
+    "Home": {"import": {"ms": 900, "rss_mb": 120}, "render": {"ms": 1500, "rss_mb": 120}},
+    "visualisasi": {"import": {"ms": 1000, "rss_mb": 120}, "render": {"ms": 3000, "rss_mb": 200}},
+    "Klasifikasi": {"import": {"ms": 400, "rss_mb": 40}, "render": {"ms": 300, "rss_mb": 40}},
+}
+
+# Library berat yang hanya boleh dimuat di jalur kode yang membutuhkannya
+FORBIDDEN = {
+    "Home": {
+        "import": ["tensorflow", "sklearn", "folium", "plotly.express"],
+        "render": ["tensorflow", "sklearn", "folium"],
+    },
+    "visualisasi": {
+        "import": ["tensorflow", "sklearn", "folium", "streamlit_folium", "plotly.express"],
+        "render": ["tensorflow", "sklearn"],
+    },
+    "Klasifikasi": {
+        "import": ["tensorflow", "sklearn", "pandas", "folium", "plotly.express"],
+        "render": ["tensorflow", "sklearn", "pandas", "folium", "plotly.express"],
+    },
+}
+
+
+def max_rss_mb():
+    # ru_maxrss dalam KB di Linux, dalam byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if sys.platform == "darwin" else rss / 2 ** 10
+
+
+def measure_page(page, mode="import"):
+    """Dijalankan di proses anak: mengukur satu halaman dan mencetak hasil sebagai JSON"""
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    path = os.path.join(ROOT, PAGES[page])
+    if mode == "import":
+        import streamlit  # noqa: F401
+
+        base_rss = max_rss_mb()
+        start = time.perf_counter()
+        runpy.run_path(path, run_name="__page__")
+    else:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import stub_streamlit
+
+        stub_streamlit.install()
+        page_main = runpy.run_path(path, run_name="__page__")["main"]
+        base_rss = max_rss_mb()
+        start = time.perf_counter()
+        try:
+            page_main()
+        except stub_streamlit.StopPage:
+            pass
+    seconds = time.perf_counter() - start
+    result = {
+        "ms": seconds * 1000,
+        "rss_mb": max_rss_mb() - base_rss,
+        "loaded": [name for name in FORBIDDEN[page][mode] if name in sys.modules],
+    }
+    print(json.dumps(result))
+
+
+def run_page(page, mode="import", repeat=3):
+    """Median hasil ``repeat`` proses baru untuk satu halaman"""
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        # Rerun yang tercatat di proses anak tidak boleh masuk ke metrik_dashboard.jsonl asli
+        env = dict(os.environ, STUNTING_METRICS_PATH=os.path.join(directory, "metrik.jsonl"))
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", page, "--mode", mode],
+                cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "ms": statistics.median(run["ms"] for run in runs),
+        "rss_mb": statistics.median(run["rss_mb"] for run in runs),
+        "loaded": sorted({name for run in runs for name in run["loaded"]}),
+    }
+
+
+def check(page, mode, result):
+    """Daftar pelanggaran anggaran untuk satu halaman dan tahap"""
+    budget = BUDGETS[page][mode]
+    problems = []
+    if result["ms"] > budget["ms"]:
+        problems.append(f"waktu {result['ms']:.0f} ms > {budget['ms']} ms")
+    if result["rss_mb"] > budget["rss_mb"]:
+        problems.append(f"RSS {result['rss_mb']:.1f} MB > {budget['rss_mb']} MB")
+    if result["loaded"]:
+        problems.append(f"memuat {', '.join(result['loaded'])}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark waktu muat halaman dashboard")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Tahap yang diukur")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah proses baru per halaman (diambil median)")
+    parser.add_argument("--child", choices=list(PAGES), help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, default="import", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_page(args.child, args.mode)
+        return
+
+    failed = False
+    for page in args.pages:
+        for mode in args.modes:
+            result = run_page(page, mode, repeat=args.repeat)
+            problems = check(page, mode, result)
+            failed |= bool(problems)
+            budget = BUDGETS[page][mode]
+            status = "GAGAL: " + "; ".join(problems) if problems else "OK"
+            print(f"{page:<12} {mode:<7} {result['ms']:8.0f} ms (anggaran {budget['ms']:>5})"
+                  f" {result['rss_mb']:8.1f} MB (anggaran {budget['rss_mb']:>4})  {status}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
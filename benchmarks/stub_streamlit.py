@@ -0,0 +1,102 @@
+"""Pengganti modul ``streamlit`` agar fungsi halaman bisa dijalankan tanpa server.
+
+Semua pemanggilan ``st.*`` menjadi no-op, dekorator cache (dan ``st.fragment``)
+meneruskan fungsi apa adanya (setiap panggilan = cache miss), dan ``st.stop()``
+melempar ``StopPage``. Widget mengembalikan nilai bawaannya seperti pada tampilan
+pertama: tombol False, unggahan None, pilihan berupa opsi/nilai bawaan. Harus
+dipasang sebelum halaman di-import.
+"""
+import sys
+import types
+
+
+class StopPage(Exception):
+    """Dilempar oleh ``st.stop()``"""
+
+
+def _choice(label, options=(), index=0, *args, **kwargs):
+    options = list(options)
+    return options[index] if options and index is not None else None
+
+
+def _select_slider(label, options=(), value=None, *args, **kwargs):
+    options = list(options)
+    return value if value is not None else (options[0] if options else None)
+
+
+def _slider(label, min_value=None, max_value=None, value=None, *args, **kwargs):
+    return value if value is not None else min_value
+
+
+# Widget beserta nilai yang dikembalikan saat halaman pertama kali tampil
+WIDGETS = {
+    "button": lambda *args, **kwargs: False,
+    "form_submit_button": lambda *args, **kwargs: False,
+    "download_button": lambda *args, **kwargs: False,
+    "file_uploader": lambda *args, **kwargs: None,
+    "checkbox": lambda label, value=False, *args, **kwargs: value,
+    "toggle": lambda label, value=False, *args, **kwargs: value,
+    "radio": _choice,
+    "selectbox": _choice,
+    "multiselect": lambda label, options=(), default=None, *args, **kwargs: list(default or []),
+    "select_slider": _select_slider,
+    "slider": _slider,
+    "text_input": lambda label, value="", *args, **kwargs: value,
+    "number_input": _slider,
+}
+
+
+class _Element:
+    """Elemen/kontainer tiruan: bisa dipanggil, dipakai sebagai ``with``, dan punya atribut apa pun"""
+
+    def __getattr__(self, name):
+        return WIDGETS.get(name) or _Element()
+
+    def __call__(self, *args, **kwargs):
+        return _Element()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _cache(func=None, **kwargs):
+    # Mendukung @st.cache_data maupun @st.cache_data(ttl=...)
+    if func is None:
+        return lambda wrapped: wrapped
+    return func
+
+
+def _columns(spec, *args, **kwargs):
+    count = spec if isinstance(spec, int) else len(spec)
+    return [_Element() for _ in range(count)]
+
+
+def _tabs(labels, *args, **kwargs):
+    return [_Element() for _ in labels]
+
+
+def _stop():
+    raise StopPage()
+
+
+def install():
+    """Memasang modul tiruan ``streamlit`` dan ``streamlit_folium`` ke ``sys.modules``"""
+    module = types.ModuleType("streamlit")
+    module.cache_data = _cache
+    module.cache_resource = _cache
+    module.fragment = _cache
+    module.columns = _columns
+    module.tabs = _tabs
+    module.stop = _stop
+    module.sidebar = _Element()
+    module.session_state = {}
+    module.__getattr__ = lambda name: WIDGETS.get(name) or _Element()
+    sys.modules["streamlit"] = module
+
+    folium_module = types.ModuleType("streamlit_folium")
+    folium_module.st_folium = lambda *args, **kwargs: {}
+    sys.modules["streamlit_folium"] = folium_module
+    return module
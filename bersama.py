@@ -0,0 +1,281 @@
+"""Dataset ternormalisasi yang dibagi bersama oleh banyak replika Streamlit di satu host.
+
+Hasil ``load_research_dataset`` ditulis sekali per versi data sebagai file Arrow
+IPC tanpa kompresi di ``data_bersama/<versi>/``. Setiap replika membukanya dengan
+``pyarrow.memory_map``: kolom numerik (11 indikator, lat, lon) menjadi array
+pandas yang menunjuk langsung ke page cache, sehingga semua replika memakai satu
+salinan fisik. Baris diurutkan menurut tahun dan offset tiap tahun disimpan,
+sehingga pilihan rentang tahun cukup berupa irisan tanpa salinan.
+
+Jabat tangan versi: versi gabungan dihitung dari ``dataset_partitions()``.
+Replika yang pertama melihat versi baru menulis segmen lengkap ke direktori
+sementara, memindahkannya ke ``<versi>/`` lalu mengganti ``CURRENT.json``
+secara atomik; replika lain langsung memakai segmen yang sudah ada. Hanya
+partisi tahun yang versinya berubah yang dibaca ulang dari store; blok tahun
+lainnya disalin dari segmen aktif (sudah ternormalisasi). Segmen tidak
+pernah diubah setelah diterbitkan, jadi replika yang masih memetakan versi lama
+tetap aman. ``python partisi.py ingest`` menerbitkan segmen baru segera setelah
+ingest.
+
+Bobot model sudah dibagi dengan cara yang sama (``bobot.load_bundle`` memakai
+``np.load(mmap_mode="r")``). Untuk menyimpan segmen di RAM, arahkan
+``STUNTING_SHARED_PATH`` ke tmpfs, mis. ``/dev/shm/stunting``.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+SHARED_PATH = os.environ.get("STUNTING_SHARED_PATH", "data_bersama")
+CURRENT_FILE = "CURRENT.json"
+META_FILE = "segmen.json"
+DATA_FILE = "dataset.arrow"
+BAD_ROWS_FILE = "bad_rows.npy"
+# Jumlah segmen lama yang dipertahankan selain segmen aktif
+KEEP_PREVIOUS = 1
+# Kolom kategori yang kategorinya bergantung pada baris yang dimuat
+REGION_COLUMNS = ("namakecamatan", "namakelurahan")
+
+
+def combined_version(partitions):
+    """Satu hash untuk seluruh peta partisi {tahun: sha256}"""
+    items = sorted((str(year), version) for year, version in partitions.items())
+    return hashlib.sha256(json.dumps(items).encode()).hexdigest()
+
+
+def read_current(shared_path=SHARED_PATH):
+    try:
+        with open(os.path.join(shared_path, CURRENT_FILE)) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json_atomic(data, path):
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(data, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _sort_by_year(df, report):
+    """Mengurutkan baris menurut tahun; mengembalikan (df, bad_rows baru, offset per tahun)"""
+    tahun = df["tahun"].to_numpy(dtype=np.int64)
+    order = np.argsort(tahun, kind="stable")
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+    df = df.iloc[order].reset_index(drop=True)
+    bad_rows = np.sort(position[report["bad_rows"]])
+
+    years, starts = np.unique(tahun[order], return_index=True)
+    stops = np.append(starts[1:], len(df))
+    offsets = {str(year): [int(start), int(stop)] for year, start, stop in zip(years, starts, stops)}
+    return df, bad_rows, offsets
+
+
+def _reusable_blocks(partitions, shared_path):
+    """Blok tahun di segmen aktif yang versinya tidak berubah: {tahun: (df, laporan)}"""
+    current = read_current(shared_path)
+    if current is None or None in partitions:
+        return {}
+    try:
+        previous = SharedDataset.attach(os.path.join(shared_path, current["directory"]))
+    except (OSError, ValueError):
+        return {}
+    if previous.meta["years"] is None:
+        return {}
+    return {
+        year: previous.select(((year, version),)) for year, version in partitions.items()
+        if previous.meta["partitions"].get(str(year)) == version and str(year) in previous.meta["years"]
+    }
+
+
+def _align_categories(frames):
+    """Kategori setiap kolom kategorikal disamakan seperti hasil normalisasi seluruh data sekaligus"""
+    import pandas as pd
+
+    from dataset import RISK_LABELS
+
+    aligned = list(frames)
+    for column in frames[0].select_dtypes("category").columns:
+        present = set().union(*(frame[column].dropna().unique() for frame in frames))
+        if column == "risiko_stunting":
+            categories = RISK_LABELS + sorted(present - set(RISK_LABELS))
+        else:
+            categories = sorted(present)
+        dtype = pd.CategoricalDtype(categories)
+        aligned = [frame.assign(**{column: frame[column].astype(dtype)}) for frame in aligned]
+    return aligned
+
+
+def _load_dataset(partitions, shared_path):
+    """Dataset ternormalisasi untuk segmen baru
+
+    Hanya partisi tahun yang berubah yang dibaca dan dinormalisasi; blok tahun yang
+    versinya sama diambil dari segmen aktif.
+    """
+    from dataset import load_research_dataset
+
+    reused = _reusable_blocks(partitions, shared_path)
+    if not reused:
+        return load_research_dataset()
+
+    import pandas as pd
+
+    changed = [year for year in partitions if year not in reused]
+    parts = [load_research_dataset(tahun=changed)] if changed else []
+    parts += [reused[year] for year in sorted(reused)]
+    frames, bad_rows, offset = [], [], 0
+    for df, report in parts:
+        frames.append(df)
+        bad_rows.append(np.asarray(report["bad_rows"], dtype=np.int64) + offset)
+        offset += len(df)
+    df = pd.concat(_align_categories(frames), ignore_index=True)
+    return df, {"rows": len(df), "bad_rows": np.concatenate(bad_rows)}
+
+
+def publish(partitions=None, shared_path=SHARED_PATH):
+    """Menulis segmen untuk versi data saat ini (jika belum ada) dan menjadikannya aktif"""
+    import pyarrow as pa
+
+    from dataset import dataset_partitions
+
+    partitions = dataset_partitions() if partitions is None else partitions
+    version = combined_version(partitions)
+    directory = os.path.join(shared_path, version[:16])
+
+    if not os.path.exists(os.path.join(directory, META_FILE)):
+        df, report = _load_dataset(partitions, shared_path)
+        offsets = None
+        bad_rows = report["bad_rows"]
+        if None not in partitions:
+            df, bad_rows, offsets = _sort_by_year(df, report)
+
+        staging = f"{directory}.{os.getpid()}-{threading.get_ident()}.tmp"
+        os.makedirs(staging, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(os.path.join(staging, DATA_FILE), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        np.save(os.path.join(staging, BAD_ROWS_FILE), np.asarray(bad_rows, dtype=np.int64))
+        meta = {
+            "version": version,
+            "partitions": {str(year): sha for year, sha in partitions.items()},
+            "rows": len(df),
+            "years": offsets,
+        }
+        _write_json_atomic(meta, os.path.join(staging, META_FILE))
+        try:
+            os.rename(staging, directory)
+        except OSError:
+            # Replika lain sudah menerbitkan versi yang sama lebih dulu
+            shutil.rmtree(staging, ignore_errors=True)
+
+    _write_json_atomic({"version": version, "directory": os.path.basename(directory)},
+                       os.path.join(shared_path, CURRENT_FILE))
+    prune(shared_path)
+    return directory
+
+
+def prune(shared_path=SHARED_PATH, keep_previous=KEEP_PREVIOUS):
+    """Menghapus segmen lama; file yang masih dipetakan replika tetap valid sampai ditutup"""
+    current = read_current(shared_path)
+    segments = [
+        os.path.join(shared_path, name) for name in os.listdir(shared_path)
+        if not name.endswith(".tmp") and os.path.isdir(os.path.join(shared_path, name))
+        and (current is None or name != current["directory"])
+    ]
+    segments.sort(key=os.path.getmtime, reverse=True)
+    for directory in segments[keep_previous:]:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def current_segment(partitions=None, shared_path=SHARED_PATH):
+    """Direktori segmen untuk versi data saat ini; diterbitkan jika belum ada"""
+    from dataset import dataset_partitions
+
+    partitions = dataset_partitions() if partitions is None else partitions
+    version = combined_version(partitions)
+    current = read_current(shared_path)
+    if current is not None and current["version"] == version:
+        directory = os.path.join(shared_path, current["directory"])
+        if os.path.exists(os.path.join(directory, META_FILE)):
+            return directory
+    return publish(partitions, shared_path)
+
+
+class SharedDataset:
+    """Dataset dari satu segmen, dipetakan ke memori tanpa salinan"""
+
+    def __init__(self, directory, meta, df, bad_rows):
+        self.directory = directory
+        self.meta = meta
+        self.df = df
+        self.bad_rows = bad_rows
+
+    @classmethod
+    def attach(cls, directory):
+        import pyarrow as pa
+
+        with open(os.path.join(directory, META_FILE)) as file:
+            meta = json.load(file)
+        source = pa.memory_map(os.path.join(directory, DATA_FILE), "r")
+        table = pa.ipc.open_file(source).read_all()
+        # split_blocks: setiap kolom menjadi blok sendiri sehingga kolom numerik tidak disalin
+        df = table.to_pandas(split_blocks=True)
+        bad_rows = np.load(os.path.join(directory, BAD_ROWS_FILE), mmap_mode="r")
+        return cls(directory, meta, df, bad_rows)
+
+    @property
+    def version(self):
+        return self.meta["version"]
+
+    def _report(self, start, stop):
+        bad_rows = np.asarray(self.bad_rows[(self.bad_rows >= start) & (self.bad_rows < stop)]) - start
+        return {"rows": stop - start, "bad_rows": bad_rows}
+
+    @staticmethod
+    def _compact(df):
+        """Membuang wilayah yang tidak muncul di subset (seperti hasil muat per tahun)"""
+        for column in REGION_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].cat.remove_unused_categories()
+        return df
+
+    def select(self, keys=None):
+        """(DataFrame, laporan) untuk partisi ``keys`` ((tahun, versi), ...); None semua
+
+        Mengembalikan None jika versi partisi tidak sesuai dengan segmen ini.
+        """
+        if keys is None:
+            return self.df, self._report(0, len(self.df))
+        partitions = self.meta["partitions"]
+        if any(partitions.get(str(year)) != version for year, version in keys):
+            return None
+        if self.meta["years"] is None:
+            # Satu workbook tanpa partisi tahun
+            return self.df, self._report(0, len(self.df))
+
+        ranges = sorted(self.meta["years"][str(year)] for year, _ in keys if str(year) in self.meta["years"])
+        if not ranges:
+            return self._compact(self.df.iloc[:0]), self._report(0, 0)
+        if all(previous[1] == following[0] for previous, following in zip(ranges, ranges[1:])):
+            # Tahun yang berurutan: cukup irisan, kolom numerik tanpa salinan
+            start, stop = ranges[0][0], ranges[-1][1]
+            df = self._compact(self.df.iloc[start:stop].reset_index(drop=True))
+            return df, self._report(start, stop)
+
+        import pandas as pd
+
+        frames, reports = [], []
+        offset = 0
+        for start, stop in ranges:
+            frames.append(self.df.iloc[start:stop])
+            report = self._report(start, stop)
+            reports.append(report["bad_rows"] + offset)
+            offset += stop - start
+        df = self._compact(pd.concat(frames, ignore_index=True))
+        return df, {"rows": offset, "bad_rows": np.concatenate(reports)}
@@ -0,0 +1,382 @@
+"""Ekspor dan muat bundel bobot model dalam format biner yang bisa di-mmap.
+
+Bundel berupa folder berisi:
+- ``weights.npy`` : satu buffer float32 berisi semua layer dan parameter scaler,
+  setiap array dimulai pada offset yang disejajarkan 64 byte
+- ``bundle.json`` : header berisi versi format, bentuk dan offset tiap array,
+  urutan gate LSTM, nama fitur, serta hash isi ``weights.npy``
+
+Karena ``weights.npy`` dibuka dengan ``np.load(mmap_mode="r")``, banyak proses
+worker berbagi satu salinan fisik bobot di page cache tanpa parsing teks.
+
+Varian presisi rendah (``precision="float16"`` atau ``"int8"``) menyimpan kernel
+LSTM di file kedua ``weights_<presisi>.npy``; int8 memakai skala simetris per
+kolom keluaran yang disimpan sebagai ``<nama>/scale`` di buffer float32. Bias,
+layer Dense, dan parameter scaler tetap float32.
+
+Bundel terkompilasi (``fused=True``) melipat MinMaxScaler ke kernel dan bias
+layer LSTM pertama. Karena ``x_scaled = x * scale + min`` bersifat affine,
+``x_scaled @ K + b == x @ (scale[:, None] * K) + (min @ K + b)`` sehingga model
+menerima input mentah 0/1 tanpa tahap praproses. Header mencatat hash bundel
+sumbernya agar bundel yang kedaluwarsa tidak dipakai.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+
+from inferensi import FEATURE_COLUMNS, GATE_ORDER, MODEL_PATH, CompactKernel, StackedLSTM
+
+BUNDLE_PATH = "model_bundle"
+BUNDLE_VERSION = 1
+PRECISIONS = ("float32", "float16", "int8")
+SCALER_PATH = "scaler.pkl"
+
+WEIGHTS_FILE = "weights.npy"
+HEADER_FILE = "bundle.json"
+# Laporan akurasi varian presisi rendah (ditulis oleh kuantisasi.py)
+PRECISION_REPORT_FILE = "laporan_presisi.json"
+ALIGNMENT = 64
+
+
+def _collect_arrays(model, scaler):
+    """Menyusun daftar (nama, array) yang akan disimpan ke bundel"""
+    arrays = []
+    for index, (kernel, recurrent_kernel, bias) in enumerate(model.lstm_weights):
+        name = "lstm" if index == 0 else f"lstm_{index}"
+        arrays.append((f"{name}/kernel", kernel))
+        arrays.append((f"{name}/recurrent_kernel", recurrent_kernel))
+        arrays.append((f"{name}/bias", bias))
+    arrays.append(("dense/kernel", model.dense_kernel))
+    arrays.append(("dense/bias", model.dense_bias))
+
+    # Parameter MinMaxScaler: x_scaled = x * scale + min
+    arrays.append(("scaler/scale", scaler.scale_))
+    arrays.append(("scaler/min", scaler.min_))
+    arrays.append(("scaler/data_min", scaler.data_min_))
+    arrays.append(("scaler/data_max", scaler.data_max_))
+    return [(name, np.asarray(array, dtype=np.float32)) for name, array in arrays]
+
+
+def fold_scaler(kernel, bias, scale, min_):
+    """Kernel dan bias layer pertama yang sudah memuat transformasi MinMaxScaler"""
+    kernel = np.asarray(kernel, dtype=np.float64)
+    folded_kernel = np.asarray(scale, dtype=np.float64)[:, np.newaxis] * kernel
+    folded_bias = np.asarray(bias, dtype=np.float64) + np.asarray(min_, dtype=np.float64) @ kernel
+    return folded_kernel.astype(np.float32), folded_bias.astype(np.float32)
+
+
+def fuse_arrays(arrays):
+    """Melipat parameter scaler ke ``lstm/kernel`` dan ``lstm/bias`` lalu membuangnya"""
+    arrays = dict(arrays)
+    arrays["lstm/kernel"], arrays["lstm/bias"] = fold_scaler(
+        arrays["lstm/kernel"], arrays["lstm/bias"], arrays["scaler/scale"], arrays["scaler/min"]
+    )
+    return [(name, array) for name, array in arrays.items() if not name.startswith("scaler/")]
+
+
+def quantize_per_channel(weights):
+    """Kuantisasi int8 simetris per kolom keluaran: weights ~= values * scale"""
+    max_abs = np.abs(weights).max(axis=0)
+    scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    values = np.clip(np.round(weights / scale), -127, 127).astype(np.int8)
+    return values, scale
+
+
+def _pack(arrays, dtype):
+    """Menyusun array ke satu buffer dengan offset (dalam elemen) sejajar ALIGNMENT byte"""
+    step = ALIGNMENT // np.dtype(dtype).itemsize
+    entries = {}
+    offset = 0
+    for name, array in arrays:
+        entries[name] = {"offset": offset, "shape": list(array.shape)}
+        offset += -(-array.size // step) * step
+
+    buffer = np.zeros(offset, dtype=dtype)
+    for name, array in arrays:
+        start = entries[name]["offset"]
+        buffer[start:start + array.size] = array.ravel()
+    return buffer, entries
+
+
+def default_bundle_path(precision, fused=False):
+    path = BUNDLE_PATH if precision == "float32" else f"{BUNDLE_PATH}_{precision}"
+    return f"{path}_fused" if fused else path
+
+
+def export_bundle(model_path=MODEL_PATH, scaler_path=SCALER_PATH, bundle_path=None, precision="float32",
+                  fused=False, source_sha256=None):
+    """Mengekspor bobot model .h5 dan scaler.pkl ke satu bundel biner
+
+    ``fused=True`` melipat scaler ke layer LSTM pertama; ``source_sha256`` (hash
+    bundel float32 asal) dicatat di header bundel terkompilasi.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Presisi '{precision}' tidak didukung (pilih: {', '.join(PRECISIONS)})")
+    bundle_path = bundle_path or default_bundle_path(precision, fused)
+
+    model = StackedLSTM.from_h5(model_path)
+    with open(scaler_path, "rb") as file:
+        scaler = pickle.load(file)
+
+    arrays = _collect_arrays(model, scaler)
+    if fused:
+        arrays = fuse_arrays(arrays)
+    feature_names = getattr(scaler, "feature_names_in_", FEATURE_COLUMNS)
+    return write_bundle(arrays, bundle_path, feature_names, precision, fused, source_sha256)
+
+
+def bundle_arrays(bundle):
+    """Salinan semua array bundel float32 sebagai daftar (nama, array)"""
+    if bundle.precision != "float32":
+        raise ValueError(f"Bundel '{bundle.path}' berpresisi {bundle.precision}, bukan float32")
+    return [(name, np.array(bundle[name])) for name in bundle.header["arrays"]]
+
+
+def write_bundle(arrays, bundle_path, feature_names, precision="float32", fused=False, source_sha256=None):
+    """Menulis daftar (nama, array) float32 sebagai bundel di ``bundle_path``"""
+    compact = []
+    if precision != "float32":
+        # Hanya kernel LSTM yang diperkecil; sisanya kecil dan sensitif terhadap presisi
+        kernels = {name for name, _ in arrays if name.startswith("lstm") and "kernel" in name}
+        full = []
+        for name, array in arrays:
+            if name not in kernels:
+                full.append((name, array))
+            elif precision == "float16":
+                compact.append((name, array.astype(np.float16)))
+            else:
+                values, scale = quantize_per_channel(array)
+                compact.append((name, values))
+                full.append((f"{name}/scale", scale))
+        arrays = full
+
+    buffer, entries = _pack(arrays, np.float32)
+    digest = hashlib.sha256(buffer.tobytes())
+    compact_file = None
+    if compact:
+        compact_buffer, compact_entries = _pack(compact, np.dtype(precision))
+        compact_file = f"weights_{precision}.npy"
+        for entry in compact_entries.values():
+            entry["file"] = compact_file
+        entries.update(compact_entries)
+        digest.update(compact_buffer.tobytes())
+
+    header = {
+        "version": BUNDLE_VERSION,
+        "dtype": "float32",
+        "gate_order": GATE_ORDER,
+        "features": [str(name) for name in feature_names],
+        "arrays": entries,
+        "sha256": digest.hexdigest(),
+    }
+    if precision != "float32":
+        header["precision"] = precision
+    if fused:
+        header["fused_scaler"] = True
+        header["source_sha256"] = source_sha256
+
+    os.makedirs(bundle_path, exist_ok=True)
+    np.save(os.path.join(bundle_path, WEIGHTS_FILE), buffer)
+    if compact_file:
+        np.save(os.path.join(bundle_path, compact_file), compact_buffer)
+    with open(os.path.join(bundle_path, HEADER_FILE), "w") as file:
+        json.dump(header, file, indent=2)
+    return header
+
+
+def staging_path(path):
+    """Lokasi sementara di folder yang sama dengan ``path`` (agar os.replace atomik)"""
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def replace_file(source, target):
+    """Menyalin ``source`` ke ``target`` lewat file sementara lalu os.replace
+
+    File lama tidak ditimpa di tempat, jadi proses yang masih memetakannya tetap
+    membaca isi lama sampai file ditutup.
+    """
+    tmp_path = staging_path(target)
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def replace_bundle(staging, bundle_path):
+    """Memindahkan isi folder ``staging`` ke ``bundle_path`` per file dengan os.replace
+
+    File data dipindahkan lebih dulu dan header (``*.json``) terakhir; file di
+    ``bundle_path`` yang tidak ada di ``staging`` dihapus, lalu ``staging`` dibuang.
+    """
+    os.makedirs(bundle_path, exist_ok=True)
+    names = sorted(os.listdir(staging), key=lambda name: (name.endswith(".json"), name))
+    for name in names:
+        os.replace(os.path.join(staging, name), os.path.join(bundle_path, name))
+    for name in set(os.listdir(bundle_path)) - set(names):
+        path = os.path.join(bundle_path, name)
+        if os.path.isfile(path):
+            os.remove(path)
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+class WeightBundle:
+    """Bundel bobot yang dibuka zero-copy melalui memory map"""
+
+    def __init__(self, header, buffer, path=BUNDLE_PATH, extra_buffers=None):
+        self.header = header
+        self.buffer = buffer
+        self.path = path
+        # Buffer kernel presisi rendah, per nama file
+        self.extra_buffers = extra_buffers or {}
+
+    @property
+    def version(self):
+        return self.header["version"]
+
+    @property
+    def sha256(self):
+        return self.header["sha256"]
+
+    @property
+    def features(self):
+        return self.header["features"]
+
+    @property
+    def precision(self):
+        return self.header.get("precision", "float32")
+
+    @property
+    def fused(self):
+        return self.header.get("fused_scaler", False)
+
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes + sum(buffer.nbytes for buffer in self.extra_buffers.values())
+
+    def __getitem__(self, name):
+        entry = self.header["arrays"][name]
+        size = int(np.prod(entry["shape"], dtype=np.int64))
+        start = entry["offset"]
+        buffer = self.extra_buffers[entry["file"]] if "file" in entry else self.buffer
+        return buffer[start:start + size].reshape(entry["shape"])
+
+    def verify(self):
+        """Mencocokkan hash isi buffer dengan hash pada header"""
+        digest = hashlib.sha256(self.buffer.tobytes())
+        for name in sorted(self.extra_buffers):
+            digest.update(self.extra_buffers[name].tobytes())
+        return digest.hexdigest() == self.sha256
+
+    def _kernel(self, name):
+        """Kernel LSTM; varian presisi rendah dibungkus CompactKernel tanpa disalin"""
+        if "file" not in self.header["arrays"][name]:
+            return self[name]
+        scale_name = f"{name}/scale"
+        scale = self[scale_name] if scale_name in self.header["arrays"] else None
+        return CompactKernel(self[name], scale)
+
+    def transform(self, x):
+        """Menerapkan transformasi MinMaxScaler yang tersimpan di bundel"""
+        if self.fused:
+            # Scaler sudah terlipat ke layer LSTM pertama
+            return np.asarray(x, dtype=np.float32)
+        return np.asarray(x, dtype=np.float32) * self["scaler/scale"] + self["scaler/min"]
+
+    def to_model(self):
+        """Membangun StackedLSTM yang memakai array bundel tanpa menyalin"""
+        names = sorted(
+            {name.split("/")[0] for name in self.header["arrays"] if name.startswith("lstm")},
+            key=lambda name: (len(name), name),
+        )
+        lstm_weights = [
+            (self._kernel(f"{name}/kernel"), self._kernel(f"{name}/recurrent_kernel"), self[f"{name}/bias"])
+            for name in names
+        ]
+        return StackedLSTM(lstm_weights, self["dense/kernel"], self["dense/bias"])
+
+
+def check_variant_report(bundle_path):
+    """Menolak varian presisi rendah yang laporannya tidak memuat evaluasi data uji hold-out
+
+    Laporan juga harus dibuat untuk isi bundel yang sama (hash cocok).
+    """
+    try:
+        with open(os.path.join(bundle_path, HEADER_FILE)) as file:
+            header = json.load(file)
+    except FileNotFoundError:
+        return
+    precision = header.get("precision", "float32")
+    if precision == "float32":
+        return
+    try:
+        with open(os.path.join(bundle_path, PRECISION_REPORT_FILE)) as file:
+            report = json.load(file)
+    except (FileNotFoundError, ValueError):
+        report = {}
+    if not report.get("holdout") or report.get("bundle_sha256") != header.get("sha256"):
+        raise ValueError(
+            f"Varian {precision} '{bundle_path}' belum dievaluasi pada data uji hold-out; "
+            "jalankan 'python kuantisasi.py' dengan data penelitian tersedia"
+        )
+
+
+def active_bundle_path(bundle_path=BUNDLE_PATH):
+    """Bundel terkompilasi jika ada dan masih dibuat dari ``bundle_path`` saat ini
+
+    Varian presisi rendah tanpa evaluasi hold-out ditolak dengan ValueError.
+    """
+    check_variant_report(bundle_path)
+    fused_path = f"{bundle_path}_fused"
+    try:
+        with open(os.path.join(bundle_path, HEADER_FILE)) as file:
+            source = json.load(file)
+        with open(os.path.join(fused_path, HEADER_FILE)) as file:
+            fused = json.load(file)
+    except FileNotFoundError:
+        return bundle_path
+    if fused.get("fused_scaler") and fused.get("source_sha256") == source.get("sha256"):
+        return fused_path
+    return bundle_path
+
+
+def load_bundle(bundle_path=BUNDLE_PATH, mmap_mode="r"):
+    """Membuka bundel bobot; array di-mmap sehingga tidak ada salinan di memori"""
+    with open(os.path.join(bundle_path, HEADER_FILE)) as file:
+        header = json.load(file)
+    if header.get("version") != BUNDLE_VERSION:
+        raise ValueError(
+            f"Versi bundel {header.get('version')} tidak didukung (harus {BUNDLE_VERSION})"
+        )
+    if header.get("gate_order") != GATE_ORDER:
+        raise ValueError(f"Urutan gate '{header.get('gate_order')}' tidak didukung")
+    if header.get("precision", "float32") not in PRECISIONS:
+        raise ValueError(f"Presisi '{header.get('precision')}' tidak didukung")
+
+    buffer = np.load(os.path.join(bundle_path, WEIGHTS_FILE), mmap_mode=mmap_mode)
+    files = {entry["file"] for entry in header["arrays"].values() if "file" in entry}
+    extra_buffers = {
+        name: np.load(os.path.join(bundle_path, name), mmap_mode=mmap_mode) for name in files
+    }
+    return WeightBundle(header, buffer, bundle_path, extra_buffers)
+
+
+if __name__ == "__main__":
+    header = export_bundle()
+    bundle = load_bundle()
+
+    # Pastikan bundel identik dengan bobot asli di file .h5
+    reference = StackedLSTM.from_h5(MODEL_PATH)
+    exported = bundle.to_model()
+    pairs = list(zip(reference.lstm_weights, exported.lstm_weights))
+    identical = all(
+        np.array_equal(a, b) for ref, exp in pairs for a, b in zip(ref, exp)
+    ) and np.array_equal(reference.dense_kernel, exported.dense_kernel) \
+        and np.array_equal(reference.dense_bias, exported.dense_bias)
+
+    print(f"Bundel versi {header['version']} disimpan ke '{BUNDLE_PATH}'")
+    for name, entry in header["arrays"].items():
+        print(f"  {name:<24} {tuple(entry['shape'])}")
+    print(f"SHA-256: {header['sha256']}")
+    print("Bobot identik dengan model .h5" if identical and bundle.verify() else "PERINGATAN: bobot berbeda!")
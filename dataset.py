@@ -0,0 +1,265 @@
+"""Lapisan akses data penelitian: cache kolumnar, validasi skema, dan normalisasi.
+
+``pd.read_excel`` adalah langkah paling lambat saat halaman dimuat pertama kali.
+Workbook dikonversi sekali menjadi file Parquet di sebelahnya, dan setiap halaman
+maupun proses worker membaca cache tersebut. Cache dibangun ulang hanya jika
+workbook sumber berubah (mtime/ukuran berubah dan hash isinya berbeda).
+
+``load_research_dataset`` adalah satu-satunya tempat normalisasi data untuk semua halaman
+dan skrip: nama kolom, label risiko, indikator biner (int8), koordinat (float32),
+serta kolom wilayah dan risiko sebagai kategori.
+
+Jika store terpartisi per tahun (``partisi.py``) sudah dibuat, data dibaca dari store
+tersebut dan hanya partisi yang diminta yang dibaca.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from inferensi import FEATURE_COLUMNS
+
+DATA_PATH = "penelitian_bersih.xlsx"
+
+REQUIRED_COLUMNS = ["namakecamatan", "namakelurahan", "risiko_stunting"]
+
+RISK_LABELS = ["Berisiko", "Tidak Berisiko", "Tidak Diketahui"]
+
+# Berbagai format label risiko pada data sumber
+RISK_MAPPING = {
+    "1": "Berisiko", "0": "Tidak Berisiko",
+    "1.0": "Berisiko", "0.0": "Tidak Berisiko",
+    "true": "Berisiko", "false": "Tidak Berisiko",
+    "ya": "Berisiko", "tidak": "Tidak Berisiko",
+    "yes": "Berisiko", "no": "Tidak Berisiko",
+    "tinggi": "Berisiko", "rendah": "Tidak Berisiko",
+    "berisiko": "Berisiko", "tidak berisiko": "Tidak Berisiko",
+}
+
+# Nilai indikator: X/V dari data lapangan, Ya/Tidak dari form, atau 1/0
+INDICATOR_MAPPING = {
+    "V": 1, "X": 0,
+    "YA": 1, "TIDAK": 0,
+    "Y": 1, "T": 0,
+    "1": 1, "0": 0,
+    "1.0": 1, "0.0": 0,
+    "TRUE": 1, "FALSE": 0,
+}
+
+# Nilai indikator yang kosong atau tidak dikenali
+MISSING_INDICATOR = -1
+
+
+def cache_paths(source_path):
+    """Lokasi file Parquet dan metadata cache untuk file sumber"""
+    base, _ = os.path.splitext(source_path)
+    return f"{base}.parquet", f"{base}.cache.json"
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash SHA-256 isi file, dibaca per blok"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_meta(meta_path):
+    """Membaca file metadata JSON; None jika tidak ada atau rusak"""
+    try:
+        with open(meta_path) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_atomic(path, write):
+    """Menulis ke file sementara lalu mengganti file tujuan secara atomik"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def to_arrow_friendly(df):
+    """Kolom object bertipe campuran (mis. 1 dan 'Berisiko') diubah menjadi teks"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def build_cache(source_path=DATA_PATH, sha256=None):
+    """Membaca workbook sumber dan menyimpannya sebagai cache Parquet"""
+    parquet_path, meta_path = cache_paths(source_path)
+    stat = os.stat(source_path)
+    df = to_arrow_friendly(pd.read_excel(source_path))
+
+    write_atomic(parquet_path, lambda path: df.to_parquet(path, index=False))
+    meta = {
+        "source": os.path.basename(source_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha256 or file_sha256(source_path),
+    }
+    write_atomic(meta_path, lambda path: dump_json(meta, path))
+    return df
+
+
+def dump_json(data, path):
+    """Menulis ``data`` sebagai JSON berindentasi ke ``path``"""
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+
+
+def cache_is_fresh(source_path=DATA_PATH):
+    """Mengecek apakah cache Parquet masih sesuai dengan workbook sumber"""
+    parquet_path, meta_path = cache_paths(source_path)
+    meta = read_meta(meta_path)
+    if meta is None or not os.path.exists(parquet_path):
+        return False, None
+
+    stat = os.stat(source_path)
+    if meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+        return True, meta
+
+    # mtime berubah (mis. file disalin ulang): bandingkan hash isinya
+    sha256 = file_sha256(source_path)
+    if meta["sha256"] != sha256:
+        return False, sha256
+
+    meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    write_atomic(meta_path, lambda path: dump_json(meta, path))
+    return True, meta
+
+
+def read_dataset(source_path=DATA_PATH, columns=None):
+    """Membaca data penelitian melalui cache Parquet (dibangun jika perlu)"""
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(source_path)
+
+    fresh, info = cache_is_fresh(source_path)
+    if not fresh:
+        df = build_cache(source_path, sha256=info)
+        return df[columns] if columns is not None else df
+
+    parquet_path, _ = cache_paths(source_path)
+    return pd.read_parquet(parquet_path, columns=columns)
+
+
+def dataset_version(source_path=DATA_PATH):
+    """Hash isi workbook sumber yang sedang di-cache (untuk kunci cache lain)"""
+    fresh, meta = cache_is_fresh(source_path)
+    if not fresh:
+        build_cache(source_path, sha256=meta)
+        meta = read_meta(cache_paths(source_path)[1])
+    return meta["sha256"]
+
+
+def normalize_columns(df):
+    """Menyamakan nama kolom: huruf kecil dan spasi menjadi garis bawah"""
+    df = df.copy()
+    df.columns = [str(col).strip().lower().replace(" ", "_") for col in df.columns]
+    return df
+
+
+def encode_indicator(series):
+    """Mengodekan satu kolom indikator menjadi 0/1 (NaN jika tidak dikenali)"""
+    return series.astype(str).str.strip().str.upper().map(INDICATOR_MAPPING)
+
+
+def validate_schema(df):
+    """Memastikan kolom wajib tersedia setelah nama kolom dinormalisasi"""
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+
+def normalize_dataset(df):
+    """Normalisasi data penelitian; mengembalikan (DataFrame, laporan baris bermasalah)"""
+    df = normalize_columns(df)
+    validate_schema(df)
+
+    bad_rows = np.zeros(len(df), dtype=bool)
+    report = {"rows": len(df)}
+
+    for col in ("namakecamatan", "namakelurahan"):
+        names = df[col].astype("string").str.strip()
+        report[f"invalid_{col}"] = int(names.isna().sum())
+        bad_rows |= names.isna().to_numpy()
+        df[col] = names.astype("category")
+
+    # Label risiko: kosong -> 'Tidak Diketahui', format lain dipetakan ke label standar
+    risk_raw = df["risiko_stunting"].astype("string").str.strip()
+    risk = risk_raw.str.lower().map(RISK_MAPPING)
+    unmapped = risk.isna() & risk_raw.notna()
+    risk = risk.fillna(risk_raw.str.title()).fillna("Tidak Diketahui")
+    report["invalid_risiko_stunting"] = int((risk_raw.isna() | unmapped).sum())
+    bad_rows |= (risk_raw.isna() | unmapped).to_numpy()
+    categories = RISK_LABELS + sorted(set(risk.unique()) - set(RISK_LABELS))
+    df["risiko_stunting"] = pd.Categorical(risk, categories=categories)
+
+    invalid_indicator = np.zeros(len(df), dtype=bool)
+    for col in FEATURE_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = encode_indicator(df[col])
+        invalid_indicator |= values.isna().to_numpy()
+        df[col] = values.fillna(MISSING_INDICATOR).astype(np.int8)
+    report["invalid_indicators"] = int(invalid_indicator.sum())
+    bad_rows |= invalid_indicator
+
+    if "lat" in df.columns and "lon" in df.columns:
+        for col in ("lat", "lon"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float32)
+        invalid_coords = (df["lat"].isna() | df["lon"].isna()).to_numpy()
+        report["invalid_coordinates"] = int(invalid_coords.sum())
+        bad_rows |= invalid_coords
+
+    if "tahun" in df.columns:
+        tahun = pd.to_numeric(df["tahun"], errors="coerce")
+        report["invalid_tahun"] = int(tahun.isna().sum())
+        bad_rows |= tahun.isna().to_numpy()
+        df["tahun"] = tahun.astype("Int16")
+
+    report["bad_rows"] = np.flatnonzero(bad_rows)
+    return df, report
+
+
+def dataset_partitions(source_path=DATA_PATH):
+    """Versi isi per partisi: {tahun: sha256}, atau {None: sha256} untuk satu workbook"""
+    from partisi import partition_versions
+
+    partitions = partition_versions()
+    return partitions if partitions else {None: dataset_version(source_path)}
+
+
+def load_research_dataset(source_path=DATA_PATH, tahun=None, kecamatan=None):
+    """Memuat data penelitian yang sudah dinormalisasi beserta laporan validasinya.
+
+    ``tahun`` dan ``kecamatan`` (daftar, None berarti semua) membatasi partisi yang
+    dibaca dari store terpartisi; tanpa store, filter diterapkan setelah membaca workbook.
+    """
+    from partisi import load_manifest, read_partitions
+
+    if load_manifest() is not None:
+        return normalize_dataset(read_partitions(tahun=tahun, kecamatan=kecamatan))
+
+    df, report = normalize_dataset(read_dataset(source_path))
+    if tahun is None and kecamatan is None:
+        return df, report
+    keep = np.ones(len(df), dtype=bool)
+    if tahun is not None and "tahun" in df.columns:
+        keep &= df["tahun"].isin(list(tahun)).fillna(False).to_numpy()
+    if kecamatan is not None:
+        keep &= df["namakecamatan"].isin(list(kecamatan)).to_numpy()
+    report["bad_rows"] = np.flatnonzero(np.isin(np.arange(len(df)), report["bad_rows"])[keep])
+    report["rows"] = int(keep.sum())
+    return df.loc[keep].reset_index(drop=True), report
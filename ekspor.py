@@ -0,0 +1,121 @@
+"""Ekspor ringkasan dan data rumah tangga terfilter ke CSV, Parquet, atau XLSX.
+
+File dibuat hanya saat diminta (tombol unduh halaman visualisasi memanggil
+``read_export`` lewat callable), ditulis ke disk per potongan ``CHUNK_ROWS``
+baris dengan ``ResultWriter`` dari ``skor_massal.py``, lalu di-cache di
+``EXPORT_DIR`` dengan nama berupa hash kunci filter. Kunci filter memuat versi
+isi setiap partisi, sehingga data yang di-ingest ulang otomatis menghasilkan
+file baru.
+
+Batas: hanya penulisan yang bertahap. ``st.download_button`` menyimpan isi file
+di memori server (MediaFileManager) selama diunduh, jadi satu ekspor memakan RAM
+sebesar ukuran filenya; ekspor yang sangat besar sebaiknya diambil langsung dari
+``EXPORT_DIR`` atau lewat ``skor_massal.py``.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+EXPORT_DIR = os.environ.get("STUNTING_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "stunting_ekspor"))
+CHUNK_ROWS = 50_000
+# Jumlah file ekspor yang disimpan; yang paling lama dihapus lebih dulu
+MAX_FILES = 32
+
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "XLSX": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+KIND_SUMMARY = "Ringkasan"
+KIND_RECORDS = "Data Rumah Tangga"
+EXPORT_KINDS = {KIND_SUMMARY: "ringkasan", KIND_RECORDS: "rumah_tangga"}
+
+
+def export_path(kind, fmt, key, directory=EXPORT_DIR):
+    """Lokasi file cache untuk kombinasi isi, format, dan kunci filter"""
+    digest = hashlib.sha256(repr((kind, fmt, key)).encode()).hexdigest()[:20]
+    return os.path.join(directory, f"{EXPORT_KINDS[kind]}_{digest}{FORMATS[fmt][0]}")
+
+
+def record_chunks(df, rows, chunk_rows=CHUNK_ROWS):
+    """Potongan baris terpilih; subset lengkap tidak pernah dibentuk sekaligus"""
+    if len(rows) == 0:
+        yield df.iloc[:0]
+    for start in range(0, len(rows), chunk_rows):
+        yield df.iloc[rows[start:start + chunk_rows]]
+
+
+def write_chunks(chunks, path, max_files=MAX_FILES, max_age=None):
+    """Menulis potongan ke file sementara lalu memindahkannya ke ``path`` (atomik)"""
+    from skor_massal import ResultWriter
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    base, ext = os.path.splitext(path)
+    partial = f"{base}.{os.getpid()}-{threading.get_ident()}.partial{ext}"
+    writer = ResultWriter(partial)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    except BaseException:
+        writer.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    writer.close()
+    os.replace(partial, path)
+    prune(os.path.dirname(path), max_files=max_files, max_age=max_age)
+    return path
+
+
+def prune(directory=EXPORT_DIR, max_files=MAX_FILES, max_age=None):
+    """Menghapus file ekspor tertua jika jumlahnya melebihi ``max_files`` atau umurnya melebihi ``max_age`` detik"""
+    files = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(tuple(ext for ext, _ in FORMATS.values())) and ".partial" not in name
+    ]
+    files.sort(key=os.path.getmtime, reverse=True)
+    expired = files[max_files:] if max_files is not None else []
+    if max_age is not None:
+        cutoff = time.time() - max_age
+        expired += [path for path in files if path not in expired and os.path.getmtime(path) < cutoff]
+    for path in expired:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def export_file(kind, fmt, key, summary=None, records=None, directory=EXPORT_DIR):
+    """Path file ekspor; dibuat jika belum ada di cache
+
+    ``summary`` adalah DataFrame ringkasan, ``records`` pasangan (DataFrame, nomor
+    baris terpilih) untuk data rumah tangga lengkap.
+    """
+    path = export_path(kind, fmt, key, directory)
+    if os.path.exists(path):
+        return path
+    if kind == KIND_SUMMARY:
+        chunks = [summary]
+    else:
+        df, rows = records
+        chunks = record_chunks(df, rows)
+    return write_chunks(chunks, path)
+
+
+def read_export(kind, fmt, key, summary=None, records=None, directory=EXPORT_DIR):
+    """Isi file ekspor sebagai bytes; dibuat ulang jika sempat dihapus ``prune()`` proses lain"""
+    for attempt in range(2):
+        path = export_file(kind, fmt, key, summary=summary, records=records, directory=directory)
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            if attempt:
+                raise
+
+
+def file_name(kind, fmt, timestamp):
+    return f"data_stunting_{EXPORT_KINDS[kind]}_{timestamp}{FORMATS[fmt][0]}"
@@ -0,0 +1,91 @@
+"""Cache figur Plotly dalam bentuk spesifikasi JSON.
+
+Membangun figur dengan Plotly Express (validasi setiap properti) jauh lebih mahal
+daripada memuat ulang spesifikasi yang sudah jadi. ``FigureCache`` menyimpan
+hasil ``fig.to_json()`` dengan kunci (versi data, pilihan filter, jenis grafik),
+membuang entri yang paling lama tidak dipakai (LRU) saat total ukurannya melebihi
+``max_bytes``, dan membangun kembali figur tanpa validasi ulang karena
+spesifikasinya berasal dari figur yang sudah valid.
+
+Warm-up opsional (``STUNTING_WARMUP_FIGURES=1``) mengisi cache di thread latar
+untuk tampilan "Semua" dan setiap kecamatan.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+MAX_BYTES = 32 * 2 ** 20
+WARMUP_ENABLED = os.environ.get("STUNTING_WARMUP_FIGURES") == "1"
+
+
+def from_spec(spec):
+    """Figur dari spesifikasi JSON yang sudah tervalidasi (tanpa validasi ulang)"""
+    import plotly.graph_objects as go
+
+    return go.Figure(json.loads(spec), _validate=False)
+
+
+class FigureCache:
+    """Cache LRU spesifikasi figur dengan batas total ukuran (byte)"""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._specs)
+
+    def __contains__(self, key):
+        return key in self._specs
+
+    def get(self, key):
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._specs.move_to_end(key)
+            self.hits += 1
+            return spec
+
+    def put(self, key, spec):
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._specs.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self._specs[key] = spec
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._specs.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def figure(self, key, build):
+        """Figur dari cache; jika belum ada, ``build()`` dipanggil dan hasilnya disimpan"""
+        spec = self.get(key)
+        if spec is not None:
+            return from_spec(spec)
+        fig = build()
+        if fig is not None:
+            self.put(key, fig.to_json())
+        return fig
+
+    def warm_up(self, entries):
+        """Mengisi cache untuk pasangan (kunci, build) yang belum tersimpan"""
+        for key, build in entries:
+            if key not in self:
+                fig = build()
+                if fig is not None:
+                    self.put(key, fig.to_json())
+
+    def warm_up_async(self, entries):
+        thread = threading.Thread(target=self.warm_up, args=(list(entries),), daemon=True)
+        thread.start()
+        return thread
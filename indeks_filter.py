@@ -0,0 +1,101 @@
+"""Mesin filter berindeks untuk sidebar halaman visualisasi.
+
+Indeks terbalik (kategori -> array nomor baris) dibangun sekali untuk kecamatan,
+kelurahan, dan tahun, beserta hierarki kecamatan -> kelurahan. Pilihan ganda
+dalam satu filter digabung (union) dan antar filter diiris (intersection) pada
+array indeks, tanpa membandingkan ulang kolom teks.
+"""
+import numpy as np
+
+from kubus import category_codes
+
+
+def _inverted_index(codes, labels):
+    """Memetakan setiap label ke array nomor baris yang terurut"""
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    boundaries = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+    return {
+        label: order[boundaries[i]:boundaries[i + 1]]
+        for i, label in enumerate(labels)
+    }
+
+
+class FilterEngine:
+    """Opsi filter bertingkat dan pencarian baris berbasis indeks"""
+
+    def __init__(self, n_rows, indexes, hierarchy):
+        self.n_rows = n_rows
+        self.indexes = indexes
+        self.hierarchy = hierarchy
+
+    @classmethod
+    def from_frame(cls, df):
+        """Membangun indeks dari DataFrame hasil ``dataset.load_research_dataset``"""
+        indexes = {}
+        codes = {}
+        for column in ("namakecamatan", "namakelurahan", "tahun"):
+            if column not in df.columns:
+                continue
+            column_codes, labels = category_codes(df[column])
+            codes[column] = (column_codes, labels)
+            indexes[column] = _inverted_index(column_codes, labels)
+
+        # Hierarki kecamatan -> kelurahan dari pasangan kode yang muncul di data
+        kec_codes, kecamatan = codes["namakecamatan"]
+        kel_codes, kelurahan = codes["namakelurahan"]
+        valid = (kec_codes < len(kecamatan)) & (kel_codes < len(kelurahan))
+        pairs = np.unique(np.stack([kec_codes[valid], kel_codes[valid]], axis=1), axis=0)
+        hierarchy = {name: [] for name in kecamatan}
+        for kec, kel in pairs:
+            hierarchy[kecamatan[kec]].append(kelurahan[kel])
+        for names in hierarchy.values():
+            names.sort()
+        return cls(len(df), indexes, hierarchy)
+
+    @property
+    def kecamatan_options(self):
+        return sorted(self.indexes["namakecamatan"])
+
+    def kelurahan_options(self, kecamatan=None):
+        """Kelurahan yang tersedia untuk kecamatan terpilih (semua jika kosong)"""
+        if not kecamatan:
+            return sorted(self.indexes["namakelurahan"])
+        names = set()
+        for name in kecamatan:
+            names.update(self.hierarchy.get(name, []))
+        return sorted(names)
+
+    @property
+    def tahun_options(self):
+        return sorted(int(year) for year in self.indexes.get("tahun", {}))
+
+    def _union(self, column, values):
+        index = self.indexes[column]
+        parts = [index[value] for value in values if value in index]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+
+    def rows(self, kecamatan=None, kelurahan=None, tahun=None, tahun_range=None):
+        """Nomor baris yang lolos semua filter; None/daftar kosong berarti 'Semua'"""
+        selections = []
+        if kecamatan:
+            selections.append(self._union("namakecamatan", kecamatan))
+        if kelurahan:
+            selections.append(self._union("namakelurahan", kelurahan))
+        if tahun_range is not None and "tahun" in self.indexes:
+            low, high = tahun_range
+            years = [year for year in self.indexes["tahun"] if low <= year <= high]
+            selections.append(self._union("tahun", years))
+        elif tahun:
+            selections.append(self._union("tahun", tahun))
+
+        if not selections:
+            return np.arange(self.n_rows, dtype=np.int32)
+
+        # Iris mulai dari himpunan terkecil agar irisan tetap murah
+        selections.sort(key=len)
+        result = selections[0]
+        for selection in selections[1:]:
+            result = np.intersect1d(result, selection, assume_unique=True)
+        return result
@@ -0,0 +1,199 @@
+"""Inferensi Stacked LSTM (LSTM 64 -> LSTM 32 -> Dense 1) murni dengan NumPy.
+
+Modul ini menggantikan ``tensorflow.keras.models.load_model`` + ``model.predict``
+di halaman Streamlit. Seluruh perhitungan dilakukan secara vektor untuk N keluarga
+sekaligus, sehingga proses Streamlit tidak perlu memuat TensorFlow.
+"""
+import json
+import os
+
+import numpy as np
+
+MODEL_PATH = "model_lstm_stunting.h5"
+
+# Urutan fitur sesuai saat scaler dan model dilatih (lihat stunting.ipynb)
+FEATURE_COLUMNS = [
+    "baduta",
+    "balita",
+    "pus",
+    "pus_hamil",
+    "sumber_air_layak_tidak",
+    "jamban_layak_tidak",
+    "terlalu_muda",
+    "terlalu_tua",
+    "terlalu_dekat",
+    "terlalu_banyak",
+    "bukan_peserta_kb_modern",
+]
+
+# Keras menyusun bobot gate LSTM dengan urutan input, forget, cell, output
+GATE_ORDER = "ifco"
+
+# Batas ukuran salinan float sementara per blok kolom pada CompactKernel
+BLOCK_BYTES = 16 * 2 ** 10
+
+
+# Fungsi aktivasi
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class CompactKernel:
+    """Kernel presisi rendah (float16, atau int8 dengan skala per kolom keluaran).
+
+    Nilai disimpan apa adanya (mis. di-mmap dari bundel) dan baru diubah ke presisi
+    input saat perkalian ``x @ kernel``, per blok kolom sebesar ``BLOCK_BYTES``.
+    Kernel float32 utuh tidak pernah dibentuk, sehingga memori per proses tetap kecil.
+    """
+
+    # Membuat ndarray menyerahkan operator @ ke __rmatmul__ kelas ini
+    __array_ufunc__ = None
+
+    def __init__(self, values, scale=None):
+        self.values = values
+        self.scale = scale
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def dequantize(self, dtype=np.float32):
+        weights = self.values.astype(dtype)
+        return weights * self.scale if self.scale is not None else weights
+
+    def __rmatmul__(self, x):
+        rows, cols = self.values.shape
+        step = max(1, BLOCK_BYTES // (rows * x.dtype.itemsize))
+        result = np.empty(x.shape[:-1] + (cols,), dtype=x.dtype)
+        for start in range(0, cols, step):
+            block = slice(start, start + step)
+            result[..., block] = x @ self.values[:, block].astype(x.dtype)
+        if self.scale is not None:
+            result *= self.scale
+        return result
+
+
+def lstm_layer(x, kernel, recurrent_kernel, bias, return_sequences=False):
+    """Menjalankan satu layer LSTM untuk batch x berbentuk (N, T, fitur)"""
+    batch_size, timesteps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+
+    h = np.zeros((batch_size, units), dtype=x.dtype)
+    c = np.zeros((batch_size, units), dtype=x.dtype)
+
+    # Proyeksi input untuk semua timestep dihitung dalam satu matmul
+    x_proj = x @ kernel + bias
+
+    outputs = []
+    for t in range(timesteps):
+        z = x_proj[:, t, :] + h @ recurrent_kernel
+        i = sigmoid(z[:, :units])
+        f = sigmoid(z[:, units:2 * units])
+        g = np.tanh(z[:, 2 * units:3 * units])
+        o = sigmoid(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * np.tanh(c)
+        if return_sequences:
+            outputs.append(h)
+
+    if return_sequences:
+        return np.stack(outputs, axis=1)
+    return h
+
+
+class StackedLSTM:
+    """Model Stacked LSTM yang dijalankan dengan NumPy"""
+
+    def __init__(self, lstm_weights, dense_kernel, dense_bias, dtype=np.float32):
+        self.dtype = dtype
+        self.lstm_weights = [
+            tuple(w if isinstance(w, CompactKernel) else np.asarray(w, dtype=dtype) for w in weights)
+            for weights in lstm_weights
+        ]
+        self.dense_kernel = np.asarray(dense_kernel, dtype=dtype).reshape(-1, 1)
+        self.dense_bias = np.asarray(dense_bias, dtype=dtype).reshape(1)
+
+    @classmethod
+    def from_h5(cls, path=MODEL_PATH):
+        """Membaca bobot langsung dari file .h5 Keras tanpa TensorFlow"""
+        import h5py
+
+        with h5py.File(path, "r") as file:
+            config = file.attrs["model_config"]
+            if isinstance(config, bytes):
+                config = config.decode("utf-8")
+            layers = json.loads(config)["config"]["layers"]
+
+            weights_group = file["model_weights"] if "model_weights" in file else file
+            lstm_weights = []
+            dense_weights = None
+            for layer in layers:
+                class_name = layer["class_name"]
+                if class_name not in ("LSTM", "Dense"):
+                    continue
+                arrays = _read_layer_arrays(weights_group[layer["config"]["name"]])
+                if class_name == "LSTM":
+                    lstm_weights.append(
+                        (arrays["kernel"], arrays["recurrent_kernel"], arrays["bias"])
+                    )
+                else:
+                    dense_weights = (arrays["kernel"], arrays["bias"])
+
+        if not lstm_weights or dense_weights is None:
+            raise ValueError(f"Topologi model pada '{path}' tidak dikenali")
+        return cls(lstm_weights, *dense_weights)
+
+    @property
+    def n_features(self):
+        return self.lstm_weights[0][0].shape[0]
+
+    def predict_proba(self, x):
+        """Probabilitas risiko untuk input (N, fitur) atau (N, T, fitur)"""
+        x = np.asarray(x, dtype=self.dtype)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if x.ndim == 2:
+            x = x[:, np.newaxis, :]
+        if x.shape[-1] != self.n_features:
+            raise ValueError(
+                f"Jumlah fitur harus {self.n_features}, diterima {x.shape[-1]}"
+            )
+
+        h = x
+        last = len(self.lstm_weights) - 1
+        for index, (kernel, recurrent_kernel, bias) in enumerate(self.lstm_weights):
+            # Dropout tidak aktif saat inferensi sehingga tidak perlu dihitung
+            h = lstm_layer(h, kernel, recurrent_kernel, bias, return_sequences=index < last)
+
+        logits = h @ self.dense_kernel + self.dense_bias
+        return sigmoid(logits)[:, 0]
+
+
+def _read_layer_arrays(group):
+    """Mengambil kernel, recurrent_kernel, dan bias dari grup layer di file .h5"""
+    arrays = {}
+
+    def visit(name, obj):
+        if hasattr(obj, "shape"):
+            # Keras 2 memberi akhiran ':0' pada nama dataset
+            key = name.rsplit("/", 1)[-1].split(":")[0]
+            arrays[key] = obj[()]
+
+    group.visititems(visit)
+    return arrays
+
+
+def load_model(path=None):
+    """Memuat model Stacked LSTM; bundel biner diutamakan, file .h5 sebagai cadangan"""
+    from bobot import BUNDLE_PATH, load_bundle
+
+    path = path or BUNDLE_PATH
+    if os.path.isdir(path):
+        return load_bundle(path).to_model()
+    if path == BUNDLE_PATH:
+        path = MODEL_PATH
+    return StackedLSTM.from_h5(path)
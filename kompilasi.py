@@ -0,0 +1,147 @@
+"""Kompilasi bundel inferensi: MinMaxScaler dilipat ke layer LSTM pertama.
+
+Contoh:
+    python kompilasi.py
+    python kompilasi.py --keras
+
+Bundel ``model_bundle_fused/`` menerima input mentah 0/1 langsung (tanpa
+scaler, scikit-learn, maupun DataFrame) dan dilengkapi tabel prediksinya.
+Bobot dan parameter scaler diambil dari bundel ``--source`` itu sendiri, jadi
+hash sumber di header selalu sesuai dengan isinya. Bundel ditulis ke folder
+sementara lalu dibandingkan dengan bundel sumber pada seluruh 2^11 pola input
+biner dan 1000 input acak di rentang [0, 1]; lipatan scaler juga diuji dengan
+scaler acak non-identitas. ``--keras`` menambahkan perbandingan dengan jalur
+lama (``scaler.pkl`` + model Keras, bermakna jika sumbernya diekspor dari file
+tersebut). Hanya jika semua selisih dalam toleransi, bundel dipindahkan ke
+tempatnya; laporan disimpan sebagai ``laporan_kompilasi.json`` di folder bundel.
+
+Halaman Klasifikasi memakai bundel ini secara otomatis selama hash sumbernya
+sama dengan ``model_bundle/`` (lihat ``bobot.active_bundle_path``).
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from bobot import (
+    BUNDLE_PATH, bundle_arrays, default_bundle_path, fold_scaler, fuse_arrays, load_bundle, replace_bundle,
+    staging_path, write_bundle,
+)
+from inferensi import MODEL_PATH, StackedLSTM
+from tabel_prediksi import TOLERANCE, all_binary_inputs, build_table, score_with_model
+
+REPORT_FILE = "laporan_kompilasi.json"
+N_RANDOM = 1000
+
+
+def check_inputs(n_features, seed=42):
+    """Seluruh pola biner ditambah input acak di rentang [0, 1]"""
+    random_inputs = np.random.default_rng(seed).random((N_RANDOM, n_features), dtype=np.float32)
+    return np.vstack([all_binary_inputs(n_features), random_inputs])
+
+
+def check_fold(model, inputs, seed=0):
+    """Selisih maksimum model dengan scaler acak vs model dengan scaler terlipat"""
+    rng = np.random.default_rng(seed)
+    scale = rng.uniform(0.2, 3.0, model.n_features).astype(np.float32)
+    min_ = rng.uniform(-1.0, 1.0, model.n_features).astype(np.float32)
+
+    (kernel, recurrent_kernel, bias), *rest = model.lstm_weights
+    folded_kernel, folded_bias = fold_scaler(kernel, bias, scale, min_)
+    folded = StackedLSTM(
+        [(folded_kernel, recurrent_kernel, folded_bias), *rest], model.dense_kernel, model.dense_bias
+    )
+    reference = model.predict_proba(inputs * scale + min_)
+    return float(np.max(np.abs(reference - folded.predict_proba(inputs))))
+
+
+def keras_reference(inputs):
+    """Probabilitas lewat jalur lama: scaler.pkl pada DataFrame lalu model Keras"""
+    import pickle
+
+    import pandas as pd
+    import tensorflow as tf
+
+    from bobot import SCALER_PATH
+
+    with open(SCALER_PATH, "rb") as file:
+        scaler = pickle.load(file)
+    frame = pd.DataFrame(inputs, columns=getattr(scaler, "feature_names_in_", None))
+    scaled = scaler.transform(frame).astype(np.float32)
+    keras_model = tf.keras.models.load_model(MODEL_PATH)
+    return keras_model.predict(scaled.reshape(len(inputs), 1, -1), verbose=0)[:, 0]
+
+
+def compile_bundle(source_path=BUNDLE_PATH, bundle_path=None, use_keras=False):
+    """Menyusun bundel terkompilasi dari ``source_path``, memeriksanya, lalu memasangnya
+
+    Bundel di ``bundle_path`` hanya diganti jika semua selisih dalam ``TOLERANCE``;
+    laporan dikembalikan dengan ``installed`` menandakan hasilnya.
+    """
+    bundle_path = bundle_path or default_bundle_path("float32", fused=True)
+    source = load_bundle(source_path)
+    if source.fused:
+        raise ValueError(f"Bundel sumber '{source_path}' sudah terkompilasi")
+
+    staging = staging_path(bundle_path)
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        write_bundle(
+            fuse_arrays(bundle_arrays(source)), staging, source.features, fused=True, source_sha256=source.sha256
+        )
+        build_table(staging)
+        fused = load_bundle(staging)
+
+        inputs = check_inputs(len(fused.features))
+        fused_result = score_with_model(fused, inputs)
+        report = {
+            "bundle_sha256": fused.sha256,
+            "source_sha256": source.sha256,
+            "rows": int(len(inputs)),
+            "tolerance": TOLERANCE,
+            "max_abs_diff": float(np.max(np.abs(score_with_model(source, inputs) - fused_result))),
+            "random_scaler_max_abs_diff": check_fold(source.to_model(), inputs),
+        }
+        if use_keras:
+            report["keras_max_abs_diff"] = float(np.max(np.abs(keras_reference(inputs) - fused_result)))
+
+        report["installed"] = max(value for name, value in report.items() if name.endswith("_diff")) <= TOLERANCE
+        if report["installed"]:
+            with open(os.path.join(staging, REPORT_FILE), "w") as file:
+                json.dump(report, file, indent=2)
+            replace_bundle(staging, bundle_path)
+        return report
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompilasi bundel inferensi dengan scaler terlipat")
+    parser.add_argument("--source", default=BUNDLE_PATH, help="Bundel float32 sumber")
+    parser.add_argument("--bundle", default=None, help="Folder bundel terkompilasi (bawaan: <sumber>_fused)")
+    parser.add_argument("--keras", action="store_true", help="Bandingkan juga dengan scaler.pkl + model Keras")
+    args = parser.parse_args()
+
+    bundle_path = args.bundle or f"{args.source}_fused"
+    report = compile_bundle(args.source, bundle_path, use_keras=args.keras)
+    checks = {
+        "bundel sumber": report["max_abs_diff"],
+        "scaler acak": report["random_scaler_max_abs_diff"],
+    }
+    if "keras_max_abs_diff" in report:
+        checks["Keras + scaler.pkl"] = report["keras_max_abs_diff"]
+
+    print(f"Bundel terkompilasi dari '{args.source}' ({report['rows']:,} input diperiksa)")
+    for name, diff in checks.items():
+        print(f"  Selisih maks vs {name:<20}: {diff:.3e}")
+    if not report["installed"]:
+        print(f"GAGAL: selisih melebihi toleransi {TOLERANCE:.0e}; '{bundle_path}' tidak diubah")
+        sys.exit(1)
+    print(f"OK: bundel terkompilasi setara (toleransi {TOLERANCE:.0e}), disimpan ke '{bundle_path}'")
+
+
+if __name__ == "__main__":
+    main()
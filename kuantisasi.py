@@ -0,0 +1,145 @@
+"""Ekspor bobot presisi rendah (float16 / int8) beserta laporan akurasinya.
+
+Contoh:
+    python kuantisasi.py
+    python kuantisasi.py --precision int8
+
+Setiap varian diekspor ke folder sementara lengkap dengan tabel prediksinya,
+dibandingkan dengan bundel float32 pada data uji hold-out (pembagian 80/20
+berstrata, ``random_state=42`` seperti di ``stunting.ipynb``) dan pada seluruh
+2^11 pola input biner, lalu dipindahkan ke ``model_bundle_<presisi>/`` per file
+dengan os.replace (proses yang sedang memetakan bundel lama tidak terganggu).
+Laporan disimpan sebagai ``laporan_presisi.json`` di folder bundel varian; jika
+data penelitian tidak tersedia, ``holdout`` bernilai null beserta alasannya.
+
+Varian dipakai dengan ``python skor_massal.py ... --bundle model_bundle_int8`` atau
+``python layanan.py --bundle model_bundle_int8``. ``bobot.active_bundle_path`` menolak
+varian yang laporannya tidak memuat evaluasi hold-out, jadi varian hanya bisa dipakai
+setelah dievaluasi pada data penelitian.
+"""
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from bobot import (
+    BUNDLE_PATH, PRECISION_REPORT_FILE, default_bundle_path, export_bundle, load_bundle, replace_bundle, staging_path,
+)
+from tabel_prediksi import all_binary_inputs, build_table, score_with_model
+
+REPORT_FILE = PRECISION_REPORT_FILE
+THRESHOLD = 0.5
+HOLDOUT_MISSING = "data penelitian tidak tersedia saat laporan dibuat; hanya pola input biner yang dibandingkan"
+
+
+def holdout_data(seed=42):
+    """Data uji hold-out yang sama dengan notebook pelatihan"""
+    from pelatihan import load_training_data
+
+    x, y = load_training_data()
+    _, x_test, _, y_test = train_test_split(x, y, test_size=0.2, random_state=seed, stratify=y)
+    return x_test.to_numpy(dtype=np.float32), y_test
+
+
+def kernel_bytes(bundle):
+    """Ukuran kernel LSTM di bundel (termasuk skala int8)"""
+    return int(sum(
+        bundle[name].nbytes for name in bundle.header["arrays"]
+        if name.startswith("lstm") and "kernel" in name
+    ))
+
+
+def compare(reference, candidate, y=None):
+    """Selisih probabilitas dan keputusan ambang 0,5 antara dua model"""
+    agree = (reference > THRESHOLD) == (candidate > THRESHOLD)
+    result = {
+        "rows": int(len(reference)),
+        "max_abs_diff": float(np.max(np.abs(reference - candidate))),
+        "decision_agreement": float(agree.mean()),
+        "decision_flips": int((~agree).sum()),
+    }
+    if y is not None and len(np.unique(y)) > 1:
+        result["auc_float32"] = float(roc_auc_score(y, reference))
+        result["auc"] = float(roc_auc_score(y, candidate))
+    return result
+
+
+def accuracy_report(bundle_path, reference_path=BUNDLE_PATH, holdout=None):
+    """Laporan akurasi satu varian terhadap bundel float32"""
+    reference = load_bundle(reference_path)
+    candidate = load_bundle(bundle_path)
+
+    patterns = all_binary_inputs(len(candidate.features))
+    report = {
+        "precision": candidate.precision,
+        "bundle_sha256": candidate.sha256,
+        "reference_sha256": reference.sha256,
+        "kernel_bytes": kernel_bytes(candidate),
+        "kernel_bytes_float32": kernel_bytes(reference),
+        "binary_patterns": compare(score_with_model(reference, patterns), score_with_model(candidate, patterns)),
+    }
+    if holdout is not None:
+        x_test, y_test = holdout
+        report["holdout"] = compare(
+            score_with_model(reference, x_test), score_with_model(candidate, x_test), y_test
+        )
+    else:
+        report["holdout"] = None
+        report["holdout_note"] = HOLDOUT_MISSING
+    return report
+
+
+def export_variant(precision, holdout=None, model_path=None, scaler_path=None):
+    """Mengekspor satu varian ke folder sementara, menulis laporannya, lalu memasangnya"""
+    bundle_path = default_bundle_path(precision)
+    staging = staging_path(bundle_path)
+    shutil.rmtree(staging, ignore_errors=True)
+    paths = {name: path for name, path in (("model_path", model_path), ("scaler_path", scaler_path)) if path}
+    try:
+        export_bundle(bundle_path=staging, precision=precision, **paths)
+        build_table(staging)
+        report = accuracy_report(staging, holdout=holdout)
+        with open(os.path.join(staging, REPORT_FILE), "w") as file:
+            json.dump(report, file, indent=2)
+        replace_bundle(staging, bundle_path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return bundle_path, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor bobot presisi rendah dan laporan akurasi")
+    parser.add_argument("--precision", nargs="+", choices=["float16", "int8"], default=["float16", "int8"])
+    parser.add_argument("--no-holdout", action="store_true", help="Lewati evaluasi pada data penelitian")
+    args = parser.parse_args()
+
+    holdout = None
+    if not args.no_holdout:
+        try:
+            holdout = holdout_data()
+        except FileNotFoundError:
+            print("Data penelitian tidak ditemukan; hanya membandingkan 2^11 pola input biner.")
+
+    for precision in args.precision:
+        bundle_path, report = export_variant(precision, holdout=holdout)
+        patterns = report["binary_patterns"]
+        print(f"[{precision}] disimpan ke '{bundle_path}'")
+        print(f"  Kernel LSTM        : {report['kernel_bytes']:,} byte "
+              f"(float32: {report['kernel_bytes_float32']:,} byte)")
+        print(f"  Pola biner (2^11)  : selisih maks {patterns['max_abs_diff']:.2e}, "
+              f"keputusan berubah {patterns['decision_flips']}")
+        if report["holdout"] is not None:
+            result = report["holdout"]
+            auc = f"AUC {result['auc']:.4f} (float32 {result['auc_float32']:.4f}), " if "auc" in result else ""
+            print(f"  Data uji ({result['rows']:,} baris): {auc}"
+                  f"keputusan sama {result['decision_agreement']:.2%}")
+        else:
+            print("  Data uji hold-out tidak dievaluasi; varian ini ditolak oleh active_bundle_path")
+
+
+if __name__ == "__main__":
+    main()
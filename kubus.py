@@ -0,0 +1,231 @@
+"""Kubus jumlah data kecamatan x kelurahan x tahun x status risiko.
+
+Kubus dibangun sekali saat data dimuat. Setiap perubahan filter di dashboard cukup
+memotong (slice) dan menjumlahkan beberapa ribu sel, bukan memindai seluruh baris
+keluarga. Metrik, grafik, tabel ringkasan, dan titik peta semuanya dilayani dari
+kubus ini.
+
+Setiap sumbu memiliki satu slot tambahan di akhir untuk nilai kosong, sehingga
+total tetap sama dengan jumlah baris, sedangkan tabel per wilayah mengabaikan
+wilayah kosong (sama seperti ``groupby``).
+"""
+import numpy as np
+import pandas as pd
+
+
+def category_codes(series):
+    """Kode kategori dan labelnya; kode -1 (kosong) dipindah ke slot terakhir"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy().astype(np.int64)
+        labels = list(series.cat.categories)
+    else:
+        codes, labels = pd.factorize(series, sort=True)
+        labels = list(labels)
+    codes = np.where(codes < 0, len(labels), codes)
+    return codes, labels
+
+
+def label_positions(value, labels, value_range=None):
+    """Posisi label terpilih (nilai tunggal, daftar, atau rentang); None berarti semua"""
+    if value_range is not None:
+        low, high = value_range
+        return np.array([i for i, label in enumerate(labels) if low <= label <= high], dtype=np.int64)
+    if value is None:
+        return None
+    values = value if isinstance(value, (list, tuple, set, np.ndarray)) else [value]
+    lookup = {label: i for i, label in enumerate(labels)}
+    return np.array(sorted(lookup[v] for v in values if v in lookup), dtype=np.int64)
+
+
+class CountCube:
+    """Kubus jumlah data beserta jumlah koordinat untuk peta"""
+
+    def __init__(self, counts, geo_counts, lat_sum, lon_sum, kecamatan, kelurahan, tahun, risiko):
+        self.counts = counts            # (kec, kel, tahun, risiko) semua baris
+        self.geo_counts = geo_counts    # (kec, kel, tahun, risiko) baris dengan koordinat
+        self.lat_sum = lat_sum          # (kec, kel, tahun)
+        self.lon_sum = lon_sum          # (kec, kel, tahun)
+        self.kecamatan = kecamatan
+        self.kelurahan = kelurahan
+        self.tahun = tahun
+        self.risiko = risiko
+
+    @classmethod
+    def from_frame(cls, df):
+        """Membangun kubus dari DataFrame hasil ``dataset.load_research_dataset``"""
+        kec_codes, kecamatan = category_codes(df["namakecamatan"])
+        kel_codes, kelurahan = category_codes(df["namakelurahan"])
+        risk_codes, risiko = category_codes(df["risiko_stunting"])
+        if "tahun" in df.columns:
+            year_codes, tahun = category_codes(df["tahun"])
+        else:
+            year_codes, tahun = np.zeros(len(df), dtype=np.int64), []
+
+        shape = (len(kecamatan) + 1, len(kelurahan) + 1, len(tahun) + 1, len(risiko) + 1)
+        cell = np.ravel_multi_index((kec_codes, kel_codes, year_codes, risk_codes), shape)
+        size = int(np.prod(shape))
+        counts = np.bincount(cell, minlength=size).reshape(shape)
+
+        if "lat" in df.columns and "lon" in df.columns:
+            lat = df["lat"].to_numpy(dtype=np.float64)
+            lon = df["lon"].to_numpy(dtype=np.float64)
+            has_geo = ~(np.isnan(lat) | np.isnan(lon))
+        else:
+            lat = lon = np.zeros(len(df))
+            has_geo = np.zeros(len(df), dtype=bool)
+
+        geo_counts = np.bincount(cell[has_geo], minlength=size).reshape(shape)
+        place = cell[has_geo] // shape[3]
+        lat_sum = np.bincount(place, weights=lat[has_geo], minlength=size // shape[3]).reshape(shape[:3])
+        lon_sum = np.bincount(place, weights=lon[has_geo], minlength=size // shape[3]).reshape(shape[:3])
+        return cls(counts, geo_counts, lat_sum, lon_sum, kecamatan, kelurahan, tahun, risiko)
+
+    @classmethod
+    def combine(cls, cubes):
+        """Menggabungkan kubus beberapa partisi; label setiap sumbu disatukan"""
+        cubes = list(cubes)
+        if len(cubes) == 1:
+            return cubes[0]
+
+        axes = []
+        for name in ("kecamatan", "kelurahan", "tahun", "risiko"):
+            labels = list(dict.fromkeys(label for cube in cubes for label in getattr(cube, name)))
+            # Urutan status risiko dipertahankan, sumbu lain diurutkan seperti category_codes
+            axes.append(labels if name == "risiko" else sorted(labels))
+
+        shape = tuple(len(labels) + 1 for labels in axes)
+        counts = np.zeros(shape, dtype=np.int64)
+        geo_counts = np.zeros(shape, dtype=np.int64)
+        lat_sum = np.zeros(shape[:3])
+        lon_sum = np.zeros(shape[:3])
+        for cube in cubes:
+            positions = []
+            for name, labels in zip(("kecamatan", "kelurahan", "tahun", "risiko"), axes):
+                lookup = {label: i for i, label in enumerate(labels)}
+                # Slot nilai kosong tetap di akhir sumbu
+                positions.append(np.array([lookup[label] for label in getattr(cube, name)] + [len(labels)]))
+            index = np.ix_(*positions)
+            counts[index] += cube.counts
+            geo_counts[index] += cube.geo_counts
+            lat_sum[np.ix_(*positions[:3])] += cube.lat_sum
+            lon_sum[np.ix_(*positions[:3])] += cube.lon_sum
+        return cls(counts, geo_counts, lat_sum, lon_sum, *axes)
+
+    def select(self, kecamatan=None, kelurahan=None, tahun=None, tahun_range=None):
+        """Potongan kubus untuk filter; nilai bisa tunggal atau daftar, None berarti 'Semua'"""
+        positions = []
+        for axis, (value, labels, value_range) in enumerate((
+            (kecamatan, self.kecamatan, None),
+            (kelurahan, self.kelurahan, None),
+            (tahun, self.tahun, tahun_range),
+        )):
+            selected = label_positions(value, labels, value_range)
+            # 'Semua' ikut menghitung slot nilai kosong di akhir sumbu
+            positions.append(np.arange(self.counts.shape[axis]) if selected is None else selected)
+        return CubeView(self, positions)
+
+
+class CubeView:
+    """Hasil filter pada kubus; semua agregat dihitung dengan penjumlahan sel"""
+
+    def __init__(self, cube, positions):
+        self.cube = cube
+        index = np.ix_(*positions)
+        self.counts = cube.counts[index]
+        self.geo_counts = cube.geo_counts[index]
+        self.lat_sum = cube.lat_sum[index]
+        self.lon_sum = cube.lon_sum[index]
+        # Label setiap sumbu pada potongan ini (None = slot nilai kosong)
+        self.kecamatan = np.asarray(list(cube.kecamatan) + [None], dtype=object)[positions[0]]
+        self.kelurahan = np.asarray(list(cube.kelurahan) + [None], dtype=object)[positions[1]]
+        self.risiko = list(cube.risiko)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    @property
+    def empty(self):
+        return self.total == 0
+
+    def risk_totals(self):
+        """Jumlah per status risiko (hanya status yang muncul)"""
+        totals = pd.Series(self.counts.sum(axis=(0, 1, 2))[:-1], index=self.risiko)
+        return totals[totals > 0]
+
+    def count(self, risk):
+        return int(self.risk_totals().get(risk, 0))
+
+    def _risk_table(self, counts, labels, name):
+        """Tabel wilayah x status risiko tanpa wilayah kosong dan kolom nol"""
+        keep = np.array([label is not None for label in labels], dtype=bool)
+        table = pd.DataFrame(counts[keep, :-1], index=pd.Index(labels[keep], name=name), columns=self.risiko)
+        return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+    def by_kecamatan(self):
+        return self._risk_table(self.counts.sum(axis=(1, 2)), self.kecamatan, "namakecamatan")
+
+    def by_kelurahan(self):
+        return self._risk_table(self.counts.sum(axis=(0, 2)), self.kelurahan, "namakelurahan")
+
+    def _places(self, counts):
+        """Pasangan (kecamatan, kelurahan) yang terisi dan bukan wilayah kosong"""
+        kec_idx, kel_idx = np.nonzero(counts.sum(axis=-1))
+        valid = np.array(
+            [self.kecamatan[k] is not None and self.kelurahan[j] is not None for k, j in zip(kec_idx, kel_idx)],
+            dtype=bool,
+        )
+        return kec_idx[valid], kel_idx[valid]
+
+    def summary(self):
+        """Tabel kecamatan, kelurahan, dan jumlah per status risiko"""
+        counts = self.counts.sum(axis=2)
+        kec_idx, kel_idx = self._places(counts)
+        table = pd.DataFrame(counts[kec_idx, kel_idx, :-1], columns=self.risiko)
+        table = table.loc[:, table.sum(axis=0) > 0]
+        table.insert(0, "namakelurahan", self.kelurahan[kel_idx])
+        table.insert(0, "namakecamatan", self.kecamatan[kec_idx])
+        return table
+
+    def center(self):
+        """Rata-rata koordinat semua baris pada potongan ini"""
+        n = self.geo_counts.sum()
+        if n == 0:
+            return None
+        return float(self.lat_sum.sum() / n), float(self.lon_sum.sum() / n)
+
+    def map_points(self):
+        """Satu titik per kelurahan: rata-rata koordinat, status dominan, dan distribusi"""
+        geo = self.geo_counts.sum(axis=2)
+        lat_sum = self.lat_sum.sum(axis=2)
+        lon_sum = self.lon_sum.sum(axis=2)
+
+        kec_idx, kel_idx = self._places(geo)
+        points = pd.DataFrame({
+            "kel": kel_idx,
+            "namakecamatan": self.kecamatan[kec_idx],
+            "n": geo[kec_idx, kel_idx].sum(axis=1),
+            "lat_sum": lat_sum[kec_idx, kel_idx],
+            "lon_sum": lon_sum[kec_idx, kel_idx],
+        })
+        distribution = pd.DataFrame(geo[kec_idx, kel_idx, :-1], columns=self.risiko)
+        points = pd.concat([points, distribution], axis=1)
+
+        # Satu kelurahan bisa tercatat di lebih dari satu kecamatan; gabungkan per kelurahan
+        # agar sama dengan groupby('namakelurahan') pada data mentah
+        grouped = points.groupby("kel", sort=True)
+        merged = grouped[["n", "lat_sum", "lon_sum"] + self.risiko].sum()
+        merged["namakecamatan"] = grouped["namakecamatan"].first()
+
+        risk_counts = merged[self.risiko].to_numpy()
+        result = pd.DataFrame({
+            "namakelurahan": self.kelurahan[merged.index.to_numpy()],
+            "lat": (merged["lat_sum"] / merged["n"]).to_numpy(),
+            "lon": (merged["lon_sum"] / merged["n"]).to_numpy(),
+            "risiko_stunting": np.asarray(self.risiko, dtype=object)[risk_counts.argmax(axis=1)]
+            if len(merged) else np.array([], dtype=object),
+            "namakecamatan": merged["namakecamatan"].to_numpy(),
+        })
+        distribution = pd.DataFrame(risk_counts, columns=self.risiko)
+        distribution = distribution.loc[:, distribution.sum(axis=0) > 0]
+        return pd.concat([result, distribution], axis=1)
@@ -0,0 +1,311 @@
+"""Layanan HTTP lokal untuk prediksi risiko stunting (ASGI, Starlette + uvicorn).
+
+Contoh:
+    python layanan.py
+    python layanan.py --port 8600 --max-batch 128 --max-wait-ms 5
+    python layanan.py --bundle model_bundle_int8
+
+Endpoint:
+    POST /predict        satu keluarga, 11 indikator seperti ``family_data`` di
+                         halaman Klasifikasi (nilai 0/1, Ya/Tidak, atau V/X)
+    POST /predict/batch  daftar keluarga (atau ``{"records": [...]}``), diskor
+                         dengan satu panggilan prediksi
+    GET  /metrics        histogram latensi (per endpoint dan status HTTP) dan ukuran
+                         batch (format Prometheus)
+    GET  /health         status dan hash bundel model
+
+Permintaan tunggal yang datang bersamaan dikumpulkan oleh ``MicroBatcher``:
+permintaan pertama membuka batch, lalu batch ditutup saat berisi ``max_batch``
+baris atau ``max_wait_ms`` terlewati, dan seluruh isinya diskor dalam satu
+forward pass. Bundel dipilih dengan ``bobot.active_bundle_path`` seperti di
+dashboard (varian presisi rendah tanpa evaluasi hold-out ditolak). Layanan hanya
+membutuhkan bundel model di disk serta Starlette dan uvicorn (tercantum di
+requirements.txt).
+"""
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+from bobot import BUNDLE_PATH, active_bundle_path
+from dataset import INDICATOR_MAPPING
+from inferensi import FEATURE_COLUMNS
+from skoring import FACTOR_LOOKUP, LABEL_NO_RISK, LABEL_RISK, THRESHOLD
+from tabel_prediksi import encode, load_predictor
+
+MAX_BATCH = 64
+MAX_WAIT_MS = 2.0
+MAX_BULK_ROWS = 100_000
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 1024, 4096, 16384, 65536)
+
+
+class InvalidRecord(ValueError):
+    """Data keluarga tidak sesuai skema 11 indikator"""
+
+
+class Histogram:
+    """Histogram dengan ember tetap per kombinasi label, diekspor sebagai teks Prometheus"""
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self.series.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["buckets"][index] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def to_prometheus(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.series.items()):
+            labels = ",".join(f'{name}="{value}"' for name, value in key)
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, series["buckets"]):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series["count"]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series['count']}")
+        return lines
+
+
+def encode_record(record):
+    """Mengodekan satu keluarga (dict 11 indikator) menjadi baris 0/1"""
+    if not isinstance(record, dict):
+        raise InvalidRecord("Data keluarga harus berupa objek JSON")
+    missing = [col for col in FEATURE_COLUMNS if col not in record]
+    if missing:
+        raise InvalidRecord(f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+    row = np.empty(len(FEATURE_COLUMNS), dtype=np.float32)
+    invalid = []
+    for index, col in enumerate(FEATURE_COLUMNS):
+        value = INDICATOR_MAPPING.get(str(record[col]).strip().upper())
+        if value is None:
+            invalid.append(col)
+        else:
+            row[index] = value
+    if invalid:
+        raise InvalidRecord(f"Nilai tidak dikenali pada kolom: {', '.join(invalid)}")
+    return row
+
+
+def format_results(rows, probabilities):
+    """Hasil prediksi dalam bentuk yang sama dengan kolom skoring massal"""
+    factors = FACTOR_LOOKUP[encode(rows)]
+    return [
+        {
+            "probabilitas": float(probability),
+            "hasil": LABEL_RISK if probability >= THRESHOLD else LABEL_NO_RISK,
+            "faktor_risiko": factor,
+        }
+        for probability, factor in zip(probabilities, factors)
+    ]
+
+
+class MicroBatcher:
+    """Menggabungkan permintaan tunggal yang bersamaan menjadi satu forward pass"""
+
+    def __init__(self, predictor, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, batch_sizes=None):
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = batch_sizes
+        self._queue = None
+        self._task = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row):
+        """Mengantrekan satu baris dan menunggu probabilitasnya"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        # Permintaan pertama membuka batch; sisanya ditunggu sampai penuh atau batas waktu
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Klien yang sudah memutus koneksi tidak perlu diskor
+            batch = [(row, future) for row, future in batch if not future.done()]
+            if not batch:
+                continue
+            rows = np.stack([row for row, _ in batch])
+            try:
+                # Forward pass di thread agar event loop tetap menerima permintaan
+                probabilities = await asyncio.to_thread(self.predictor.predict_proba, rows)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            if self.batch_sizes is not None:
+                self.batch_sizes.observe(len(batch), endpoint="predict")
+            for (_, future), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(float(probability))
+
+
+def create_app(bundle_path=BUNDLE_PATH, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+    """Membangun aplikasi ASGI; bundel model dimuat sekali saat aplikasi dibuat"""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse
+    from starlette.routing import Route
+
+    # Bundel dipilih seperti di dashboard: bundel terkompilasi jika masih sesuai dengan sumbernya
+    bundle_path = active_bundle_path(bundle_path)
+    predictor = load_predictor(bundle_path)
+    latency = Histogram("stunting_request_seconds", "Latensi permintaan per endpoint", LATENCY_BUCKETS)
+    batch_sizes = Histogram("stunting_batch_size", "Jumlah baris per forward pass", BATCH_SIZE_BUCKETS)
+    batcher = MicroBatcher(predictor, max_batch=max_batch, max_wait_ms=max_wait_ms, batch_sizes=batch_sizes)
+
+    async def read_json(request):
+        try:
+            return await request.json()
+        except ValueError:
+            raise InvalidRecord("Body permintaan bukan JSON yang valid")
+
+    def timed(endpoint, handler):
+        """Mencatat latensi setiap permintaan, termasuk 422 dan error, dengan label status"""
+        async def wrapper(request):
+            start = time.perf_counter()
+            # Exception yang lolos dijawab 500 oleh Starlette; koneksi terputus dicatat 499
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except asyncio.CancelledError:
+                status = 499
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start, endpoint=endpoint, status=status)
+        return wrapper
+
+    async def predict(request):
+        try:
+            row = encode_record(await read_json(request))
+        except InvalidRecord as exc:
+            return JSONResponse({"error": str(exc)}, status_code=422)
+        probability = await batcher.submit(row)
+        return JSONResponse(format_results(row[np.newaxis], [probability])[0])
+
+    async def predict_batch(request):
+        try:
+            payload = await read_json(request)
+            records = payload.get("records") if isinstance(payload, dict) else payload
+            if not isinstance(records, list) or not records:
+                raise InvalidRecord("Body harus berupa daftar keluarga atau {\"records\": [...]}")
+            if len(records) > MAX_BULK_ROWS:
+                raise InvalidRecord(f"Maksimal {MAX_BULK_ROWS:,} keluarga per permintaan")
+            rows = np.empty((len(records), len(FEATURE_COLUMNS)), dtype=np.float32)
+            for index, record in enumerate(records):
+                try:
+                    rows[index] = encode_record(record)
+                except InvalidRecord as exc:
+                    raise InvalidRecord(f"Baris {index}: {exc}")
+        except InvalidRecord as exc:
+            return JSONResponse({"error": str(exc)}, status_code=422)
+
+        probabilities = await asyncio.to_thread(predictor.predict_proba, rows)
+        batch_sizes.observe(len(rows), endpoint="predict_batch")
+        return JSONResponse({"results": format_results(rows, probabilities)})
+
+    async def metrics(request):
+        lines = latency.to_prometheus() + batch_sizes.to_prometheus()
+        return PlainTextResponse("\n".join(lines) + "\n")
+
+    async def health(request):
+        return JSONResponse({
+            "status": "ok",
+            "bundle_path": bundle_path,
+            "bundle_sha256": predictor.bundle.sha256,
+            "precision": predictor.bundle.precision,
+            "features": predictor.features,
+            "max_batch": batcher.max_batch,
+            "max_wait_ms": batcher.max_wait * 1000,
+        })
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await batcher.start()
+        try:
+            yield
+        finally:
+            await batcher.stop()
+
+    app = Starlette(
+        routes=[
+            Route("/predict", timed("predict", predict), methods=["POST"]),
+            Route("/predict/batch", timed("predict_batch", predict_batch), methods=["POST"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.batcher = batcher
+    app.state.latency = latency
+    app.state.batch_sizes = batch_sizes
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Layanan HTTP lokal prediksi risiko stunting")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--bundle", default=BUNDLE_PATH,
+                        help="Folder bundel model (bundel terkompilasinya dipakai jika masih sesuai)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="Baris maksimum per forward pass")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help="Waktu tunggu maksimum untuk mengisi batch (milidetik)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    try:
+        app = create_app(args.bundle, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    except ValueError as error:
+        raise SystemExit(f"GAGAL: {error}")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
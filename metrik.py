@@ -0,0 +1,273 @@
+"""Pengukuran waktu per rerun halaman Streamlit dan ekspor metrik.
+
+Setiap rerun halaman dicatat sebagai satu ``RerunTimer``; tahap-tahap di dalamnya
+diukur dengan ``span("nama")``. Fungsi ber-cache memanggil ``cache_miss("nama")``
+di badannya (badan hanya berjalan saat miss), sehingga span dengan
+``cache="nama"`` tahu apakah pemanggilannya hit atau miss.
+
+Hasil setiap rerun ditambahkan sebagai satu baris JSON ke ``metrik_dashboard.jsonl``
+(diputar saat melebihi ``MAX_BYTES``). Panel debug di sidebar muncul jika URL
+berisi ``?debug=1`` atau variabel lingkungan ``STUNTING_DEBUG=1``.
+
+Ringkasan p50/p95 per tahap dan jumlah hit/miss cache:
+    python metrik.py
+    python metrik.py --format prometheus > metrik.prom
+"""
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+METRICS_PATH = os.environ.get("STUNTING_METRICS_PATH", "metrik_dashboard.jsonl")
+MAX_BYTES = 5 * 2 ** 20
+RECENT_RERUNS = 500
+
+_local = threading.local()
+_file_lock = threading.Lock()
+# Rerun terakhir di proses ini, untuk p50/p95 di panel debug tanpa membaca file
+_recent = deque(maxlen=RECENT_RERUNS)
+
+
+class RerunTimer:
+    """Pencatat waktu satu rerun halaman"""
+
+    def __init__(self, page):
+        self.page = page
+        self.spans = []
+        self.cache = defaultdict(lambda: {"hit": 0, "miss": 0})
+        self._start = None
+        self.total = None
+
+    def start(self):
+        _local.timer = self
+        self._start = time.perf_counter()
+        return self
+
+    def finish(self, path=METRICS_PATH):
+        """Menutup rerun, menyimpan ke file metrik, dan menampilkan panel debug jika aktif"""
+        self.total = time.perf_counter() - self._start
+        if getattr(_local, "timer", None) is self:
+            _local.timer = None
+        record = self.to_record()
+        _recent.append(record)
+        append_record(record, path)
+        if debug_enabled():
+            render_debug_panel(self)
+        return record
+
+    @contextmanager
+    def span(self, name, cache=None):
+        misses = self.cache[cache]["miss"] if cache else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, time.perf_counter() - start))
+            if cache and self.cache[cache]["miss"] == misses:
+                self.cache[cache]["hit"] += 1
+
+    def to_record(self):
+        spans = defaultdict(float)
+        for name, seconds in self.spans:
+            spans[name] += seconds
+        return {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "page": self.page,
+            "total": self.total,
+            "spans": dict(spans),
+            "cache": {name: dict(counts) for name, counts in self.cache.items() if name},
+        }
+
+
+def current_timer():
+    return getattr(_local, "timer", None)
+
+
+@contextmanager
+def span(name, cache=None):
+    """Mengukur satu tahap pada rerun yang sedang berjalan (no-op di luar rerun)"""
+    timer = current_timer()
+    if timer is None:
+        yield
+        return
+    with timer.span(name, cache=cache):
+        yield
+
+
+def cache_miss(name):
+    """Dipanggil di badan fungsi ber-cache; badan hanya berjalan saat cache miss"""
+    timer = current_timer()
+    if timer is not None:
+        timer.cache[name]["miss"] += 1
+
+
+def instrument_page(page):
+    """Dekorator untuk ``main()`` halaman: seluruh pemanggilan menjadi satu rerun"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = RerunTimer(page).start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.finish()
+        return wrapper
+    return decorator
+
+
+def instrument_fragment(page):
+    """Dekorator untuk fragmen ``st.fragment``: rerun fragmen saja dicatat sebagai rerun ``page``
+
+    Saat fragmen berjalan di dalam rerun halaman penuh, span-nya masuk ke timer halaman itu.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_timer() is not None:
+                return func(*args, **kwargs)
+            timer = RerunTimer(page).start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.finish()
+        return wrapper
+    return decorator
+
+
+def debug_enabled():
+    if os.environ.get("STUNTING_DEBUG") == "1":
+        return True
+    try:
+        import streamlit as st
+
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def append_record(record, path=METRICS_PATH):
+    """Menambahkan satu baris JSON; file diputar ke ``<path>.1`` jika terlalu besar"""
+    line = json.dumps(record) + "\n"
+    with _file_lock:
+        try:
+            if os.path.getsize(path) > MAX_BYTES:
+                os.replace(path, f"{path}.1")
+        except OSError:
+            pass
+        with open(path, "a") as file:
+            file.write(line)
+
+
+def read_records(path=METRICS_PATH):
+    """Membaca catatan dari file metrik beserta cadangan hasil rotasi"""
+    records = []
+    for name in (f"{path}.1", path):
+        try:
+            with open(name) as file:
+                records.extend(json.loads(line) for line in file if line.strip())
+        except FileNotFoundError:
+            continue
+    return records
+
+
+def summarize(records):
+    """p50/p95 per (halaman, tahap) dan total hit/miss per cache"""
+    durations = defaultdict(list)
+    cache = defaultdict(lambda: {"hit": 0, "miss": 0})
+    for record in records:
+        durations[(record["page"], "total")].append(record["total"])
+        for name, seconds in record["spans"].items():
+            durations[(record["page"], name)].append(seconds)
+        for name, counts in record.get("cache", {}).items():
+            cache[(record["page"], name)]["hit"] += counts["hit"]
+            cache[(record["page"], name)]["miss"] += counts["miss"]
+
+    stages = {
+        key: {
+            "count": len(values),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+        }
+        for key, values in durations.items()
+    }
+    return stages, dict(cache)
+
+
+def to_prometheus(stages, cache):
+    """Ringkasan dalam format teks Prometheus"""
+    lines = [
+        "# HELP stunting_stage_seconds Durasi tahap per rerun halaman",
+        "# TYPE stunting_stage_seconds summary",
+    ]
+    for (page, stage), stats in sorted(stages.items()):
+        labels = f'page="{page}",stage="{stage}"'
+        lines.append(f'stunting_stage_seconds{{{labels},quantile="0.5"}} {stats["p50"]:.6f}')
+        lines.append(f'stunting_stage_seconds{{{labels},quantile="0.95"}} {stats["p95"]:.6f}')
+        lines.append(f"stunting_stage_seconds_count{{{labels}}} {stats['count']}")
+    lines += [
+        "# HELP stunting_cache_requests_total Pemanggilan fungsi ber-cache",
+        "# TYPE stunting_cache_requests_total counter",
+    ]
+    for (page, name), counts in sorted(cache.items()):
+        for result in ("hit", "miss"):
+            lines.append(
+                f'stunting_cache_requests_total{{page="{page}",cache="{name}",result="{result}"}} {counts[result]}'
+            )
+    return "\n".join(lines) + "\n"
+
+
+def render_debug_panel(timer):
+    """Panel sidebar: waktu tahap rerun ini, p50/p95 rerun terakhir, dan hit/miss cache"""
+    import pandas as pd
+    import streamlit as st
+
+    stages, cache = summarize([record for record in _recent if record["page"] == timer.page])
+    current = timer.to_record()
+    rows = [{"Tahap": "total", "Rerun ini (ms)": timer.total * 1000}]
+    rows += [{"Tahap": name, "Rerun ini (ms)": seconds * 1000} for name, seconds in current["spans"].items()]
+    for row in rows:
+        stats = stages.get((timer.page, row["Tahap"]))
+        row["p50 (ms)"] = stats["p50"] * 1000 if stats else None
+        row["p95 (ms)"] = stats["p95"] * 1000 if stats else None
+
+    with st.sidebar.expander("⏱️ Debug: waktu eksekusi", expanded=True):
+        st.dataframe(pd.DataFrame(rows).round(1), hide_index=True, use_container_width=True)
+        if cache:
+            st.dataframe(
+                pd.DataFrame([
+                    {"Cache": name, "Hit": counts["hit"], "Miss": counts["miss"]}
+                    for (_, name), counts in sorted(cache.items())
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
+        st.caption(f"p50/p95 dari {len([r for r in _recent if r['page'] == timer.page])} rerun terakhir di proses ini")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringkasan metrik waktu dashboard")
+    parser.add_argument("--path", default=METRICS_PATH, help="File metrik JSONL")
+    parser.add_argument("--format", choices=["tabel", "prometheus"], default="tabel")
+    args = parser.parse_args()
+
+    stages, cache = summarize(read_records(args.path))
+    if args.format == "prometheus":
+        print(to_prometheus(stages, cache), end="")
+        return
+
+    for (page, stage), stats in sorted(stages.items()):
+        print(f"{page:<14} {stage:<28} n={stats['count']:<6} "
+              f"p50={stats['p50'] * 1000:9.1f} ms  p95={stats['p95'] * 1000:9.1f} ms")
+    for (page, name), counts in sorted(cache.items()):
+        print(f"{page:<14} cache {name:<22} hit={counts['hit']:<6} miss={counts['miss']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,24 @@
+import functools
+import os
+import tempfile
+import uuid
+
 import streamlit as st
 import numpy as np
-import pandas as pd
-import pickle 
-from tensorflow.keras.models import load_model
+from skoring import (
+    LABEL_INVALID, LABEL_RISK, factor_contributions, format_contribution, ranked_factors, read_family_file,
+    score_chunks,
+)
+from bobot import active_bundle_path
+from ekspor import write_chunks
+from metrik import cache_miss, instrument_page, span
+from tabel_prediksi import load_predictor
+
+# Hasil klasifikasi massal disimpan di direktorinya sendiri (terpisah dari ekspor visualisasi)
+# dan dihapus setelah RESULT_MAX_AGE detik
+RESULT_DIR = os.environ.get("STUNTING_RESULT_DIR", os.path.join(tempfile.gettempdir(), "stunting_klasifikasi"))
+RESULT_MAX_AGE = 6 * 60 * 60
+RESULT_STATE = "hasil_klasifikasi_massal"
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -11,163 +27,233 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);
-        padding: 2.5rem;
-        border-radius: 12px;
-        text-align: center;
-        color: white;
-        margin-bottom: 2rem;
-    }
-    .risk-box {
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin: 1rem 0;
-        text-align: center;
-    }
-    .high-risk {
-        background: #dc3545;
-        color: white;
-    }
-    .low-risk {
-        background: #28a745;
-        color: white;
-    }
-    .cream-box {
-        background: #e0e0e0;
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin-top: 1rem;
-    }
-    .factor-list {
-        margin-top: 0.5rem;
-        padding-left: 1rem;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Header aplikasi
-st.markdown("""
-<div class="main-header">
-    <h1>Klasifikasi Keluarga Rentan Stunting</h1>
-</div>
-""", unsafe_allow_html=True)
-
-# Fungsi memuat model dan scaler
+# Fungsi memuat prediktor (tabel prediksi + bundel model sebagai cadangan);
+# bundel terkompilasi dipakai jika tersedia sehingga input 0/1 langsung masuk ke model
+@st.cache_resource(show_spinner=False)
 def load_ml_components():
+    cache_miss("load_ml_components")
     try:
-        model = load_model("model_lstm_stunting.h5")
-        with open("scaler.pkl", "rb") as file:
-            scaler = pickle.load(file)
-        return model, scaler, True
+        predictor = load_predictor(active_bundle_path())
+        return predictor, True
     except Exception as e:
         st.error(f"Gagal memuat model: {str(e)}")
-        return None, None, False
-
-# Fungsi analisis faktor risiko
-def analyze_risk_factors(input_data):
-    factor_mapping = {
-        "baduta": "Ada anak usia 0-24 bulan",
-        "balita": "Ada anak usia 0-59 bulan",
-        "sumber_air_layak_tidak": "Air minum tidak layak",
-        "jamban_layak_tidak": "Jamban tidak layak",
-        "terlalu_muda": "Ibu hamil di usia < 20 tahun",
-        "terlalu_tua": "Ibu hamil di usia > 35 tahun",
-        "terlalu_dekat": "Jarak kelahiran < 2 tahun",
-        "terlalu_banyak": "Jumlah anak lebih dari 4",
-        "bukan_peserta_kb_modern": "Tidak menggunakan KB modern"
-    }
-    identified_factors = []
-    for key, value in input_data.items():
-        if value == 1 and key in factor_mapping:
-            identified_factors.append(factor_mapping[key])
-    return identified_factors
-
-# Load model
-model, scaler, model_status = load_ml_components()
-
-if model_status:
-    st.markdown("### Input Data Kondisi Keluarga")
-
-    with st.form("family_risk_assessment"):
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            has_baduta = st.radio("Memiliki anak Baduta (0-24 bulan)", ["Tidak", "Ya"])
-            has_balita = st.radio("Memiliki anak Balita (0-59 bulan)", ["Tidak", "Ya"])
-            water_quality = st.radio("Sumber air tidak layak konsumsi", ["Tidak", "Ya"])
-            sanitation_quality = st.radio("Jamban tidak memenuhi standar", ["Tidak", "Ya"])
-        with col2:
-            pus_status = st.radio("Termasuk Pasangan Usia Subur (PUS)", ["Tidak", "Ya"])
-            pregnancy_status = st.radio("Sedang hamil", ["Tidak", "Ya"])
-            kb_participation = st.radio("Tidak menggunakan KB modern", ["Tidak", "Ya"])
-        with col3:
-            age_young = st.radio("Ibu hamil terlalu muda (< 20 th)", ["Tidak", "Ya"])
-            age_old = st.radio("Ibu hamil terlalu tua (> 35 th)", ["Tidak", "Ya"])
-            birth_spacing = st.radio("Jarak kelahiran < 2 tahun", ["Tidak", "Ya"])
-            children_count = st.radio("Jumlah anak > 4", ["Tidak", "Ya"])
-        
-        submit_analysis = st.form_submit_button("Analisis Risiko", use_container_width=True)
-
-    if submit_analysis:
-        family_data = {
-            "baduta": 1 if has_baduta == "Ya" else 0,
-            "balita": 1 if has_balita == "Ya" else 0,
-            "pus": 1 if pus_status == "Ya" else 0,
-            "pus_hamil": 1 if pregnancy_status == "Ya" else 0,
-            "sumber_air_layak_tidak": 1 if water_quality == "Ya" else 0,
-            "jamban_layak_tidak": 1 if sanitation_quality == "Ya" else 0,
-            "terlalu_muda": 1 if age_young == "Ya" else 0,
-            "terlalu_tua": 1 if age_old == "Ya" else 0,
-            "terlalu_dekat": 1 if birth_spacing == "Ya" else 0,
-            "terlalu_banyak": 1 if children_count == "Ya" else 0,
-            "bukan_peserta_kb_modern": 1 if kb_participation == "Ya" else 0,
+        return None, False
+
+# Fungsi analisis faktor risiko: faktor aktif diurutkan menurut kontribusinya pada skor
+def analyze_risk_factors(input_row, contributions):
+    return [format_contribution(text, value) for text, value in ranked_factors(input_row, contributions)]
+
+# Fungsi skoring massal: hasil per potongan langsung ditulis ke file (ResultWriter), tidak dikumpulkan di memori
+def write_bulk_result(uploaded_file, predictor, path, progress=None):
+    stats = {"rows": 0, "risk": 0, "invalid": 0, "preview": None}
+
+    def scored_chunks():
+        chunks = read_family_file(uploaded_file, uploaded_file.name)
+        for result in score_chunks(chunks, predictor, explain=True):
+            if stats["preview"] is None:
+                stats["preview"] = result.head(20)
+            stats["rows"] += len(result)
+            stats["risk"] += int((result["hasil"] == LABEL_RISK).sum())
+            stats["invalid"] += int((result["hasil"] == LABEL_INVALID).sum())
+            if progress is not None:
+                fraction = uploaded_file.tell() / uploaded_file.size if uploaded_file.size else 1.0
+                progress.progress(min(fraction, 1.0), text=f"{stats['rows']:,} keluarga diproses")
+            yield result
+
+    uploaded_file.seek(0)
+    write_chunks(scored_chunks(), path, max_files=None, max_age=RESULT_MAX_AGE)
+    return stats
+
+# Fungsi isi tombol unduh (dipanggil saat diklik); file yang sudah kedaluwarsa diskor ulang dari unggahan
+def bulk_result_data(uploaded_file, predictor, path):
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        write_bulk_result(uploaded_file, predictor, path)
+        with open(path, "rb") as file:
+            return file.read()
+
+# ========== Main App ========== #
+@instrument_page("Klasifikasi")
+def main():
+    # Custom CSS
+    st.markdown("""
+    <style>
+        .main-header {
+            background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);
+            padding: 2.5rem;
+            border-radius: 12px;
+            text-align: center;
+            color: white;
+            margin-bottom: 2rem;
+        }
+        .risk-box {
+            padding: 1.5rem;
+            border-radius: 12px;
+            margin: 1rem 0;
+            text-align: center;
+        }
+        .high-risk {
+            background: #dc3545;
+            color: white;
+        }
+        .low-risk {
+            background: #28a745;
+            color: white;
         }
+        .cream-box {
+            background: #e0e0e0;
+            padding: 1.5rem;
+            border-radius: 12px;
+            margin-top: 1rem;
+        }
+        .factor-list {
+            margin-top: 0.5rem;
+            padding-left: 1rem;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # Header aplikasi
+    st.markdown("""
+    <div class="main-header">
+        <h1>Klasifikasi Keluarga Rentan Stunting</h1>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Load model
+    with span("load_ml_components", cache="load_ml_components"):
+        predictor, model_status = load_ml_components()
+
+    if model_status:
+        st.markdown("### Input Data Kondisi Keluarga")
+
+        with st.form("family_risk_assessment"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                has_baduta = st.radio("Memiliki anak Baduta (0-24 bulan)", ["Tidak", "Ya"])
+                has_balita = st.radio("Memiliki anak Balita (0-59 bulan)", ["Tidak", "Ya"])
+                water_quality = st.radio("Sumber air tidak layak konsumsi", ["Tidak", "Ya"])
+                sanitation_quality = st.radio("Jamban tidak memenuhi standar", ["Tidak", "Ya"])
+            with col2:
+                pus_status = st.radio("Termasuk Pasangan Usia Subur (PUS)", ["Tidak", "Ya"])
+                pregnancy_status = st.radio("Sedang hamil", ["Tidak", "Ya"])
+                kb_participation = st.radio("Tidak menggunakan KB modern", ["Tidak", "Ya"])
+            with col3:
+                age_young = st.radio("Ibu hamil terlalu muda (< 20 th)", ["Tidak", "Ya"])
+                age_old = st.radio("Ibu hamil terlalu tua (> 35 th)", ["Tidak", "Ya"])
+                birth_spacing = st.radio("Jarak kelahiran < 2 tahun", ["Tidak", "Ya"])
+                children_count = st.radio("Jumlah anak > 4", ["Tidak", "Ya"])
         
-        input_dataframe = pd.DataFrame([family_data])
-        scaled_data = scaler.transform(input_dataframe)
-        lstm_input = scaled_data.reshape((1, 1, input_dataframe.shape[1]))
+            submit_analysis = st.form_submit_button("Analisis Risiko", use_container_width=True)
+
+        if submit_analysis:
+            family_data = {
+                "baduta": 1 if has_baduta == "Ya" else 0,
+                "balita": 1 if has_balita == "Ya" else 0,
+                "pus": 1 if pus_status == "Ya" else 0,
+                "pus_hamil": 1 if pregnancy_status == "Ya" else 0,
+                "sumber_air_layak_tidak": 1 if water_quality == "Ya" else 0,
+                "jamban_layak_tidak": 1 if sanitation_quality == "Ya" else 0,
+                "terlalu_muda": 1 if age_young == "Ya" else 0,
+                "terlalu_tua": 1 if age_old == "Ya" else 0,
+                "terlalu_dekat": 1 if birth_spacing == "Ya" else 0,
+                "terlalu_banyak": 1 if children_count == "Ya" else 0,
+                "bukan_peserta_kb_modern": 1 if kb_participation == "Ya" else 0,
+            }
         
-        with st.spinner("Sedang menganalisis..."):
-            prediction_result = model.predict(lstm_input)[0][0]
+            input_row = np.array([[family_data[feature] for feature in predictor.features]])
         
-        st.markdown("---")
-        st.markdown("## Hasil Analisis")
+            # Probabilitas dan 11 varian oklusi dihitung dalam satu panggilan prediksi
+            with st.spinner("Sedang menganalisis..."), span("predict_proba"):
+                probabilities, contributions = factor_contributions(input_row, predictor)
+            prediction_result = probabilities[0]
+        
+            st.markdown("---")
+            st.markdown("## Hasil Analisis")
 
-        identified_risks = analyze_risk_factors(family_data)
+            with span("analyze_risk_factors"):
+                identified_risks = analyze_risk_factors(input_row[0], contributions[0])
         
-        # Kotak hasil utama - tanpa persentase
-        if prediction_result >= 0.5:
-            st.markdown(f"""
-            <div class="risk-box high-risk">
-                <h3>Berisiko</h3>
-                <p>Keluarga teridentifikasi berisiko stunting</p>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
+            # Kotak hasil utama - tanpa persentase
+            if prediction_result >= 0.5:
+                st.markdown(f"""
+                <div class="risk-box high-risk">
+                    <h3>Berisiko</h3>
+                    <p>Keluarga teridentifikasi berisiko stunting</p>
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                st.markdown(f"""
+                <div class="risk-box low-risk">
+                    <h3>Tidak Berisiko</h3>
+                    <p>Keluarga teridentifikasi tidak berisiko stunting</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+            # Kotak faktor risiko
             st.markdown(f"""
-            <div class="risk-box low-risk">
-                <h3>Tidak Berisiko</h3>
-                <p>Keluarga teridentifikasi tidak berisiko stunting</p>
+            <div class="cream-box">
+                <h3>Faktor Risiko</h3>
+                <div class="factor-list">
+                    {"<br>".join(identified_risks) if identified_risks else "Tidak ada faktor risiko utama yang terdeteksi."}
+                </div>
             </div>
             """, unsafe_allow_html=True)
+            if identified_risks:
+                st.caption("Poin: perubahan probabilitas risiko (dalam poin persen) jika faktor tersebut tidak ada.")
 
-        # Kotak faktor risiko
-        st.markdown(f"""
-        <div class="cream-box">
-            <h3>Faktor Risiko</h3>
-            <div class="factor-list">
-                {"<br>".join(identified_risks) if identified_risks else "Tidak ada faktor risiko utama yang terdeteksi."}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-# Footer
-st.markdown("---")
-st.markdown("""
-<div style="text-align: center; background: #f8f9fa; padding: 1.5rem; border-radius: 8px; margin-top: 2rem;">
-    <p><strong>Penerapan Algoritma Stacked LSTM Untuk Klasifikasi dan Visualisasi Keluarga Rentan Stunting.</strong></p>
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+        # Klasifikasi massal dari file unggahan
+        st.markdown("---")
+        st.markdown("### Klasifikasi Massal dari File")
+        st.caption(
+            "Unggah file CSV/XLSX dengan kolom: " + ", ".join(predictor.features)
+            + ". Nilai yang diterima: V/X, Ya/Tidak, atau 1/0."
+        )
+
+        uploaded_file = st.file_uploader("Unggah data keluarga", type=["csv", "xlsx"])
+        if uploaded_file is None:
+            st.session_state.pop(RESULT_STATE, None)
+        elif st.button("Klasifikasikan File", use_container_width=True):
+            progress = st.progress(0.0, text="Memproses data...")
+            result_path = os.path.join(RESULT_DIR, f"klasifikasi_{uuid.uuid4().hex}.csv")
+            with span("bulk_scoring"):
+                try:
+                    stats = write_bulk_result(uploaded_file, predictor, result_path, progress)
+                except ValueError as e:
+                    st.session_state.pop(RESULT_STATE, None)
+                    progress.empty()
+                    st.error(f"File tidak valid: {str(e)}")
+                else:
+                    progress.progress(1.0, text=f"Selesai: {stats['rows']:,} keluarga diproses")
+                    st.session_state[RESULT_STATE] = dict(stats, path=result_path, file_id=uploaded_file.file_id)
+
+        # Hasil disimpan di session_state agar tetap tampil (dan bisa diunduh) pada rerun berikutnya
+        result = st.session_state.get(RESULT_STATE)
+        if uploaded_file is not None and result is not None and result["file_id"] == uploaded_file.file_id:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Total Keluarga", f"{result['rows']:,}")
+            col2.metric("Berisiko", f"{result['risk']:,}")
+            col3.metric("Data Tidak Valid", f"{result['invalid']:,}")
+
+            if result["preview"] is not None:
+                st.dataframe(result["preview"], use_container_width=True)
+
+            st.download_button(
+                label="Unduh Hasil Klasifikasi (CSV)",
+                data=functools.partial(bulk_result_data, uploaded_file, predictor, result["path"]),
+                file_name="hasil_klasifikasi_stunting.csv",
+                mime="text/csv",
+            )
+
+    # Footer
+    st.markdown("---")
+    st.markdown("""
+    <div style="text-align: center; background: #f8f9fa; padding: 1.5rem; border-radius: 8px; margin-top: 2rem;">
+        <p><strong>Penerapan Algoritma Stacked LSTM Untuk Klasifikasi dan Visualisasi Keluarga Rentan Stunting.</strong></p>
+    </div>
+    """, unsafe_allow_html=True)
+
+if __name__ == "__main__":
+    main()
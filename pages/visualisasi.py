@@ -1,11 +1,17 @@
 import streamlit as st
 import pandas as pd
-import folium
-from streamlit_folium import st_folium
 import base64
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import hashlib
+import math
+
+from bersama import SharedDataset, current_segment
+from dataset import dataset_partitions, load_research_dataset
+from ekspor import EXPORT_KINDS, FORMATS, KIND_RECORDS, file_name, read_export
+from grafik import WARMUP_ENABLED, FigureCache
+from indeks_filter import FilterEngine
+from kubus import CountCube
+from metrik import cache_miss, instrument_fragment, instrument_page, span
+from spasial import POINT_MIN_ZOOM, DensityGrid, PointIndex
 
 # ========== Konfigurasi Awal ========== #
 st.set_page_config(page_title="Peta Risiko Stunting", layout="wide", initial_sidebar_state="expanded")
@@ -107,88 +113,324 @@ def load_icon_base64(path):
 icon_red = load_icon_base64('assets/marker_red.png')
 icon_green = load_icon_base64('assets/marker_green.png')
 
-# Fungsi: Load data
-@st.cache_data
-def load_data():
+# Fungsi: Partisi data yang tersedia ({tahun: versi isi}); dibaca setiap run
+# agar gelombang yang baru di-ingest langsung terlihat
+def load_partitions():
+    try:
+        return dataset_partitions()
+    except FileNotFoundError:
+        return {}
+
+def partition_years(keys):
+    years = [year for year, _ in keys]
+    return None if None in years else years
+
+# Fungsi: Dataset bersama (memory-mapped) per versi data, dipakai bersama replika lain di host
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_shared_dataset(segment):
+    cache_miss("load_shared_dataset")
+    return SharedDataset.attach(segment)
+
+# Fungsi: Load data (hanya partisi yang sedang dilihat, berupa irisan dataset bersama)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_data(keys):
+    cache_miss("load_data")
     try:
-        df = pd.read_excel("penelitian_bersih.xlsx")
-        df.columns = df.columns.str.lower()
-
-        # Normalisasi data risiko
-        df['risiko_stunting'] = df['risiko_stunting'].astype(str).str.strip().str.title()
-        df['risiko_stunting'] = df['risiko_stunting'].replace({
-            '1': 'Berisiko', '0': 'Tidak Berisiko',
-            'True': 'Berisiko', 'False': 'Tidak Berisiko',
-            'Yes': 'Berisiko', 'No': 'Tidak Berisiko'
-        })
+        selected = load_shared_dataset(current_segment()).select(keys)
+        # Versi partisi berubah di tengah rerun: baca langsung tanpa dataset bersama
+        df, report = selected or load_research_dataset(tahun=partition_years(keys))
+
+        bad_rows = len(report['bad_rows'])
+        if bad_rows:
+            st.warning(f"{bad_rows:,} dari {report['rows']:,} baris memiliki data tidak valid atau kosong.")
         return df
     except FileNotFoundError:
         st.error("File 'penelitian_bersih.xlsx' tidak ditemukan!")
         return pd.DataFrame()
 
-# Fungsi: Generate Map per Kelurahan (1 marker per kelurahan)
-def generate_map(df):
-    if df.empty:
+# Fungsi: Kubus satu partisi, di-cache per versi isi partisi
+@st.cache_resource(max_entries=32, show_spinner=False)
+def load_partition_cube(year, version):
+    cache_miss("load_partition_cube")
+    df, _ = load_research_dataset(tahun=None if year is None else [year])
+    return CountCube.from_frame(df)
+
+# Fungsi: Kubus jumlah data untuk partisi yang dilihat (gabungan kubus per partisi)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_cube(keys):
+    cache_miss("load_cube")
+    return CountCube.combine(load_partition_cube(year, version) for year, version in keys)
+
+# Fungsi: Mesin filter berindeks (opsi bertingkat dan indeks baris)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_filter_engine(keys):
+    cache_miss("load_filter_engine")
+    return FilterEngine.from_frame(load_data(keys))
+
+# Fungsi: Grid kepadatan rumah tangga per resolusi
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_grid(keys):
+    cache_miss("load_grid")
+    df = load_data(keys)
+    return DensityGrid.from_frame(df) if {'lat', 'lon'} <= set(df.columns) else None
+
+# Fungsi: Indeks titik rumah tangga untuk drill-down pada zoom tinggi
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_point_index(keys):
+    cache_miss("load_point_index")
+    df = load_data(keys)
+    return PointIndex.from_frame(df) if {'lat', 'lon'} <= set(df.columns) else None
+
+# Zoom awal peta dan lebar sel pembulatan viewport (derajat) pada zoom tersebut
+MAP_ZOOM = 12
+VIEWPORT_CELL = 0.025
+
+# Gaya dan tooltip sel grid: warna mengikuti proporsi keluarga berisiko
+DENSITY_JS = """
+function(feature, layer) {
+    var p = feature.properties;
+    var total = p.berisiko + p.tidak_berisiko;
+    var share = p.berisiko / total;
+    layer.setStyle({
+        color: share >= 0.5 ? '#ff6b6b' : '#51cf66',
+        fillColor: share >= 0.5 ? '#ff6b6b' : '#51cf66',
+        weight: 0.5,
+        fillOpacity: 0.25 + 0.5 * share
+    });
+    layer.bindTooltip(
+        '⚠️ Berisiko: <b>' + p.berisiko + '</b><br>' +
+        '✅ Tidak Berisiko: <b>' + p.tidak_berisiko + '</b><br>' +
+        '📊 Total: <b>' + total + '</b>'
+    );
+}
+"""
+
+# Gaya dan tooltip titik rumah tangga (drill-down)
+POINT_JS = """
+function(feature, layer) {
+    var p = feature.properties;
+    var color = p.berisiko ? '#ff6b6b' : '#51cf66';
+    layer.setStyle({color: color, fillColor: color, weight: 1, fillOpacity: 0.8});
+    layer.bindTooltip(
+        (p.berisiko ? '⚠️ Berisiko' : '✅ Tidak Berisiko') + '<br>' +
+        '📍 ' + p.kelurahan + ', ' + p.kecamatan
+    );
+}
+"""
+
+# Fungsi: Isi layer kepadatan untuk viewport: titik rumah tangga jika zoom cukup dekat
+# dan jumlahnya di bawah batas, selain itu sel grid terhalus yang muat dalam batas.
+# Mengembalikan (jenis, FeatureCollection, keterangan)
+def density_content(grid, points, filters, bounds=None, zoom=MAP_ZOOM):
+    households = points.query(bounds, **filters) if points is not None and zoom >= POINT_MIN_ZOOM else None
+    if households is not None:
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+                "properties": {"berisiko": bool(high), "kelurahan": kel, "kecamatan": kec},
+            }
+            for lat, lon, high, kel, kec in zip(
+                households['lat'], households['lon'], households['berisiko'],
+                households['namakelurahan'], households['namakecamatan'],
+            )
+        ]
+        collection = {"type": "FeatureCollection", "features": features}
+        return "points", collection, f"{len(households):,} rumah tangga di area peta"
+
+    level, cells = grid.viewport_cells(bounds, zoom, **filters)
+    caption = f"Grid ±{level.size * 111_000:,.0f} m: {len(cells):,} sel di area peta"
+    return "cells", grid.geojson(level, cells), caption
+
+# Template popup marker, didefinisikan sekali di JavaScript (bukan per marker)
+POPUP_JS = """
+function(feature, layer) {
+    var p = feature.properties;
+    layer.bindPopup(
+        '<div style="font-size: 14px; font-family: \\'Poppins\\', sans-serif;">' +
+        '<b style="color: #667eea;">📍 Kelurahan:</b> ' + p.kelurahan + '<br>' +
+        '<b style="color: #667eea;">🏘️ Kecamatan:</b> ' + p.kecamatan + '<br>' +
+        '<b style="color: #f5576c;">📊 Status Dominan:</b> ' + p.status + '<br><br>' +
+        '<b style="color: #667eea;">📈 Distribusi Data:</b><br>' +
+        '✅ Tidak Berisiko: <b>' + p.tidak_berisiko + '</b><br>' +
+        '⚠️ Berisiko: <b>' + p.berisiko + '</b><br>' +
+        '<b style="color: #764ba2;">📊 Total: ' + (p.tidak_berisiko + p.berisiko) + '</b>' +
+        '</div>',
+        {maxWidth: 350}
+    );
+}
+"""
+
+# Fungsi: Ikon marker untuk satu status (dipakai bersama oleh semua marker di layer)
+def marker_icon(berisiko):
+    import folium
+
+    # Gunakan ikon default jika custom icon tidak tersedia
+    if icon_red and icon_green:
+        icon_data = icon_red if berisiko else icon_green
+        return folium.CustomIcon(f"data:image/png;base64,{icon_data}", icon_size=(30, 30))
+    return folium.Icon(color='red' if berisiko else 'green', icon='info-sign')
+
+# Fungsi: Peta dasar (tanpa marker) yang berpusat di rata-rata koordinat data terfilter
+def generate_map(view):
+    if view.empty:
         return None
-        
-    df = df.dropna(subset=['lat', 'lon'])
-    
-    if df.empty:
+
+    center = view.center()
+    if center is None:
+        return None
+
+    import folium
+
+    return folium.Map(location=list(center), zoom_start=MAP_ZOOM)
+
+# Fungsi: Batas viewport dari nilai st_folium; None jika peta belum pernah dilaporkan
+def leaflet_bounds(state):
+    bounds = (state or {}).get('bounds') or {}
+    south_west, north_east = bounds.get('_southWest') or {}, bounds.get('_northEast') or {}
+    corners = (south_west.get('lat'), south_west.get('lng'), north_east.get('lat'), north_east.get('lng'))
+    if None in corners:
         return None
+    return corners[:2], corners[2:]
 
-    # Ambil satu titik representatif per kelurahan
-    kelurahan_summary = df.groupby('namakelurahan').agg({
-        'lat': 'mean',
-        'lon': 'mean',
-        'risiko_stunting': lambda x: x.mode()[0] if len(x) > 0 else 'Tidak Berisiko',
-        'namakecamatan': 'first'
-    }).reset_index()
-
-    distribusi = df.groupby(['namakelurahan', 'risiko_stunting']).size().unstack(fill_value=0).reset_index()
-    map_data = pd.merge(kelurahan_summary, distribusi, on='namakelurahan', how='left')
-
-    m = folium.Map(location=[df['lat'].mean(), df['lon'].mean()], zoom_start=12)
-
-    for _, row in map_data.iterrows():
-        # Gunakan ikon default jika custom icon tidak tersedia
-        if icon_red and icon_green and row['risiko_stunting'].lower() == 'berisiko':
-            icon_url = f"data:image/png;base64,{icon_red}"
-            icon = folium.CustomIcon(icon_url, icon_size=(30, 30))
-        elif icon_red and icon_green:
-            icon_url = f"data:image/png;base64,{icon_green}"
-            icon = folium.CustomIcon(icon_url, icon_size=(30, 30))
+# Fungsi: Marker kelurahan (1 marker per kelurahan) sebagai [(berisiko, FeatureCollection)]
+def marker_collections(map_data):
+    # Satu layer GeoJSON per status: ikon dan template popup hanya ditulis sekali,
+    # setiap marker cukup membawa koordinat dan angka distribusinya
+    collections = []
+    is_risk = (map_data['risiko_stunting'].str.lower() == 'berisiko').to_numpy()
+    for berisiko in (True, False):
+        points = map_data[is_risk == berisiko]
+        if points.empty:
+            continue
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+                "properties": {
+                    "kelurahan": kel,
+                    "kecamatan": kec,
+                    "status": status,
+                    "berisiko": int(high),
+                    "tidak_berisiko": int(low),
+                },
+            }
+            for kel, kec, status, lat, lon, high, low in zip(
+                points['namakelurahan'], points['namakecamatan'], points['risiko_stunting'],
+                points['lat'], points['lon'], points['Berisiko'], points['Tidak Berisiko'],
+            )
+        ]
+        collections.append((berisiko, {"type": "FeatureCollection", "features": features}))
+    return collections
+
+# Fungsi: Isi peta di dalam viewport sebagai data biasa (marker kelurahan dan layer
+# kepadatan opsional), sehingga bisa di-cache dan dipakai bersama antar sesi
+def viewport_content(view, filters, bounds=None, zoom=MAP_ZOOM, grid=None, points=None):
+    # Satu titik representatif per kelurahan, dihitung dari kubus
+    map_data = view.map_points()
+    for col in ('Berisiko', 'Tidak Berisiko'):
+        if col not in map_data.columns:
+            map_data[col] = 0
+    if bounds is not None:
+        (south, west), (north, east) = bounds
+        map_data = map_data[map_data['lat'].between(south, north) & map_data['lon'].between(west, east)]
+
+    content = {"markers": marker_collections(map_data), "density": None, "caption": None}
+    if grid is not None:
+        kind, collection, content["caption"] = density_content(grid, points, filters, bounds=bounds, zoom=zoom)
+        content["density"] = (kind, collection)
+    return content
+
+# Fungsi: Layer folium (FeatureGroup) dari isi viewport; dibuat baru setiap rerun
+# karena st_folium menempelkannya ke peta yang sedang ditampilkan
+def viewport_layer(content):
+    import folium
+    from folium.utilities import JsCode
+
+    layer = folium.FeatureGroup(name="viewport", control=False)
+    for berisiko, collection in content["markers"]:
+        folium.GeoJson(
+            collection,
+            marker=folium.Marker(icon=marker_icon(berisiko)),
+            on_each_feature=JsCode(POPUP_JS),
+            control=False,
+        ).add_to(layer)
+    if content["density"] is not None:
+        kind, collection = content["density"]
+        if kind == "points":
+            folium.GeoJson(
+                collection, marker=folium.CircleMarker(radius=4), on_each_feature=JsCode(POINT_JS), control=False
+            ).add_to(layer)
         else:
-            # Fallback ke ikon default
-            color = 'red' if row['risiko_stunting'].lower() == 'berisiko' else 'green'
-            icon = folium.Icon(color=color, icon='info-sign')
-
-        popup_html = f"""
-        <div style="font-size: 14px; font-family: 'Poppins', sans-serif;">
-            <b style="color: #667eea;">📍 Kelurahan:</b> {row['namakelurahan']}<br>
-            <b style="color: #667eea;">🏘️ Kecamatan:</b> {row['namakecamatan']}<br>
-            <b style="color: #f5576c;">📊 Status Dominan:</b> {row['risiko_stunting']}<br><br>
-            <b style="color: #667eea;">📈 Distribusi Data:</b><br>
-            ✅ Tidak Berisiko: <b>{row.get('Tidak Berisiko', 0)}</b><br>
-            ⚠️ Berisiko: <b>{row.get('Berisiko', 0)}</b><br>
-            <b style="color: #764ba2;">📊 Total: {row.get('Tidak Berisiko', 0) + row.get('Berisiko', 0)}</b>
-        </div>
-        """
+            folium.GeoJson(collection, on_each_feature=JsCode(DENSITY_JS), control=False).add_to(layer)
+    return layer
 
-        folium.Marker(
-            location=[row['lat'], row['lon']],
-            icon=icon,
-            popup=folium.Popup(popup_html, max_width=350)
-        ).add_to(m)
+# Fungsi: Viewport dibulatkan keluar ke kelipatan sel (lebar sel mengikuti zoom) agar
+# geseran kecil memakai entri cache yang sama; None tetap None (seluruh wilayah)
+def snap_viewport(bounds, zoom):
+    if bounds is None:
+        return None
+    cell = VIEWPORT_CELL / 2 ** max(zoom - MAP_ZOOM, 0)
+    (south, west), (north, east) = bounds
+    snapped = (
+        math.floor(south / cell) * cell, math.floor(west / cell) * cell,
+        math.ceil(north / cell) * cell, math.ceil(east / cell) * cell,
+    )
+    south, west, north, east = (round(value, 6) for value in snapped)
+    return (south, west), (north, east)
 
-    return m
+# Fungsi: Isi viewport di-cache per (filter, sel viewport, zoom, layer kepadatan)
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_viewport_content(keys, kecamatan, kelurahan, tahun_range, viewport, zoom, show_density=False):
+    cache_miss("cached_viewport_content")
+    view = load_cube(keys).select(kecamatan=kecamatan, kelurahan=kelurahan, tahun_range=tahun_range)
+    filters = {"kecamatan": kecamatan, "kelurahan": kelurahan, "tahun_range": tahun_range}
+    grid = load_grid(keys) if show_density else None
+    points = load_point_index(keys) if show_density else None
+    return viewport_content(view, filters, bounds=viewport, zoom=zoom, grid=grid, points=points)
 
-# Fungsi: Membuat visualisasi distribusi (tanpa tren waktu)
-def create_distribution_charts(df):
-    if df.empty:
-        return None, None, None
-    
-    # 1. Pie Chart - Distribusi Keseluruhan
-    risk_counts = df['risiko_stunting'].value_counts()
+# Fragmen peta: geser/zoom hanya menjalankan ulang bagian ini (dicatat sebagai rerun
+# "visualisasi/peta"), dan browser hanya menerima isi viewport yang terlihat
+# (dibatasi MAX_CELLS/MAX_POINTS di spasial.py).
+# Peta folium sengaja dibuat baru setiap rerun (yang di-cache hanya isi viewport):
+# st_folium mengubah peta yang diberikan (id elemen, layer yang ditempelkan), sehingga
+# peta yang di-cache menghasilkan skrip berbeda sejak pemakaian kedua dan komponen
+# dipasang ulang (tampilan peta kembali ke posisi awal). Biayanya ±7 ms per rerun hangat
+# (median 61,6 ms vs 54,3 ms dengan peta ter-cache, data contoh 3.000 baris).
+@st.fragment
+@instrument_fragment("visualisasi/peta")
+def show_map(keys, filter_key, view, show_density=False):
+    map_obj = generate_map(view)
+    if map_obj is None:
+        st.error("Tidak dapat menampilkan peta. Pastikan data koordinat tersedia.")
+        return
+
+    # Kunci per filter: filter baru membuat peta baru yang berpusat pada data terfilter
+    map_key = "peta_stunting_" + hashlib.sha256(repr(filter_key).encode()).hexdigest()[:16]
+    state = st.session_state.get(map_key)
+    zoom = (state or {}).get('zoom') or MAP_ZOOM
+    viewport = snap_viewport(leaflet_bounds(state), zoom)
+
+    with span("viewport_layer", cache="cached_viewport_content"):
+        content = cached_viewport_content(*filter_key, viewport, zoom, show_density=show_density)
+        layer = viewport_layer(content)
+
+    # Leaflet di browser dibuat sekali per kunci; rerun berikutnya hanya mengganti layer viewport
+    with span("st_folium"):
+        from streamlit_folium import st_folium
+
+        st_folium(
+            map_obj, height=500, width=None, key=map_key,
+            returned_objects=["bounds", "zoom"], feature_group_to_add=layer,
+        )
+    if content["caption"]:
+        st.caption(content["caption"])
+
+# Fungsi: Pie chart distribusi keseluruhan
+def pie_chart(view):
+    import plotly.express as px
+
+    risk_counts = view.risk_totals()
     
     fig_pie = px.pie(
         values=risk_counts.values, 
@@ -206,9 +448,13 @@ def create_distribution_charts(df):
         height=350,
         margin=dict(t=40, b=10, l=10, r=10)
     )
-    
-    # 2. Bar Chart - Distribusi per Kecamatan
-    kec_dist = df.groupby(['namakecamatan', 'risiko_stunting']).size().unstack(fill_value=0)
+    return fig_pie
+
+# Fungsi: Bar chart distribusi per kecamatan
+def kecamatan_chart(view):
+    import plotly.express as px
+
+    kec_dist = view.by_kecamatan()
     
     fig_bar_kec = px.bar(
         kec_dist, 
@@ -228,9 +474,13 @@ def create_distribution_charts(df):
         height=350,
         margin=dict(t=40, b=40, l=40, r=10)
     )
-    
-    # 3. Bar Chart - Distribusi per Kelurahan (Top 10)
-    kel_dist = df.groupby(['namakelurahan', 'risiko_stunting']).size().unstack(fill_value=0)
+    return fig_bar_kec
+
+# Fungsi: Bar chart 10 kelurahan dengan kasus terbanyak
+def kelurahan_chart(view):
+    import plotly.express as px
+
+    kel_dist = view.by_kelurahan()
     kel_total = kel_dist.sum(axis=1).sort_values(ascending=False).head(10)
     kel_dist_top = kel_dist.loc[kel_total.index]
     
@@ -252,10 +502,50 @@ def create_distribution_charts(df):
         height=400,
         margin=dict(t=40, b=60, l=40, r=10)
     )
-    
-    return fig_pie, fig_bar_kec, fig_bar_kel
+    return fig_bar_kel
+
+CHART_BUILDERS = {"pie": pie_chart, "kecamatan": kecamatan_chart, "kelurahan": kelurahan_chart}
+
+# Fungsi: Membuat visualisasi distribusi (tanpa tren waktu)
+def create_distribution_charts(view):
+    if view.empty:
+        return None, None, None
+    return tuple(build(view) for build in CHART_BUILDERS.values())
+
+# Fungsi: Cache spesifikasi figur bersama untuk semua sesi
+@st.cache_resource(show_spinner=False)
+def load_figure_cache():
+    return FigureCache()
+
+# Fungsi: Grafik distribusi dari cache figur, dengan kunci (versi data + filter, jenis grafik)
+def cached_distribution_charts(filter_key, view):
+    if view.empty:
+        return None, None, None
+    cache = load_figure_cache()
+
+    def builder(build):
+        def run():
+            cache_miss("figure_cache")
+            return build(view)
+        return run
+
+    return tuple(cache.figure((filter_key, chart), builder(build)) for chart, build in CHART_BUILDERS.items())
+
+# Fungsi: Warm-up cache figur untuk tampilan "Semua" dan setiap kecamatan (sekali per versi data)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def start_figure_warmup(keys, kecamatan_options):
+    cube = load_cube(keys)
+
+    def entry(kecamatan, chart, build):
+        filter_key = (keys, kecamatan, None, None)
+        return (filter_key, chart), lambda: build(cube.select(kecamatan=kecamatan))
+
+    selections = [None] + [(kecamatan,) for kecamatan in kecamatan_options]
+    entries = [entry(kec, chart, build) for kec in selections for chart, build in CHART_BUILDERS.items()]
+    return load_figure_cache().warm_up_async(entries)
 
 # ========== Main App ========== #
+@instrument_page("visualisasi")
 def main():
     # Header dengan gradient
     st.markdown("""
@@ -272,10 +562,9 @@ def main():
         </div>
     """, unsafe_allow_html=True)
 
-    # Load data
-    df = load_data()
-    
-    if df.empty:
+    with span("load_partitions"):
+        partitions = load_partitions()
+    if not partitions:
         st.error("Tidak dapat memuat data. Pastikan file 'penelitian_bersih.xlsx' tersedia.")
         return
 
@@ -286,18 +575,48 @@ def main():
                 <h2 style="color: #667eea; font-weight: 700;">🔍 Filter Data</h2>
             </div>
         """, unsafe_allow_html=True)
-        
-        kec = ['Semua'] + sorted(df['namakecamatan'].unique())
-        kel = ['Semua'] + sorted(df['namakelurahan'].unique())
-        
-        kecamatan = st.selectbox("📍 Pilih Kecamatan", kec)
-        kelurahan = st.selectbox("🏘️ Pilih Kelurahan", kel)
-        
-        if 'tahun' in df.columns:
-            tahun = ['Semua'] + sorted(df['tahun'].unique(), reverse=True)
-            tahun_select = st.selectbox("📅 Pilih Tahun", tahun)
+
+        if None in partitions:
+            # Satu workbook tanpa store terpartisi: opsi tahun diambil dari data
+            keys = ((None, partitions[None]),)
+            with span("load_filter_engine", cache="load_filter_engine"):
+                tahun_options = load_filter_engine(keys).tahun_options
         else:
-            tahun_select = 'Semua'
+            tahun_options = sorted(partitions)
+
+        tahun_range = None
+        if len(tahun_options) > 1:
+            selected_range = st.select_slider(
+                "📅 Rentang Tahun", options=tahun_options, value=(tahun_options[0], tahun_options[-1])
+            )
+            # Rentang penuh sama dengan 'Semua' (termasuk baris tanpa tahun)
+            if selected_range != (tahun_options[0], tahun_options[-1]):
+                tahun_range = tuple(selected_range)
+
+        if None not in partitions:
+            # Store terpartisi: hanya partisi tahun dalam rentang yang dibaca
+            low, high = tahun_range or (tahun_options[0], tahun_options[-1])
+            keys = tuple((year, partitions[year]) for year in tahun_options if low <= year <= high)
+
+        with span("load_data", cache="load_data"):
+            data_empty = load_data(keys).empty
+        if data_empty:
+            st.error("Tidak dapat memuat data. Pastikan file 'penelitian_bersih.xlsx' tersedia.")
+            return
+
+        with span("load_filter_engine", cache="load_filter_engine"):
+            engine = load_filter_engine(keys)
+
+        # Pilihan kosong berarti semua; daftar kelurahan mengikuti kecamatan terpilih
+        kecamatan = st.multiselect("📍 Pilih Kecamatan", engine.kecamatan_options, placeholder="Semua")
+        kelurahan = st.multiselect(
+            "🏘️ Pilih Kelurahan", engine.kelurahan_options(kecamatan), placeholder="Semua"
+        )
+
+        show_density = st.checkbox(
+            "🟥 Tampilkan kepadatan rumah tangga (grid)", value=False,
+            help="Zoom dekat ke area yang tidak terlalu padat untuk melihat titik rumah tangga",
+        )
 
         # Info box di sidebar
         st.markdown("""
@@ -309,25 +628,25 @@ def main():
             </div>
         """, unsafe_allow_html=True)
 
-    # Filter DataFrame
-    df_filtered = df.copy()
-    if kecamatan != 'Semua':
-        df_filtered = df_filtered[df_filtered['namakecamatan'] == kecamatan]
-    if kelurahan != 'Semua':
-        df_filtered = df_filtered[df_filtered['namakelurahan'] == kelurahan]
-    if tahun_select != 'Semua' and 'tahun' in df.columns:
-        df_filtered = df_filtered[df_filtered['tahun'] == tahun_select]
+    # Filter data: potongan kubus jumlah data
+    filter_key = (keys, tuple(kecamatan) or None, tuple(kelurahan) or None, tahun_range)
+    with span("load_cube", cache="load_cube"):
+        cube = load_cube(keys)
+    with span("cube_select"):
+        view = cube.select(kecamatan=filter_key[1], kelurahan=filter_key[2], tahun_range=filter_key[3])
+    if WARMUP_ENABLED:
+        start_figure_warmup(keys, tuple(engine.kecamatan_options))
 
-    if df_filtered.empty:
+    if view.empty:
         st.warning("❗ Tidak ada data untuk filter yang dipilih.")
         return
 
     # Metrics Cards
     col1, col2, col3, col4 = st.columns(4)
     
-    total_data = len(df_filtered)
-    berisiko = len(df_filtered[df_filtered['risiko_stunting'] == 'Berisiko'])
-    tidak_berisiko = len(df_filtered[df_filtered['risiko_stunting'] == 'Tidak Berisiko'])
+    total_data = view.total
+    berisiko = view.count('Berisiko')
+    tidak_berisiko = view.count('Tidak Berisiko')
     persentase_risiko = (berisiko / total_data * 100) if total_data > 0 else 0
     
     with col1:
@@ -386,39 +705,38 @@ def main():
             </div>
         """, unsafe_allow_html=True)
         
-        map_obj = generate_map(df_filtered)
-        if map_obj:
-            st_folium(map_obj, height=500, width=None, key="peta_stunting")
-        else:
-            st.error("Tidak dapat menampilkan peta. Pastikan data koordinat tersedia.")
+        show_map(keys, filter_key, view, show_density=show_density)
 
         # Visualisasi Distribusi
         st.markdown('<h2 class="section-header">📊 Analisis Data</h2>', unsafe_allow_html=True)
         
-        fig_pie, fig_bar_kec, fig_bar_kel = create_distribution_charts(df_filtered)
+        with span("create_distribution_charts", cache="figure_cache"):
+            fig_pie, fig_bar_kec, fig_bar_kel = cached_distribution_charts(filter_key, view)
         
-        if fig_pie:
-            # Pie chart
-            with st.container():
-                st.plotly_chart(fig_pie, use_container_width=True)
-            
-            # Bar chart kecamatan
-            if fig_bar_kec is not None:
+        with span("plotly_chart"):
+            if fig_pie:
+                # Pie chart
                 with st.container():
-                    st.plotly_chart(fig_bar_kec, use_container_width=True)
+                    st.plotly_chart(fig_pie, use_container_width=True)
             
-            # Bar chart kelurahan
-            if fig_bar_kel is not None:
-                with st.container():
-                    st.plotly_chart(fig_bar_kel, use_container_width=True)
+                # Bar chart kecamatan
+                if fig_bar_kec is not None:
+                    with st.container():
+                        st.plotly_chart(fig_bar_kec, use_container_width=True)
+            
+                # Bar chart kelurahan
+                if fig_bar_kel is not None:
+                    with st.container():
+                        st.plotly_chart(fig_bar_kel, use_container_width=True)
         
         # Tabel Detail
         st.markdown('<h2 class="section-header">📋 Tabel Detail Data</h2>', unsafe_allow_html=True)
         
         # Summary table
-        summary_df = df_filtered.groupby(['namakecamatan', 'namakelurahan', 'risiko_stunting']).size().unstack(fill_value=0).reset_index()
-        summary_df['Total'] = summary_df.get('Berisiko', 0) + summary_df.get('Tidak Berisiko', 0)
-        summary_df = summary_df.sort_values('Total', ascending=False)
+        with span("summary_table"):
+            summary_df = view.summary()
+            summary_df['Total'] = summary_df.get('Berisiko', 0) + summary_df.get('Tidak Berisiko', 0)
+            summary_df = summary_df.sort_values('Total', ascending=False)
         
         st.dataframe(
             summary_df,
@@ -426,13 +744,26 @@ def main():
             height=300
         )
         
-        # Download button
-        csv = summary_df.to_csv(index=False)
+        # Ekspor: file dibuat saat tombol diklik (di thread terpisah), di-cache per filter dan versi data
+        col_kind, col_format = st.columns(2)
+        export_kind = col_kind.radio("Isi file", list(EXPORT_KINDS), horizontal=True)
+        export_format = col_format.radio("Format", list(FORMATS), horizontal=True)
+
+        # Objek ber-cache diambil di sini karena callable berjalan di luar konteks skrip
+        records = (load_data(keys), load_filter_engine(keys)) if export_kind == KIND_RECORDS else None
+
+        def export_data():
+            selected = None
+            if records is not None:
+                df, engine = records
+                selected = (df, engine.rows(kecamatan=filter_key[1], kelurahan=filter_key[2], tahun_range=filter_key[3]))
+            return read_export(export_kind, export_format, filter_key, summary=summary_df, records=selected)
+
         st.download_button(
-            label="📥 Download Data sebagai CSV",
-            data=csv,
-            file_name=f"data_stunting_summary_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+            label=f"📥 Download {export_kind} ({export_format})",
+            data=export_data,
+            file_name=file_name(export_kind, export_format, pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')),
+            mime=FORMATS[export_format][1],
         )
 
     # Footer
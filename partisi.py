@@ -0,0 +1,212 @@
+"""Penyimpanan data penelitian terpartisi per tahun (gelombang survei).
+
+Setiap tahun disimpan sebagai satu file Parquet ``tahun=<tahun>/data.parquet``,
+diurutkan per kecamatan dengan satu row group per kecamatan sehingga pembacaan
+untuk kecamatan tertentu cukup membaca row group yang relevan. ``manifest.json``
+mencatat jumlah baris dan hash isi setiap partisi; hash ini dipakai sebagai kunci
+cache turunan (kubus, grid), sehingga ingest satu gelombang hanya membangun ulang
+partisi yang tersentuh.
+
+Contoh:
+    python partisi.py ingest penelitian_bersih.xlsx
+    python partisi.py ingest gelombang_2025.xlsx --tahun 2025
+    python partisi.py ingest tambahan_2024.csv --mode append
+    python partisi.py ingest gelombang_2025.csv --skip-invalid
+    python partisi.py list
+"""
+import argparse
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from dataset import dump_json, file_sha256, normalize_columns, read_meta, to_arrow_friendly, write_atomic
+
+STORE_PATH = "data_partisi"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def manifest_path(store_path=STORE_PATH):
+    return os.path.join(store_path, MANIFEST_NAME)
+
+
+def load_manifest(store_path=STORE_PATH):
+    """Isi manifest, atau None jika store belum dibuat"""
+    return read_meta(manifest_path(store_path))
+
+
+def partition_versions(store_path=STORE_PATH):
+    """Versi isi setiap partisi: {tahun: sha256}"""
+    manifest = load_manifest(store_path)
+    if manifest is None:
+        return {}
+    return {int(year): entry["sha256"] for year, entry in manifest["partitions"].items()}
+
+
+def partition_file(year):
+    return os.path.join(f"tahun={int(year)}", "data.parquet")
+
+
+def read_source(source_path):
+    """Membaca file gelombang survei (XLSX, CSV, atau Parquet)"""
+    lower = source_path.lower()
+    if lower.endswith(".csv"):
+        return pd.read_csv(source_path)
+    if lower.endswith(".parquet"):
+        return pd.read_parquet(source_path)
+    return pd.read_excel(source_path)
+
+
+def _read_partition(store_path, year):
+    path = os.path.join(store_path, partition_file(year))
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def write_partition(df, year, store_path=STORE_PATH):
+    """Menulis satu partisi: urut per kecamatan, satu row group per kecamatan"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.sort_values("namakecamatan", kind="stable", na_position="last").reset_index(drop=True)
+    table = pa.Table.from_pandas(to_arrow_friendly(df), preserve_index=False)
+    groups = df.groupby("namakecamatan", dropna=False, sort=True, observed=True).indices
+
+    def write(path):
+        with pq.ParquetWriter(path, table.schema) as writer:
+            for positions in groups.values():
+                writer.write_table(table.slice(int(positions[0]), len(positions)))
+
+    path = os.path.join(store_path, partition_file(year))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, write)
+    return {
+        "file": partition_file(year),
+        "rows": len(df),
+        "sha256": file_sha256(path),
+        "kecamatan": sorted(str(name) for name in df["namakecamatan"].dropna().unique()),
+    }
+
+
+def format_rows(rows, limit=10):
+    """Posisi baris untuk pesan: ``limit`` posisi pertama, sisanya diringkas"""
+    shown = ", ".join(str(row) for row in rows[:limit])
+    return f"{shown}, ... (+{len(rows) - limit:,})" if len(rows) > limit else shown
+
+
+def ingest(source_path, store_path=STORE_PATH, tahun=None, mode="replace", skip_invalid=False):
+    """Memasukkan satu file gelombang ke store; hanya partisi tahun yang ada di file yang ditulis.
+
+    ``mode="replace"`` mengganti isi partisi, ``mode="append"`` menambahkan baris ke
+    partisi yang sudah ada. Jika ``tahun`` diisi, semua baris dianggap dari tahun itu.
+    Baris dengan tahun kosong/tidak valid membuat file ditolak, kecuali ``skip_invalid``;
+    posisinya (0-based, seperti ``bad_rows``) dikembalikan di ``skipped_rows``.
+    """
+    if mode not in ("replace", "append"):
+        raise ValueError(f"Mode ingest tidak dikenal: {mode}")
+
+    df = normalize_columns(read_source(source_path))
+    if tahun is not None:
+        df["tahun"] = int(tahun)
+    elif "tahun" not in df.columns:
+        raise ValueError("Kolom 'tahun' tidak ditemukan; isi --tahun untuk gelombang ini")
+    if "namakecamatan" not in df.columns:
+        raise ValueError("Kolom wajib tidak ditemukan: namakecamatan")
+
+    years = pd.to_numeric(df["tahun"], errors="coerce")
+    skipped_rows = np.flatnonzero(years.isna().to_numpy())
+    if len(skipped_rows) and not skip_invalid:
+        raise ValueError(
+            f"{len(skipped_rows):,} baris dengan tahun kosong/tidak valid (baris {format_rows(skipped_rows)}); "
+            "perbaiki file atau gunakan --skip-invalid"
+        )
+    df = df.loc[years.notna()].copy()
+    df["tahun"] = years[years.notna()].astype(int)
+
+    manifest = load_manifest(store_path) or {"version": MANIFEST_VERSION, "partitions": {}}
+    touched = {}
+    for year, wave in df.groupby("tahun", sort=True):
+        if mode == "append":
+            existing = _read_partition(store_path, year)
+            if existing is not None:
+                wave = pd.concat([existing, wave], ignore_index=True)
+        entry = write_partition(wave, year, store_path)
+        entry["source"] = os.path.basename(source_path)
+        entry["updated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        manifest["partitions"][str(int(year))] = entry
+        touched[int(year)] = entry["rows"]
+
+    # Manifest ditulis terakhir: pembaca tidak pernah melihat partisi setengah jadi
+    os.makedirs(store_path, exist_ok=True)
+    write_atomic(manifest_path(store_path), lambda path: dump_json(manifest, path))
+    return {"partitions": touched, "skipped": len(skipped_rows), "skipped_rows": skipped_rows}
+
+
+def read_partitions(tahun=None, kecamatan=None, columns=None, store_path=STORE_PATH):
+    """Membaca hanya partisi tahun (dan row group kecamatan) yang diminta; None berarti semua"""
+    manifest = load_manifest(store_path)
+    if manifest is None:
+        raise FileNotFoundError(manifest_path(store_path))
+
+    partitions = manifest["partitions"]
+    years = sorted(int(year) for year in partitions)
+    if tahun is not None:
+        wanted = {int(year) for year in tahun}
+        years = [year for year in years if year in wanted]
+
+    filters = [("namakecamatan", "in", list(kecamatan))] if kecamatan else None
+    frames = [
+        pd.read_parquet(os.path.join(store_path, partitions[str(year)]["file"]), columns=columns, filters=filters)
+        for year in years
+    ]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store data penelitian terpartisi per tahun")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Memasukkan file gelombang survei")
+    ingest_parser.add_argument("source", help="File XLSX/CSV/Parquet gelombang survei")
+    ingest_parser.add_argument("--tahun", type=int, default=None, help="Tahun gelombang (jika file tanpa kolom tahun)")
+    ingest_parser.add_argument("--mode", choices=["replace", "append"], default="replace",
+                               help="Ganti atau tambahkan ke partisi tahun yang sama")
+    ingest_parser.add_argument("--store", default=STORE_PATH, help="Folder store")
+    ingest_parser.add_argument("--skip-invalid", action="store_true",
+                               help="Lewati baris dengan tahun kosong/tidak valid alih-alih menolak file")
+
+    list_parser = subparsers.add_parser("list", help="Menampilkan partisi yang tersedia")
+    list_parser.add_argument("--store", default=STORE_PATH, help="Folder store")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        try:
+            result = ingest(args.source, store_path=args.store, tahun=args.tahun, mode=args.mode,
+                            skip_invalid=args.skip_invalid)
+        except ValueError as error:
+            raise SystemExit(f"Ingest dibatalkan: {error}")
+        for year, rows in result["partitions"].items():
+            print(f"Tahun {year}: {rows:,} baris ({args.mode})")
+        if result["skipped"]:
+            print(f"Dilewati (tahun kosong/tidak valid): {result['skipped']:,} baris "
+                  f"(baris {format_rows(result['skipped_rows'])})")
+        if args.store == STORE_PATH:
+            # Replika dashboard beralih ke segmen baru pada rerun berikutnya
+            from bersama import publish
+
+            print(f"Dataset bersama diterbitkan: {publish()}")
+    else:
+        manifest = load_manifest(args.store)
+        if manifest is None:
+            print("Store belum dibuat.")
+            return
+        for year, entry in sorted(manifest["partitions"].items()):
+            print(f"Tahun {year}: {entry['rows']:,} baris, {len(entry['kecamatan'])} kecamatan, "
+                  f"sumber {entry['source']}, diperbarui {entry['updated']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""CLI pelatihan model Stacked LSTM tanpa notebook, dengan pencarian hyperparameter paralel.
+
+Contoh:
+    python pelatihan.py
+    python pelatihan.py --kecamatan "BOGOR BARAT" --units 64x32 32x16 --dropout 0.3x0.2 0.2x0.1
+    python pelatihan.py --batch-size 32 128 --workers 4 --promote
+
+Alur sama dengan ``stunting.ipynb`` (LSTM -> Dropout -> LSTM -> Dropout -> Dense
+sigmoid, input (1, 11)), dengan perbaikan: scaler di-fit sekali pada data latih saja,
+EarlyStopping benar-benar dipasang di ``fit``, data validasi diambil berstrata, dan
+input dialirkan melalui ``tf.data``. Setiap kombinasi hyperparameter dilatih di
+proses terpisah; hasil terbaik (val_loss terendah) dievaluasi pada data uji lalu
+disimpan sebagai artefak berversi:
+
+    artefak_model/<versi>/model_lstm_stunting.h5
+    artefak_model/<versi>/scaler.pkl
+    artefak_model/<versi>/model_bundle/   (bundel bobot + tabel prediksi)
+    artefak_model/<versi>/metrics.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import MinMaxScaler
+
+from bobot import (
+    BUNDLE_PATH, SCALER_PATH, default_bundle_path, export_bundle, replace_bundle, replace_file, staging_path,
+)
+from dataset import MISSING_INDICATOR, load_research_dataset
+from inferensi import FEATURE_COLUMNS, MODEL_PATH
+
+ARTIFACT_PATH = "artefak_model"
+SEED = 42
+
+# Ruang pencarian bawaan; konfigurasi notebook (64x32, 0.3x0.2, 32) termasuk di dalamnya
+DEFAULT_UNITS = ["64x32", "32x16"]
+DEFAULT_DROPOUT = ["0.3x0.2"]
+DEFAULT_BATCH_SIZES = [32, 128]
+
+
+def parse_pair(text, cast):
+    """'64x32' -> (64, 32)"""
+    first, second = text.lower().split("x")
+    return cast(first), cast(second)
+
+
+def search_space(units, dropout, batch_sizes):
+    """Semua kombinasi hyperparameter sebagai daftar dict"""
+    return [
+        {"units": parse_pair(u, int), "dropout": parse_pair(d, float), "batch_size": int(b)}
+        for u, d, b in itertools.product(units, dropout, batch_sizes)
+    ]
+
+
+def load_training_data(tahun=None, kecamatan=None):
+    """Fitur biner dan label 0/1; baris dengan indikator atau label tidak valid dibuang"""
+    df, _ = load_research_dataset(tahun=tahun, kecamatan=kecamatan)
+    features = df[FEATURE_COLUMNS]
+    valid = (
+        (features != MISSING_INDICATOR).all(axis=1)
+        & df["risiko_stunting"].isin(["Berisiko", "Tidak Berisiko"])
+    ).to_numpy()
+    x = features.loc[valid].astype(np.float32)
+    y = (df.loc[valid, "risiko_stunting"] == "Berisiko").to_numpy(dtype=np.float32)
+    return x, y
+
+
+def split_data(x, y, test_size=0.2, val_size=0.2, seed=SEED):
+    """Pembagian latih/validasi/uji berstrata; scaler di-fit sekali pada data latih"""
+    x_train, x_test, y_train, y_test = train_test_split(
+        x, y, test_size=test_size, random_state=seed, stratify=y
+    )
+    x_train, x_val, y_train, y_val = train_test_split(
+        x_train, y_train, test_size=val_size, random_state=seed, stratify=y_train
+    )
+    scaler = MinMaxScaler().fit(x_train)
+
+    def prepare(part):
+        scaled = scaler.transform(part).astype(np.float32)
+        return scaled.reshape((scaled.shape[0], 1, scaled.shape[1]))
+
+    splits = {
+        "train": (prepare(x_train), y_train),
+        "val": (prepare(x_val), y_val),
+        "test": (prepare(x_test), y_test),
+    }
+    return splits, scaler
+
+
+def make_dataset(x, y, batch_size, shuffle=False, seed=SEED):
+    """Input pipeline tf.data: cache, acak per epoch, batch, prefetch"""
+    import tensorflow as tf
+
+    dataset = tf.data.Dataset.from_tensor_slices((x, y)).cache()
+    if shuffle:
+        dataset = dataset.shuffle(len(x), seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def build_model(n_features, units, dropout):
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+
+    model = Sequential([
+        Input(shape=(1, n_features)),
+        LSTM(units[0], return_sequences=True),
+        Dropout(dropout[0]),
+        LSTM(units[1]),
+        Dropout(dropout[1]),
+        Dense(1, activation="sigmoid"),
+    ])
+    model.compile(loss="binary_crossentropy", optimizer="adam", metrics=["accuracy"])
+    return model
+
+
+def _init_worker(threads):
+    """Membagi core antar worker agar proses TensorFlow tidak saling berebut"""
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def train_config(config, splits, epochs, patience, seed=SEED):
+    """Melatih satu kombinasi hyperparameter; mengembalikan metrik validasi dan bobot"""
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    tf.keras.utils.set_random_seed(seed)
+    x_train, y_train = splits["train"]
+    x_val, y_val = splits["val"]
+    model = build_model(x_train.shape[2], config["units"], config["dropout"])
+
+    early_stop = EarlyStopping(monitor="val_loss", patience=patience, restore_best_weights=True)
+    start = time.perf_counter()
+    history = model.fit(
+        make_dataset(x_train, y_train, config["batch_size"], shuffle=True, seed=seed),
+        validation_data=make_dataset(x_val, y_val, config["batch_size"]),
+        epochs=epochs,
+        shuffle=False,  # pengacakan sudah dilakukan di tf.data
+        callbacks=[early_stop],
+        verbose=0,
+    )
+    val_loss, val_accuracy = model.evaluate(make_dataset(x_val, y_val, 1024), verbose=0)
+    return {
+        "config": config,
+        "val_loss": float(val_loss),
+        "val_accuracy": float(val_accuracy),
+        "epochs_run": len(history.history["loss"]),
+        "best_epoch": int(np.argmin(history.history["val_loss"])) + 1,
+        "seconds": time.perf_counter() - start,
+        "weights": model.get_weights(),
+    }
+
+
+def evaluate(model, x, y):
+    """Metrik uji seperti di notebook: akurasi, ROC-AUC, matriks konfusi"""
+    from sklearn.metrics import accuracy_score, confusion_matrix, roc_auc_score
+
+    proba = model.predict(make_dataset(x, y, 1024), verbose=0).ravel()
+    predicted = (proba > 0.5).astype(int)
+    return {
+        "rows": int(len(y)),
+        "accuracy": float(accuracy_score(y, predicted)),
+        "roc_auc": float(roc_auc_score(y, proba)) if len(np.unique(y)) > 1 else None,
+        "confusion_matrix": confusion_matrix(y, predicted, labels=[0, 1]).tolist(),
+    }
+
+
+def run_search(configs, splits, epochs, patience, workers):
+    """Menjalankan setiap konfigurasi di process pool (spawn: TensorFlow tidak aman di-fork)"""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(threads,)
+    ) as executor:
+        futures = [executor.submit(train_config, config, splits, epochs, patience) for config in configs]
+        return [future.result() for future in futures]
+
+
+def artifact_version(kecamatan=None):
+    region = "-".join(name.lower().replace(" ", "_") for name in kecamatan) if kecamatan else "semua"
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{region}"
+
+
+def save_artifacts(output_dir, model, scaler, metrics):
+    """Menyimpan model .h5, scaler, bundel bobot + tabel prediksi, dan metrics.json"""
+    from tabel_prediksi import build_table
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, os.path.basename(MODEL_PATH))
+    scaler_path = os.path.join(output_dir, os.path.basename(SCALER_PATH))
+    bundle_path = os.path.join(output_dir, os.path.basename(BUNDLE_PATH))
+
+    model.save(model_path)
+    with open(scaler_path, "wb") as file:
+        pickle.dump(scaler, file)
+    header = export_bundle(model_path, scaler_path, bundle_path)
+    build_table(bundle_path)
+
+    metrics["bundle_sha256"] = header["sha256"]
+    with open(os.path.join(output_dir, "metrics.json"), "w") as file:
+        json.dump(metrics, file, indent=2)
+    return model_path, scaler_path, bundle_path
+
+
+def promote(output_dir):
+    """Menjadikan artefak sebagai model aktif aplikasi (model, scaler, dan bundel)
+
+    Proses Streamlit, layanan, dan skor_massal yang sedang berjalan memetakan
+    ``model_bundle/weights.npy``, jadi tidak ada file yang ditimpa di tempat: setiap
+    file dipasang dengan os.replace. Varian float16/int8 yang ada diekspor ulang dan
+    bundel terkompilasi dibuat ulang dari model baru agar tidak tertinggal.
+    """
+    from kompilasi import compile_bundle
+    from kuantisasi import export_variant, holdout_data
+
+    replace_file(os.path.join(output_dir, os.path.basename(MODEL_PATH)), MODEL_PATH)
+    replace_file(os.path.join(output_dir, os.path.basename(SCALER_PATH)), SCALER_PATH)
+    staging = staging_path(BUNDLE_PATH)
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(os.path.join(output_dir, os.path.basename(BUNDLE_PATH)), staging)
+    replace_bundle(staging, BUNDLE_PATH)
+
+    refreshed = []
+    variants = [precision for precision in ("float16", "int8") if os.path.exists(default_bundle_path(precision))]
+    if variants:
+        try:
+            holdout = holdout_data()
+        except FileNotFoundError:
+            holdout = None
+        for precision in variants:
+            refreshed.append(export_variant(precision, holdout=holdout)[0])
+    if os.path.exists(default_bundle_path("float32", fused=True)):
+        # Jika pemeriksaan gagal, bundel lama dibiarkan dan tidak dipakai lagi karena hash sumbernya berbeda
+        if compile_bundle()["installed"]:
+            refreshed.append(default_bundle_path("float32", fused=True))
+    return refreshed
+
+
+def train(tahun=None, kecamatan=None, units=DEFAULT_UNITS, dropout=DEFAULT_DROPOUT,
+          batch_sizes=DEFAULT_BATCH_SIZES, epochs=100, patience=5, workers=None,
+          output_root=ARTIFACT_PATH):
+    """Pencarian hyperparameter, evaluasi model terbaik, dan penyimpanan artefak berversi"""
+    x, y = load_training_data(tahun=tahun, kecamatan=kecamatan)
+    if len(x) == 0:
+        raise ValueError("Tidak ada baris valid untuk dilatih")
+    splits, scaler = split_data(x, y)
+
+    configs = search_space(units, dropout, batch_sizes)
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    start = time.perf_counter()
+    results = run_search(configs, splits, epochs, patience, workers)
+    search_seconds = time.perf_counter() - start
+
+    best = min(results, key=lambda result: result["val_loss"])
+    model = build_model(len(FEATURE_COLUMNS), best["config"]["units"], best["config"]["dropout"])
+    model.set_weights(best["weights"])
+
+    version = artifact_version(kecamatan)
+    metrics = {
+        "version": version,
+        "data": {
+            "tahun": list(tahun) if tahun else None,
+            "kecamatan": list(kecamatan) if kecamatan else None,
+            "rows": {name: int(len(split[1])) for name, split in splits.items()},
+            "positive_rate": float(y.mean()),
+        },
+        "search": {
+            "epochs": epochs,
+            "patience": patience,
+            "workers": workers,
+            "seconds": search_seconds,
+            "results": [{k: v for k, v in result.items() if k != "weights"} for result in results],
+        },
+        "best": {k: v for k, v in best.items() if k != "weights"},
+        "test": evaluate(model, *splits["test"]),
+    }
+    output_dir = os.path.join(output_root, version)
+    save_artifacts(output_dir, model, scaler, metrics)
+    return output_dir, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pelatihan model LSTM risiko stunting")
+    parser.add_argument("--tahun", type=int, nargs="*", default=None, help="Tahun data latih (bawaan: semua)")
+    parser.add_argument("--kecamatan", nargs="*", default=None, help="Latih per wilayah (bawaan: semua)")
+    parser.add_argument("--units", nargs="+", default=DEFAULT_UNITS, help="Unit LSTM, mis. 64x32 32x16")
+    parser.add_argument("--dropout", nargs="+", default=DEFAULT_DROPOUT, help="Dropout, mis. 0.3x0.2")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=DEFAULT_BATCH_SIZES, help="Ukuran batch")
+    parser.add_argument("--epochs", type=int, default=100, help="Epoch maksimum")
+    parser.add_argument("--patience", type=int, default=5, help="Kesabaran EarlyStopping (val_loss)")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses (bawaan: jumlah core)")
+    parser.add_argument("--output", default=ARTIFACT_PATH, help="Folder artefak")
+    parser.add_argument("--promote", action="store_true", help="Jadikan model terbaik sebagai model aktif")
+    args = parser.parse_args()
+
+    output_dir, metrics = train(
+        tahun=args.tahun,
+        kecamatan=args.kecamatan,
+        units=args.units,
+        dropout=args.dropout,
+        batch_sizes=args.batch_size,
+        epochs=args.epochs,
+        patience=args.patience,
+        workers=args.workers,
+        output_root=args.output,
+    )
+    best, test = metrics["best"], metrics["test"]
+    print(f"Kombinasi dicoba : {len(metrics['search']['results'])} ({metrics['search']['seconds']:.1f} detik)")
+    print(f"Terbaik          : {best['config']} (val_loss {best['val_loss']:.4f}, epoch {best['best_epoch']})")
+    roc_auc = f"{test['roc_auc']:.4f}" if test["roc_auc"] is not None else "-"
+    print(f"Akurasi uji      : {test['accuracy']:.4f}, ROC-AUC {roc_auc}")
+    print(f"Artefak          : {output_dir}")
+    if args.promote:
+        refreshed = promote(output_dir)
+        print("Model aktif diperbarui.")
+        if refreshed:
+            print(f"Bundel turunan diperbarui: {', '.join(refreshed)}")
+
+
+if __name__ == "__main__":
+    main()
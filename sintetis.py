@@ -0,0 +1,224 @@
+"""Generator data sintetis berskema ``penelitian_bersih.xlsx`` untuk uji beban.
+
+Contoh:
+    python sintetis.py sintetis_1jt.parquet --rows 1000000
+    python sintetis.py sintetis_50jt.csv --rows 50000000 --chunk-size 1000000 --seed 7
+    python sintetis.py contoh.xlsx --rows 5000 --tahun 2023 2024
+
+Data dibangkitkan per potongan dan langsung ditulis ke file, sehingga memori tetap
+sebesar satu potongan berapa pun jumlah barisnya (XLSX dibatasi 1.048.575 baris
+oleh Excel). Isi dibuat menyerupai data lapangan:
+
+- 68 kelurahan di 6 kecamatan Kota Bogor dengan bobot populasi berbeda;
+  koordinat berkelompok di sekitar beberapa titik RW di dekat centroid kelurahan
+  (centroid bersifat perkiraan)
+- 11 indikator X/V saling berkorelasi melalui tahap keluarga (baduta/balita,
+  PUS/hamil), usia ibu (terlalu muda/tua eksklusif), dan tingkat kemiskinan
+  laten per keluarga dan kelurahan (air, jamban, KB)
+- ``risiko_stunting`` 0/1 dari model logistik atas indikator tersebut (~30% berisiko)
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from inferensi import FEATURE_COLUMNS
+from skor_massal import ResultWriter
+
+CHUNK_SIZE = 100_000
+DEFAULT_YEARS = (2023, 2024)
+
+# Perkiraan centroid kelurahan (lat, lon) per kecamatan
+KELURAHAN = {
+    "BOGOR BARAT": [
+        ("BALUMBANG JAYA", -6.5595, 106.7325), ("BUBULAK", -6.5680, 106.7570),
+        ("CILENDEK BARAT", -6.5760, 106.7700), ("CILENDEK TIMUR", -6.5770, 106.7800),
+        ("CURUG", -6.5530, 106.7530), ("CURUG MEKAR", -6.5600, 106.7640),
+        ("GUNUNG BATU", -6.5930, 106.7750), ("LOJI", -6.6010, 106.7680),
+        ("MARGAJAYA", -6.5640, 106.7430), ("MENTENG", -6.5850, 106.7810),
+        ("PASIR JAYA", -6.6050, 106.7600), ("PASIR KUDA", -6.6040, 106.7770),
+        ("PASIR MULYA", -6.5960, 106.7860), ("SEMPLAK", -6.5480, 106.7570),
+        ("SINDANG BARANG", -6.5780, 106.7530), ("SITU GEDE", -6.5550, 106.7390),
+    ],
+    "BOGOR SELATAN": [
+        ("BATUTULIS", -6.6150, 106.8020), ("BOJONGKERTA", -6.6530, 106.8150),
+        ("BONDONGAN", -6.6130, 106.7940), ("CIKARET", -6.6220, 106.7870),
+        ("CIPAKU", -6.6280, 106.8050), ("EMPANG", -6.6080, 106.7940),
+        ("GENTENG", -6.6650, 106.8120), ("HARJASARI", -6.6480, 106.8300),
+        ("KERTAMAYA", -6.6580, 106.8250), ("LAWANG GINTUNG", -6.6110, 106.8070),
+        ("MUARASARI", -6.6450, 106.7930), ("MULYAHARJA", -6.6400, 106.7800),
+        ("PAKUAN", -6.6230, 106.8160), ("PAMOYANAN", -6.6330, 106.7880),
+        ("RANCAMAYA", -6.6600, 106.8200), ("RANGGA MEKAR", -6.6330, 106.7990),
+    ],
+    "BOGOR TENGAH": [
+        ("BABAKAN", -6.5880, 106.8030), ("BABAKAN PASAR", -6.6030, 106.8000),
+        ("CIBOGOR", -6.5930, 106.7910), ("CIWARINGIN", -6.5860, 106.7900),
+        ("GUDANG", -6.6030, 106.7980), ("KEBON KELAPA", -6.5990, 106.7920),
+        ("PABATON", -6.5900, 106.7970), ("PALEDANG", -6.6000, 106.7930),
+        ("PANARAGAN", -6.5920, 106.7880), ("SEMPUR", -6.5880, 106.8000),
+        ("TEGALLEGA", -6.5800, 106.8080),
+    ],
+    "BOGOR TIMUR": [
+        ("BARANANGSIANG", -6.6010, 106.8110), ("KATULAMPA", -6.6150, 106.8350),
+        ("SINDANGRASA", -6.6170, 106.8270), ("SINDANGSARI", -6.6250, 106.8320),
+        ("SUKASARI", -6.6110, 106.8110), ("TAJUR", -6.6300, 106.8250),
+    ],
+    "BOGOR UTARA": [
+        ("BANTARJATI", -6.5740, 106.8120), ("CIBULUH", -6.5620, 106.8120),
+        ("CILUAR", -6.5420, 106.8250), ("CIMAHPAR", -6.5560, 106.8310),
+        ("CIPARIGI", -6.5500, 106.8170), ("KEDUNG HALANG", -6.5450, 106.8050),
+        ("TANAH BARU", -6.5700, 106.8250), ("TEGAL GUNDIL", -6.5730, 106.8030),
+    ],
+    "TANAH SAREAL": [
+        ("CIBADAK", -6.5440, 106.7670), ("KAYUMANIS", -6.5310, 106.7830),
+        ("KEBON PEDES", -6.5720, 106.7910), ("KEDUNG BADAK", -6.5610, 106.7870),
+        ("KEDUNG JAYA", -6.5550, 106.7930), ("KEDUNG WARINGIN", -6.5640, 106.7960),
+        ("KENCANA", -6.5300, 106.7930), ("MEKARWANGI", -6.5480, 106.7780),
+        ("SUKADAMAI", -6.5590, 106.7790), ("SUKARESMI", -6.5680, 106.7870),
+        ("TANAH SAREAL", -6.5650, 106.7850),
+    ],
+}
+
+# Titik RW per kelurahan dan sebaran (derajat) titik RW serta rumah di sekitarnya
+CLUSTERS_PER_KELURAHAN = 6
+CLUSTER_SPREAD = 0.004
+HOUSEHOLD_SPREAD = 0.0012
+
+# Bobot logit risiko stunting per indikator (ditambah kemiskinan laten)
+RISK_INTERCEPT = -2.1
+RISK_WEIGHTS = {
+    "baduta": 0.9,
+    "balita": 0.5,
+    "pus": 0.1,
+    "pus_hamil": 0.6,
+    "sumber_air_layak_tidak": 0.8,
+    "jamban_layak_tidak": 0.8,
+    "terlalu_muda": 0.9,
+    "terlalu_tua": 0.5,
+    "terlalu_dekat": 0.6,
+    "terlalu_banyak": 0.5,
+    "bukan_peserta_kb_modern": 0.4,
+}
+RISK_POVERTY_WEIGHT = 0.4
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class Region:
+    """Atribut tetap per kelurahan: nama, bobot populasi, kemiskinan, dan titik RW"""
+
+    def __init__(self, seed=0):
+        rng = np.random.default_rng([seed, 0])
+        rows = [(kec, kel, lat, lon) for kec, places in KELURAHAN.items() for kel, lat, lon in places]
+        self.kecamatan = np.array([row[0] for row in rows], dtype=object)
+        self.kelurahan = np.array([row[1] for row in rows], dtype=object)
+        centroids = np.array([row[2:] for row in rows])
+
+        self.weights = rng.dirichlet(np.full(len(rows), 4.0))
+        self.poverty = rng.normal(0.0, 0.6, len(rows))
+        self.clusters = centroids[:, np.newaxis, :] + rng.normal(
+            0.0, CLUSTER_SPREAD, (len(rows), CLUSTERS_PER_KELURAHAN, 2)
+        )
+
+
+def generate_chunk(rng, region, n_rows, years=DEFAULT_YEARS):
+    """Satu potongan data mentah (kolom dan nilai X/V seperti file sumber)"""
+    place = rng.choice(len(region.weights), size=n_rows, p=region.weights)
+    poverty = region.poverty[place] + rng.normal(0.0, 1.0, n_rows)
+
+    def chance(p):
+        return rng.random(n_rows) < p
+
+    # Usia ibu: terlalu muda dan terlalu tua saling eksklusif
+    age = rng.random(n_rows)
+    terlalu_muda = age < 0.08
+    terlalu_tua = age > 0.86
+
+    baduta = chance(0.25)
+    balita = chance(np.where(baduta, 0.55, 0.30))
+    pus = chance(np.where(terlalu_tua, 0.55, 0.80))
+    pus_hamil = pus & chance(np.where(terlalu_muda, 0.25, 0.12))
+    terlalu_dekat = chance(0.06 + 0.12 * (baduta & balita) + 0.05 * pus_hamil)
+    terlalu_banyak = chance(0.07 + 0.15 * terlalu_tua + 0.05 * (poverty > 1.0))
+    bukan_kb = pus & chance(_sigmoid(-0.8 + 0.5 * poverty))
+    air = chance(_sigmoid(-2.0 + 1.0 * poverty))
+    jamban = chance(_sigmoid(-2.4 + 1.0 * poverty + 1.2 * air))
+
+    indicators = {
+        "baduta": baduta,
+        "balita": balita,
+        "pus": pus,
+        "pus_hamil": pus_hamil,
+        "sumber_air_layak_tidak": air,
+        "jamban_layak_tidak": jamban,
+        "terlalu_muda": terlalu_muda,
+        "terlalu_tua": terlalu_tua,
+        "terlalu_dekat": terlalu_dekat,
+        "terlalu_banyak": terlalu_banyak,
+        "bukan_peserta_kb_modern": bukan_kb,
+    }
+    logit = RISK_INTERCEPT + RISK_POVERTY_WEIGHT * poverty
+    for name, values in indicators.items():
+        logit = logit + RISK_WEIGHTS[name] * values
+    risk = chance(_sigmoid(logit))
+
+    cluster = rng.integers(0, CLUSTERS_PER_KELURAHAN, n_rows)
+    center = region.clusters[place, cluster]
+    coords = center + rng.normal(0.0, HOUSEHOLD_SPREAD, (n_rows, 2))
+
+    frame = {"namakecamatan": region.kecamatan[place], "namakelurahan": region.kelurahan[place]}
+    for name in FEATURE_COLUMNS:
+        frame[name] = np.where(indicators[name], "V", "X").astype(object)
+    frame["risiko_stunting"] = risk.astype(np.int64)
+    frame["Tahun"] = rng.choice(np.asarray(years, dtype=np.int64), size=n_rows)
+    frame["lat"] = coords[:, 0]
+    frame["lon"] = coords[:, 1]
+    return pd.DataFrame(frame)
+
+
+def generate(n_rows, chunk_size=CHUNK_SIZE, seed=0, years=DEFAULT_YEARS):
+    """Iterator potongan DataFrame sintetis; hasil sama untuk seed dan chunk_size yang sama"""
+    region = Region(seed)
+    for index, start in enumerate(range(0, n_rows, chunk_size)):
+        rng = np.random.default_rng([seed, 1, index])
+        yield generate_chunk(rng, region, min(chunk_size, n_rows - start), years)
+
+
+def synthetic_frame(n_rows, seed=0, years=DEFAULT_YEARS):
+    """Seluruh data sintetis sebagai satu DataFrame (untuk ukuran yang muat di memori)"""
+    return pd.concat(generate(n_rows, chunk_size=max(n_rows, 1), seed=seed, years=years), ignore_index=True)
+
+
+def write_dataset(path, n_rows, chunk_size=CHUNK_SIZE, seed=0, years=DEFAULT_YEARS):
+    """Menulis data sintetis per potongan ke XLSX, CSV, atau Parquet"""
+    writer = ResultWriter(path)
+    written = 0
+    try:
+        for chunk in generate(n_rows, chunk_size, seed, years):
+            writer.write(chunk)
+            written += len(chunk)
+    finally:
+        writer.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator data sintetis penelitian stunting")
+    parser.add_argument("output", help="File keluaran (.xlsx, .csv, atau .parquet)")
+    parser.add_argument("--rows", type=int, required=True, help="Jumlah baris")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Jumlah baris per potongan")
+    parser.add_argument("--seed", type=int, default=0, help="Seed acak")
+    parser.add_argument("--tahun", type=int, nargs="+", default=list(DEFAULT_YEARS), help="Tahun gelombang survei")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = write_dataset(args.output, args.rows, args.chunk_size, args.seed, args.tahun)
+    seconds = time.perf_counter() - start
+    print(f"{written:,} baris ditulis ke '{args.output}' dalam {seconds:.1f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""CLI skoring massal tanpa Streamlit untuk dataset berukuran besar.
+
+Contoh:
+    python skor_massal.py penelitian_bersih.xlsx hasil.parquet
+    python skor_massal.py ekstrak_provinsi.csv hasil.csv --chunk-size 50000 --workers 8
+
+Input dibaca per potongan, setiap potongan diskor di process pool (transformasi
+scaler dan Stacked LSTM dari bundel model), lalu hasilnya langsung ditulis ke
+CSV/Parquet sehingga memori tetap terbatas berapa pun ukuran input.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from bobot import BUNDLE_PATH, active_bundle_path
+from skoring import CHUNK_SIZE, LABEL_INVALID, LABEL_RISK, read_family_file, score_frame
+from tabel_prediksi import TablePredictor, load_predictor
+
+_predictor = None
+_explain = False
+
+
+def _init_worker(bundle_path, use_table, explain=False):
+    """Setiap worker membuka bundel model sekali (bobot di-mmap, berbagi page cache)"""
+    global _predictor, _explain
+    predictor = load_predictor(bundle_path)
+    if not use_table:
+        predictor = TablePredictor(predictor.bundle)
+    _predictor = predictor
+    _explain = explain
+
+
+def _score_chunk(chunk):
+    return score_frame(chunk, _predictor, explain=_explain)
+
+
+# Batas baris satu sheet Excel (dikurangi satu baris header)
+XLSX_MAX_ROWS = 1_048_575
+
+
+class ResultWriter:
+    """Menulis potongan hasil secara bertahap ke CSV, Parquet, atau XLSX"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.lower().endswith(".parquet")
+        self.xlsx = path.lower().endswith(".xlsx")
+        self._writer = None
+        self._first = True
+        self._rows = 0
+
+    def write(self, result):
+        if self.xlsx:
+            self._write_xlsx(result)
+        elif self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(result, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            result.to_csv(self.path, mode="w" if self._first else "a", index=False, header=self._first)
+        self._first = False
+
+    def _write_xlsx(self, result):
+        # Mode write-only openpyxl menulis baris langsung ke file tanpa menyimpan worksheet
+        if self._rows + len(result) > XLSX_MAX_ROWS:
+            raise ValueError(f"XLSX maksimal {XLSX_MAX_ROWS:,} baris; gunakan .csv atau .parquet")
+        if self._writer is None:
+            from openpyxl import Workbook
+
+            self._writer = Workbook(write_only=True)
+            self._sheet = self._writer.create_sheet()
+            self._sheet.append([str(col) for col in result.columns])
+        for row in result.itertuples(index=False):
+            self._sheet.append([None if pd.isna(value) else value for value in row])
+        self._rows += len(result)
+
+    def close(self):
+        if self._writer is None:
+            return
+        if self.xlsx:
+            self._writer.save(self.path)
+        else:
+            self._writer.close()
+
+
+def run(input_path, output_path, chunk_size=CHUNK_SIZE, workers=None,
+        bundle_path=BUNDLE_PATH, use_table=True, explain=False):
+    """Menskor seluruh file input dan mengembalikan ringkasan hasil"""
+    workers = workers or os.cpu_count() or 1
+    # Batasi jumlah potongan yang sedang diproses agar memori tetap terbatas
+    max_pending = workers * 2
+
+    bundle_path = active_bundle_path(bundle_path)
+    summary = {"rows": 0, "risk": 0, "invalid": 0}
+    writer = ResultWriter(output_path)
+    start = time.perf_counter()
+
+    def collect(future):
+        result = future.result()
+        writer.write(result)
+        summary["rows"] += len(result)
+        summary["risk"] += int((result["hasil"] == LABEL_RISK).sum())
+        summary["invalid"] += int((result["hasil"] == LABEL_INVALID).sum())
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(bundle_path, use_table, explain),
+        ) as executor:
+            pending = []
+            for chunk in read_family_file(input_path, input_path, chunk_size):
+                pending.append(executor.submit(_score_chunk, chunk))
+                # Hasil ditulis sesuai urutan input
+                while len(pending) >= max_pending:
+                    collect(pending.pop(0))
+            for future in pending:
+                collect(future)
+    finally:
+        writer.close()
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["rows_per_second"] = summary["rows"] / summary["seconds"] if summary["seconds"] else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skoring massal risiko stunting")
+    parser.add_argument("input", help="File input CSV/XLSX dengan 11 kolom indikator")
+    parser.add_argument("output", help="File hasil (.csv, .parquet, atau .xlsx)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Jumlah baris per potongan")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses (bawaan: jumlah core)")
+    parser.add_argument("--bundle", default=BUNDLE_PATH, help="Folder bundel model")
+    parser.add_argument("--no-table", action="store_true", help="Selalu hitung dengan model, tanpa tabel prediksi")
+    parser.add_argument("--explain", action="store_true", help="Tambahkan kolom kontribusi_faktor (oklusi)")
+    args = parser.parse_args()
+
+    try:
+        summary = run(
+            args.input,
+            args.output,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            bundle_path=args.bundle,
+            use_table=not args.no_table,
+            explain=args.explain,
+        )
+    except ValueError as error:
+        raise SystemExit(f"GAGAL: {error}")
+    print(f"Baris diproses   : {summary['rows']:,}")
+    print(f"Berisiko         : {summary['risk']:,}")
+    print(f"Data tidak valid : {summary['invalid']:,}")
+    print(f"Waktu            : {summary['seconds']:.2f} detik")
+    print(f"Kecepatan        : {summary['rows_per_second']:,.0f} baris/detik")
+
+
+if __name__ == "__main__":
+    main()
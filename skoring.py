@@ -0,0 +1,206 @@
+"""Skoring massal keluarga dari file CSV/XLSX secara tervektorisasi.
+
+Dipakai oleh mode unggah file di ``pages/Klasifikasi.py``. Setiap potongan (chunk)
+data divalidasi per kolom, dikodekan ke 0/1, lalu diskor dengan satu panggilan
+``predict_proba`` tanpa perulangan per baris.
+
+Kontribusi faktor dihitung dengan oklusi: setiap baris digandakan menjadi 12
+varian (asli + 11 varian dengan satu indikator dimatikan) dan seluruh N x 12
+baris diskor dalam satu panggilan prediksi.
+"""
+import numpy as np
+
+from inferensi import FEATURE_COLUMNS
+from tabel_prediksi import all_binary_inputs, encode
+
+CHUNK_SIZE = 10_000
+THRESHOLD = 0.5
+
+LABEL_RISK = "Berisiko"
+LABEL_NO_RISK = "Tidak Berisiko"
+LABEL_INVALID = "Data Tidak Valid"
+
+# Faktor risiko yang ditampilkan ke pengguna
+FACTOR_MAPPING = {
+    "baduta": "Ada anak usia 0-24 bulan",
+    "balita": "Ada anak usia 0-59 bulan",
+    "sumber_air_layak_tidak": "Air minum tidak layak",
+    "jamban_layak_tidak": "Jamban tidak layak",
+    "terlalu_muda": "Ibu hamil di usia < 20 tahun",
+    "terlalu_tua": "Ibu hamil di usia > 35 tahun",
+    "terlalu_dekat": "Jarak kelahiran < 2 tahun",
+    "terlalu_banyak": "Jumlah anak lebih dari 4",
+    "bukan_peserta_kb_modern": "Tidak menggunakan KB modern",
+}
+
+
+def missing_columns(df):
+    """Daftar kolom indikator yang tidak ada pada DataFrame"""
+    return [col for col in FEATURE_COLUMNS if col not in df.columns]
+
+
+def encode_features(df):
+    """Mengodekan 11 kolom indikator menjadi matriks 0/1 dan penanda baris valid"""
+    from dataset import encode_indicator
+
+    missing = missing_columns(df)
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+    encoded = np.empty((len(df), len(FEATURE_COLUMNS)), dtype=np.float32)
+    for index, col in enumerate(FEATURE_COLUMNS):
+        values = encode_indicator(df[col])
+        encoded[:, index] = values.to_numpy(dtype=np.float32, na_value=np.nan)
+
+    valid = ~np.isnan(encoded).any(axis=1)
+    return encoded, valid
+
+
+def _factor_lookup():
+    """Teks faktor risiko untuk setiap kode 11-bit (2048 entri)"""
+    patterns = all_binary_inputs(len(FEATURE_COLUMNS)).astype(bool)
+    labels = np.array([FACTOR_MAPPING.get(col, "") for col in FEATURE_COLUMNS], dtype=object)
+    texts = []
+    for pattern in patterns:
+        active = [label for label in labels[pattern] if label]
+        texts.append("; ".join(active))
+    return np.array(texts, dtype=object)
+
+
+FACTOR_LOOKUP = _factor_lookup()
+
+
+def factor_contributions(rows, predictor):
+    """Probabilitas dan kontribusi tiap indikator, dalam satu panggilan prediksi
+
+    Kontribusi = probabilitas asli - probabilitas saat indikator itu diset 0;
+    indikator yang sudah 0 berkontribusi 0. Mengembalikan (N,) dan (N, fitur).
+    """
+    rows = np.asarray(rows, dtype=np.float32)
+    n_rows, n_features = rows.shape
+    variants = np.repeat(rows[:, np.newaxis, :], n_features + 1, axis=1)
+    features = np.arange(n_features)
+    variants[:, features + 1, features] = 0
+
+    scores = np.asarray(predictor.predict_proba(variants.reshape(-1, n_features)), dtype=np.float32)
+    scores = scores.reshape(n_rows, n_features + 1)
+    probabilities = scores[:, 0]
+    contributions = np.where(rows == 1, probabilities[:, np.newaxis] - scores[:, 1:], 0).astype(np.float32)
+    return probabilities, contributions
+
+
+def ranked_factors(row, contributions):
+    """[(teks faktor, kontribusi)] untuk faktor aktif, kontribusi terbesar lebih dulu"""
+    order = np.argsort(-np.asarray(contributions), kind="stable")
+    return [
+        (FACTOR_MAPPING[FEATURE_COLUMNS[index]], float(contributions[index]))
+        for index in order
+        if row[index] == 1 and FEATURE_COLUMNS[index] in FACTOR_MAPPING
+    ]
+
+
+def format_contribution(text, contribution):
+    return f"{text} ({contribution * 100:+.1f} poin)"
+
+
+def describe_contributions(rows, contributions):
+    """Teks faktor aktif beserta kontribusinya per baris, terurut dari yang terbesar"""
+    return np.array([
+        "; ".join(format_contribution(text, value) for text, value in ranked_factors(row, values))
+        for row, values in zip(rows, contributions)
+    ], dtype=object)
+
+
+def score_frame(df, predictor, explain=False):
+    """Menskor satu DataFrame dengan satu panggilan prediksi untuk semua baris valid
+
+    Dengan ``explain=True`` ditambahkan kolom ``kontribusi_faktor`` (oklusi N x 12
+    baris, tetap satu panggilan prediksi).
+    """
+    encoded, valid = encode_features(df)
+
+    probabilities = np.full(len(df), np.nan, dtype=np.float32)
+    factors = np.full(len(df), "", dtype=object)
+    contributions = np.full(len(df), "", dtype=object)
+    if valid.any():
+        rows = encoded[valid]
+        if explain:
+            probabilities[valid], values = factor_contributions(rows, predictor)
+            contributions[valid] = describe_contributions(rows, values)
+        else:
+            probabilities[valid] = predictor.predict_proba(rows)
+        factors[valid] = FACTOR_LOOKUP[encode(rows)]
+
+    labels = np.where(probabilities >= THRESHOLD, LABEL_RISK, LABEL_NO_RISK).astype(object)
+    labels[~valid] = LABEL_INVALID
+
+    result = df.copy()
+    result["probabilitas"] = probabilities
+    result["hasil"] = labels
+    result["faktor_risiko"] = factors
+    if explain:
+        result["kontribusi_faktor"] = contributions
+    return result
+
+
+def read_family_file(source, name, chunk_size=CHUNK_SIZE):
+    """Membaca file CSV/XLSX sebagai potongan DataFrame berukuran chunk_size"""
+    import pandas as pd
+
+    from dataset import normalize_columns
+
+    if str(name).lower().endswith(".xlsx"):
+        for chunk in _read_xlsx_chunks(source, chunk_size):
+            yield normalize_columns(chunk)
+    elif str(name).lower().endswith(".xls"):
+        # Format .xls lama tidak bisa dibaca bertahap, jadi dipotong setelah dibaca
+        df = pd.read_excel(source)
+        for start in range(0, len(df), chunk_size):
+            yield normalize_columns(df.iloc[start:start + chunk_size])
+    else:
+        for chunk in pd.read_csv(source, chunksize=chunk_size, dtype=str):
+            yield normalize_columns(chunk)
+
+
+def _read_xlsx_chunks(source, chunk_size):
+    """Membaca lembar aktif XLSX baris demi baris (openpyxl ``read_only``) dalam potongan ``chunk_size``
+
+    Seperti ``pd.read_excel``, baris kosong di akhir lembar diabaikan.
+    """
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [f"Unnamed: {i}" if col is None else col for i, col in enumerate(header)]
+        width = len(columns)
+
+        batch = []
+        empty_rows = 0
+        for row in rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if all(value is None for value in row):
+                empty_rows += 1
+                continue
+            # Baris kosong di tengah data tetap diteruskan (akan ditandai tidak valid)
+            batch.extend([(None,) * width] * empty_rows)
+            empty_rows = 0
+            batch.append(row)
+            while len(batch) >= chunk_size:
+                yield pd.DataFrame.from_records(batch[:chunk_size], columns=columns)
+                batch = batch[chunk_size:]
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def score_chunks(chunks, predictor, explain=False):
+    """Menskor setiap potongan data secara berurutan"""
+    for chunk in chunks:
+        yield score_frame(chunk, predictor, explain=explain)
+
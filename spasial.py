@@ -0,0 +1,289 @@
+"""Agregasi spasial titik rumah tangga ke dalam grid persegi.
+
+Menampilkan setiap titik ``lat``/``lon`` di Folium tidak sanggup lebih dari beberapa
+ribu titik. Sebagai gantinya, titik dikelompokkan di server ke sel grid pada
+beberapa resolusi (sesuai level zoom peta). Untuk setiap resolusi disimpan tabel
+jarang (sel x kecamatan x kelurahan x tahun) berisi jumlah Berisiko/Tidak
+Berisiko, sehingga filter cukup menyaring tabel kecil ini lalu menjumlahkan per
+sel. Browser hanya menerima sel yang tidak kosong, bukan titik mentah.
+
+Peta hanya meminta isi viewport yang sedang terlihat (batas dari ``st_folium``).
+Tabel sel diurutkan per baris grid sehingga potongan viewport didapat dengan
+``searchsorted``; ``PointIndex`` menyimpan titik rumah tangga terurut per ember
+grid untuk drill-down pada zoom tinggi. Keduanya dibatasi ``MAX_CELLS`` dan
+``MAX_POINTS``, jadi ukuran payload tidak bergantung pada besar dataset.
+"""
+import numpy as np
+import pandas as pd
+
+from kubus import category_codes, label_positions
+
+# (zoom minimum, ukuran sel dalam derajat); ~1,1 km hingga ~140 m di ekuator
+GRID_LEVELS = [
+    (0, 0.01),
+    (13, 0.005),
+    (14, 0.0025),
+    (15, 0.00125),
+]
+
+# Batas level of detail per viewport
+MAX_CELLS = 1000
+MAX_POINTS = 2000
+# Titik rumah tangga hanya ditampilkan mulai zoom ini
+POINT_MIN_ZOOM = 16
+# Ukuran ember indeks titik (derajat) dan batas kandidat yang diperiksa per query
+POINT_BUCKET = 0.0025
+MAX_CANDIDATES = 50 * MAX_POINTS
+
+RISK_HIGH = "Berisiko"
+RISK_LOW = "Tidak Berisiko"
+
+
+def grid_window(bounds, origin, size):
+    """Rentang (baris, kolom) grid yang beririsan dengan ``bounds`` ((selatan, barat), (utara, timur))"""
+    (south, west), (north, east) = bounds
+    row0, row1 = (int(np.floor((value - origin[0]) / size)) for value in (south, north))
+    col0, col1 = (int(np.floor((value - origin[1]) / size)) for value in (west, east))
+    return row0, row1, col0, col1
+
+
+def filter_mask(codes, labels, kecamatan=None, kelurahan=None, tahun=None, tahun_range=None):
+    """Mask baris yang lolos filter; ``codes`` dan ``labels`` berurutan (kecamatan, kelurahan, tahun)"""
+    mask = np.ones(len(codes[0]), dtype=bool)
+    for column_codes, column_labels, value, value_range in zip(
+        codes, labels, (kecamatan, kelurahan, tahun), (None, None, tahun_range)
+    ):
+        positions = label_positions(value, column_labels, value_range)
+        if positions is not None:
+            mask &= np.isin(column_codes, positions)
+    return mask
+
+
+def frame_codes(df):
+    """Koordinat, kode wilayah/tahun, dan status risiko baris yang memiliki koordinat"""
+    lat = df["lat"].to_numpy(dtype=np.float64)
+    lon = df["lon"].to_numpy(dtype=np.float64)
+    has_geo = ~(np.isnan(lat) | np.isnan(lon))
+
+    kec_codes, kecamatan = category_codes(df["namakecamatan"])
+    kel_codes, kelurahan = category_codes(df["namakelurahan"])
+    if "tahun" in df.columns:
+        year_codes, tahun = category_codes(df["tahun"])
+    else:
+        year_codes, tahun = np.zeros(len(df), dtype=np.int64), []
+    risk = df["risiko_stunting"].astype(str).to_numpy()
+    high = (risk == RISK_HIGH)[has_geo]
+    low = (risk == RISK_LOW)[has_geo]
+
+    codes = (kec_codes[has_geo], kel_codes[has_geo], year_codes[has_geo])
+    return lat[has_geo], lon[has_geo], codes, (kecamatan, kelurahan, tahun), high, low
+
+
+class GridLevel:
+    """Tabel sel tidak kosong untuk satu ukuran sel"""
+
+    def __init__(self, min_zoom, size, table):
+        self.min_zoom = min_zoom
+        self.size = size
+        self.table = table
+
+
+class DensityGrid:
+    """Grid kepadatan rumah tangga yang dihitung sekali saat data dimuat"""
+
+    def __init__(self, levels, origin, kecamatan, kelurahan, tahun):
+        self.levels = levels
+        self.origin = origin
+        self.kecamatan = kecamatan
+        self.kelurahan = kelurahan
+        self.tahun = tahun
+
+    @classmethod
+    def from_frame(cls, df, grid_levels=GRID_LEVELS):
+        """Membangun grid dari DataFrame hasil ``dataset.load_research_dataset``"""
+        lat, lon, codes, labels, high, low = frame_codes(df)
+        kec_codes, kel_codes, year_codes = codes
+        kecamatan, kelurahan, tahun = labels
+        origin = (float(np.floor(lat.min())), float(np.floor(lon.min()))) if len(lat) else (0.0, 0.0)
+
+        # Dimensi kunci gabungan (+1 untuk slot nilai kosong)
+        group_shape = (len(kecamatan) + 1, len(kelurahan) + 1, len(tahun) + 1)
+        group = np.ravel_multi_index((kec_codes, kel_codes, year_codes), group_shape)
+
+        levels = []
+        for min_zoom, size in grid_levels:
+            row = np.floor((lat - origin[0]) / size).astype(np.int64)
+            col = np.floor((lon - origin[1]) / size).astype(np.int64)
+            n_cols = int(col.max()) + 1 if len(col) else 1
+            cell = row * n_cols + col
+
+            # Kunci unik (sel, kecamatan, kelurahan, tahun) dan jumlah per status;
+            # hasil np.unique terurut sehingga tabel terurut per baris lalu kolom grid
+            key = cell * int(np.prod(group_shape)) + group
+            unique, inverse = np.unique(key, return_inverse=True)
+            cell_of_key, group_of_key = np.divmod(unique, int(np.prod(group_shape)))
+            kec, kel, year = np.unravel_index(group_of_key, group_shape)
+            table = pd.DataFrame({
+                "row": (cell_of_key // n_cols).astype(np.int32),
+                "col": (cell_of_key % n_cols).astype(np.int32),
+                "kec": kec.astype(np.int32),
+                "kel": kel.astype(np.int32),
+                "tahun": year.astype(np.int32),
+                RISK_HIGH: np.bincount(inverse, weights=high, minlength=len(unique)).astype(np.int64),
+                RISK_LOW: np.bincount(inverse, weights=low, minlength=len(unique)).astype(np.int64),
+            })
+            levels.append(GridLevel(min_zoom, size, table))
+        return cls(levels, origin, kecamatan, kelurahan, tahun)
+
+    def level_index(self, zoom):
+        """Indeks level terhalus yang berlaku pada ``zoom``"""
+        index = 0
+        for i, level in enumerate(self.levels):
+            if zoom >= level.min_zoom:
+                index = i
+        return index
+
+    def cells(self, level, kecamatan=None, kelurahan=None, tahun=None, tahun_range=None, bounds=None):
+        """Sel tidak kosong untuk satu level dan filter; None berarti 'Semua' (atau seluruh peta)"""
+        table = level.table
+        if bounds is not None:
+            row0, row1, col0, col1 = grid_window(bounds, self.origin, level.size)
+            start, stop = np.searchsorted(table["row"].to_numpy(), [row0, row1 + 1])
+            table = table.iloc[start:stop]
+            col = table["col"].to_numpy()
+            table = table[(col >= col0) & (col <= col1)]
+
+        codes = tuple(table[column].to_numpy() for column in ("kec", "kel", "tahun"))
+        mask = filter_mask(
+            codes, (self.kecamatan, self.kelurahan, self.tahun),
+            kecamatan=kecamatan, kelurahan=kelurahan, tahun=tahun, tahun_range=tahun_range,
+        )
+
+        counts = table.loc[mask].groupby(["row", "col"], sort=False)[[RISK_HIGH, RISK_LOW]].sum()
+        counts = counts[(counts[RISK_HIGH] + counts[RISK_LOW]) > 0].reset_index()
+        counts["lat_min"] = self.origin[0] + counts["row"] * level.size
+        counts["lon_min"] = self.origin[1] + counts["col"] * level.size
+        counts["total"] = counts[RISK_HIGH] + counts[RISK_LOW]
+        return counts[["lat_min", "lon_min", RISK_HIGH, RISK_LOW, "total"]]
+
+    def viewport_cells(self, bounds, zoom, max_cells=MAX_CELLS, **filters):
+        """(level, sel) di dalam viewport: level terhalus untuk ``zoom`` yang tidak melebihi ``max_cells``
+
+        Jika level terkasar pun melebihi batas, hanya ``max_cells`` sel terpadat yang dikembalikan.
+        """
+        for level in reversed(self.levels[:self.level_index(zoom) + 1]):
+            cells = self.cells(level, bounds=bounds, **filters)
+            if len(cells) <= max_cells:
+                return level, cells
+        return level, cells.nlargest(max_cells, "total")
+
+    def geojson(self, level, cells=None, **filters):
+        """Sel tidak kosong sebagai FeatureCollection poligon persegi"""
+        if cells is None:
+            cells = self.cells(level, **filters)
+        size = level.size
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [[
+                        [lon, lat], [lon + size, lat], [lon + size, lat + size],
+                        [lon, lat + size], [lon, lat],
+                    ]],
+                },
+                "properties": {"berisiko": int(high), "tidak_berisiko": int(low)},
+            }
+            for lat, lon, high, low in zip(
+                cells["lat_min"], cells["lon_min"], cells[RISK_HIGH], cells[RISK_LOW]
+            )
+        ]
+        return {"type": "FeatureCollection", "features": features}
+
+
+class PointIndex:
+    """Indeks grid terkemas: titik rumah tangga terurut per ember ``size`` derajat
+
+    Titik di satu baris ember bersebelahan di memori, jadi isi sebuah kotak cukup
+    dicari dengan satu ``searchsorted`` per baris ember yang terlihat.
+    """
+
+    def __init__(self, size, origin, shape, keys, lat, lon, codes, labels, high):
+        self.size = size
+        self.origin = origin
+        self.shape = shape      # (jumlah baris, jumlah kolom) ember
+        self.keys = keys        # nomor ember tiap titik, terurut
+        self.lat = lat
+        self.lon = lon
+        self.codes = codes      # (kecamatan, kelurahan, tahun)
+        self.labels = labels
+        self.high = high
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_frame(cls, df, size=POINT_BUCKET):
+        """Membangun indeks dari DataFrame; baris tanpa koordinat atau status diabaikan"""
+        lat, lon, codes, labels, high, low = frame_codes(df)
+        known = high | low
+        lat, lon, high = lat[known], lon[known], high[known]
+        codes = tuple(column[known] for column in codes)
+
+        origin = (float(np.floor(lat.min())), float(np.floor(lon.min()))) if len(lat) else (0.0, 0.0)
+        row = np.floor((lat - origin[0]) / size).astype(np.int64)
+        col = np.floor((lon - origin[1]) / size).astype(np.int64)
+        shape = (int(row.max()) + 1, int(col.max()) + 1) if len(lat) else (1, 1)
+        keys = row * shape[1] + col
+        order = np.argsort(keys, kind="stable")
+        return cls(
+            size, origin, shape, keys[order],
+            lat[order].astype(np.float32), lon[order].astype(np.float32),
+            tuple(column[order].astype(np.int32) for column in codes), labels, high[order],
+        )
+
+    def bucket_ranges(self, bounds):
+        """(awal, panjang) potongan titik per baris ember yang beririsan dengan ``bounds``"""
+        if bounds is None:
+            return np.array([0]), np.array([len(self)])
+        row0, row1, col0, col1 = grid_window(bounds, self.origin, self.size)
+        row0, col0 = max(row0, 0), max(col0, 0)
+        row1, col1 = min(row1, self.shape[0] - 1), min(col1, self.shape[1] - 1)
+        if row0 > row1 or col0 > col1:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        rows = np.arange(row0, row1 + 1) * self.shape[1]
+        starts = np.searchsorted(self.keys, rows + col0)
+        lengths = np.searchsorted(self.keys, rows + col1, side="right") - starts
+        return starts, lengths
+
+    def candidates(self, bounds):
+        """Posisi titik di ember yang beririsan dengan ``bounds`` (None berarti semua)"""
+        starts, lengths = self.bucket_ranges(bounds)
+        # Gabungan rentang [awal, awal + panjang) tanpa loop Python
+        offsets = np.cumsum(lengths) - lengths
+        return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+    def query(self, bounds, limit=MAX_POINTS, max_candidates=MAX_CANDIDATES, **filters):
+        """Titik di dalam ``bounds`` yang lolos filter, atau None jika lebih dari ``limit``"""
+        # Viewport terlalu padat: tidak perlu memeriksa titik satu per satu
+        if self.bucket_ranges(bounds)[1].sum() > max_candidates:
+            return None
+        positions = self.candidates(bounds)
+        mask = filter_mask(tuple(column[positions] for column in self.codes), self.labels, **filters)
+        if bounds is not None:
+            (south, west), (north, east) = bounds
+            lat, lon = self.lat[positions], self.lon[positions]
+            mask &= (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        positions = positions[mask]
+        if len(positions) > limit:
+            return None
+
+        kecamatan, kelurahan, _ = self.labels
+        return pd.DataFrame({
+            "lat": self.lat[positions],
+            "lon": self.lon[positions],
+            "berisiko": self.high[positions],
+            "namakecamatan": np.asarray(kecamatan + [""], dtype=object)[self.codes[0][positions]],
+            "namakelurahan": np.asarray(kelurahan + [""], dtype=object)[self.codes[1][positions]],
+        })
@@ -0,0 +1,154 @@
+"""Tabel prediksi lengkap untuk seluruh 2^11 kombinasi input biner.
+
+Semua fitur pada form ``family_risk_assessment`` bernilai Ya/Tidak, sehingga ruang
+input model hanya 2048 pola bit. Tabel ini menyimpan probabilitas setiap pola,
+diberi kunci kode 11-bit (fitur pertama = bit paling signifikan) dan hash bundel
+model. Prediksi tunggal maupun massal cukup berupa indeks array; jika tabel tidak
+cocok dengan bundel atau input bukan biner, prediksi dialihkan ke model.
+"""
+import argparse
+import hashlib
+import json
+import os
+import warnings
+
+import numpy as np
+
+from bobot import BUNDLE_PATH, load_bundle
+
+TABLE_FILE = "prediction_table.npy"
+TABLE_HEADER_FILE = "prediction_table.json"
+TOLERANCE = 1e-6
+
+
+def all_binary_inputs(n_features):
+    """Seluruh 2^n kombinasi input biner, baris ke-i memiliki kode i"""
+    codes = np.arange(2 ** n_features, dtype=np.int64)
+    shifts = np.arange(n_features - 1, -1, -1, dtype=np.int64)
+    return ((codes[:, np.newaxis] >> shifts) & 1).astype(np.float32)
+
+
+def encode(x):
+    """Mengubah baris input biner (N, fitur) menjadi kode bit (N,)"""
+    x = np.asarray(x)
+    weights = 1 << np.arange(x.shape[1] - 1, -1, -1, dtype=np.int64)
+    return x.astype(np.int64) @ weights
+
+
+def score_with_model(bundle, x):
+    """Probabilitas dari model NumPy untuk input mentah (belum diskalakan)"""
+    return bundle.to_model().predict_proba(bundle.transform(x))
+
+
+def build_table(bundle_path=BUNDLE_PATH):
+    """Menghitung dan menyimpan tabel prediksi untuk bundel model"""
+    bundle = load_bundle(bundle_path)
+    n_features = len(bundle.features)
+    table = score_with_model(bundle, all_binary_inputs(n_features)).astype(np.float32)
+
+    header = {
+        "bundle_sha256": bundle.sha256,
+        "features": bundle.features,
+        "size": int(table.size),
+        "sha256": hashlib.sha256(table.tobytes()).hexdigest(),
+    }
+    np.save(os.path.join(bundle_path, TABLE_FILE), table)
+    with open(os.path.join(bundle_path, TABLE_HEADER_FILE), "w") as file:
+        json.dump(header, file, indent=2)
+    return header
+
+
+def load_table(bundle):
+    """Membuka tabel prediksi milik bundel; None jika tidak ada atau kedaluwarsa"""
+    header_path = os.path.join(bundle.path, TABLE_HEADER_FILE)
+    if not os.path.exists(header_path):
+        return None
+
+    with open(header_path) as file:
+        header = json.load(file)
+    if header.get("bundle_sha256") != bundle.sha256 or header.get("features") != bundle.features:
+        warnings.warn("Tabel prediksi tidak sesuai dengan bundel model, memakai model langsung")
+        return None
+    return np.load(os.path.join(bundle.path, TABLE_FILE), mmap_mode="r")
+
+
+class TablePredictor:
+    """Prediktor yang memakai tabel untuk input biner dan model sebagai cadangan"""
+
+    def __init__(self, bundle, table=None):
+        self.bundle = bundle
+        self.table = table
+        self._model = None
+
+    @property
+    def features(self):
+        return self.bundle.features
+
+    @property
+    def model(self):
+        # Model hanya dibangun jika benar-benar dibutuhkan
+        if self._model is None:
+            self._model = self.bundle.to_model()
+        return self._model
+
+    def _score_model(self, x):
+        return self.model.predict_proba(self.bundle.transform(x))
+
+    def predict_proba(self, x):
+        """Probabilitas risiko untuk input mentah 0/1 berbentuk (N, fitur)"""
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if self.table is None:
+            return self._score_model(x)
+
+        binary = np.all((x == 0) | (x == 1), axis=1)
+        if binary.all():
+            return np.asarray(self.table[encode(x)])
+
+        result = np.empty(len(x), dtype=np.float32)
+        result[binary] = self.table[encode(x[binary])]
+        result[~binary] = self._score_model(x[~binary])
+        return result
+
+
+def load_predictor(bundle_path=BUNDLE_PATH):
+    """Memuat prediktor berbasis tabel untuk bundel model"""
+    bundle = load_bundle(bundle_path)
+    return TablePredictor(bundle, load_table(bundle))
+
+
+def verify_table(bundle_path=BUNDLE_PATH, use_keras=False):
+    """Membandingkan tabel tersimpan dengan model yang sedang dipakai"""
+    bundle = load_bundle(bundle_path)
+    table = load_table(bundle)
+    if table is None:
+        raise ValueError("Tabel prediksi tidak ditemukan atau kedaluwarsa")
+
+    inputs = all_binary_inputs(len(bundle.features))
+    if use_keras:
+        import tensorflow as tf
+        from inferensi import MODEL_PATH
+
+        keras_model = tf.keras.models.load_model(MODEL_PATH)
+        scaled = bundle.transform(inputs)
+        reference = keras_model.predict(scaled.reshape(len(inputs), 1, -1), verbose=0)[:, 0]
+    else:
+        reference = score_with_model(bundle, inputs)
+    return float(np.max(np.abs(np.asarray(table) - reference)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bangun tabel prediksi 2048 kombinasi input")
+    parser.add_argument("--bundle", default=BUNDLE_PATH, help="Folder bundel model")
+    parser.add_argument("--keras", action="store_true", help="Verifikasi terhadap model Keras")
+    args = parser.parse_args()
+
+    header = build_table(args.bundle)
+    print(f"Tabel {header['size']} entri disimpan untuk bundel {header['bundle_sha256'][:12]}")
+
+    max_diff = verify_table(args.bundle, use_keras=args.keras)
+    print(f"Selisih maksimum terhadap model: {max_diff:.3e} (toleransi {TOLERANCE:.0e})")
+    if max_diff > TOLERANCE:
+        raise SystemExit("GAGAL: tabel prediksi tidak sesuai dengan model")
+    print("OK: tabel prediksi sesuai dengan model")
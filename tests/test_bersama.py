@@ -0,0 +1,42 @@
+import numpy as np
+
+import bersama
+import dataset
+import sintetis
+from partisi import ingest
+
+
+def attach_current(shared_path):
+    return bersama.SharedDataset.attach(bersama.current_segment(shared_path=shared_path))
+
+
+def test_publish_rebuilds_only_changed_years(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sintetis.write_dataset("awal.csv", 3000, seed=0, years=(2022, 2023, 2024))
+    ingest("awal.csv")
+    bersama.publish(shared_path="inkremental")
+
+    sintetis.write_dataset("gelombang.csv", 700, seed=1, years=(2024,))
+    ingest("gelombang.csv", mode="append")
+
+    loaded = []
+    load_research_dataset = dataset.load_research_dataset
+
+    def spy(*args, **kwargs):
+        loaded.append(kwargs.get("tahun"))
+        return load_research_dataset(*args, **kwargs)
+
+    monkeypatch.setattr(dataset, "load_research_dataset", spy)
+    bersama.publish(shared_path="inkremental")
+    monkeypatch.setattr(dataset, "load_research_dataset", load_research_dataset)
+    assert loaded == [[2024]]
+
+    bersama.publish(shared_path="penuh")
+    incremental, full = attach_current("inkremental"), attach_current("penuh")
+    assert incremental.version == full.version
+    assert incremental.meta["years"] == full.meta["years"]
+    assert incremental.df.equals(full.df)
+    assert (incremental.df.dtypes == full.df.dtypes).all()
+    for column in incremental.df.select_dtypes("category").columns:
+        assert list(incremental.df[column].cat.categories) == list(full.df[column].cat.categories)
+    np.testing.assert_array_equal(incremental.bad_rows, full.bad_rows)
@@ -0,0 +1,58 @@
+"""Kesetaraan inferensi NumPy (``inferensi.StackedLSTM``) dengan model Keras acuan"""
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from inferensi import MODEL_PATH, StackedLSTM
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOLERANCE = 1e-6
+MODEL_FILE = os.path.join(ROOT, MODEL_PATH)
+
+# Keluaran acuan model_lstm_stunting.h5 (diverifikasi terhadap Keras, selisih < 1e-7)
+REFERENCE_INPUTS = np.array([
+    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1],
+    [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0],
+    [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    [1, 1, 0, 0, 1, 0, 1, 0, 0, 1, 1],
+], dtype=np.float32)
+REFERENCE_OUTPUTS = np.array([
+    0.0015237398, 0.9947557449, 0.0124614267, 0.9992104769, 0.9995954633, 0.988358736,
+])
+
+
+def all_inputs(n_features):
+    """Semua 2^n kombinasi input biner ditambah 1000 input acak di rentang [0, 1]"""
+    binary_inputs = np.array(list(itertools.product([0, 1], repeat=n_features)), dtype=np.float32)
+    random_inputs = np.random.default_rng(42).random((1000, n_features), dtype=np.float32)
+    return np.vstack([binary_inputs, random_inputs])
+
+
+def test_predict_proba_matches_reference_output():
+    model = StackedLSTM.from_h5(MODEL_FILE)
+    np.testing.assert_allclose(model.predict_proba(REFERENCE_INPUTS), REFERENCE_OUTPUTS, atol=TOLERANCE)
+
+
+def test_predict_proba_accepts_single_row_and_sequence():
+    model = StackedLSTM.from_h5(MODEL_FILE)
+    expected = model.predict_proba(REFERENCE_INPUTS)
+    np.testing.assert_array_equal(model.predict_proba(REFERENCE_INPUTS[0]), expected[:1])
+    np.testing.assert_array_equal(model.predict_proba(REFERENCE_INPUTS[:, np.newaxis, :]), expected)
+    with pytest.raises(ValueError):
+        model.predict_proba(REFERENCE_INPUTS[:, :5])
+
+
+def test_numpy_model_matches_keras():
+    tf = pytest.importorskip("tensorflow")
+
+    keras_model = tf.keras.models.load_model(MODEL_FILE)
+    numpy_model = StackedLSTM.from_h5(MODEL_FILE)
+    inputs = all_inputs(numpy_model.n_features)
+
+    keras_result = keras_model.predict(inputs.reshape(-1, 1, numpy_model.n_features), verbose=0)[:, 0]
+    numpy_result = numpy_model.predict_proba(inputs)
+    assert float(np.max(np.abs(keras_result - numpy_result))) <= TOLERANCE
@@ -0,0 +1,78 @@
+"""Bundel terkompilasi (scaler terlipat) harus setara dengan bundel sumbernya"""
+import json
+import os
+
+import numpy as np
+
+import kompilasi
+from bobot import BUNDLE_PATH, HEADER_FILE, bundle_arrays, load_bundle, staging_path, write_bundle
+from kompilasi import compile_bundle
+from tabel_prediksi import TOLERANCE, all_binary_inputs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(ROOT, BUNDLE_PATH)
+
+
+def max_diff(source_path, fused_path):
+    """Selisih maksimum predict_proba kedua bundel pada seluruh 2^11 pola input biner"""
+    source = load_bundle(source_path)
+    fused = load_bundle(fused_path)
+    inputs = all_binary_inputs(len(source.features))
+    reference = source.to_model().predict_proba(source.transform(inputs))
+    return float(np.max(np.abs(reference - fused.to_model().predict_proba(fused.transform(inputs)))))
+
+
+def random_scaler_source(path, seed=0):
+    """Salinan model_bundle dengan scaler acak non-identitas"""
+    source = load_bundle(SOURCE_PATH)
+    rng = np.random.default_rng(seed)
+    arrays = dict(bundle_arrays(source))
+    arrays["scaler/scale"] = rng.uniform(0.2, 3.0, len(source.features)).astype(np.float32)
+    arrays["scaler/min"] = rng.uniform(-1.0, 1.0, len(source.features)).astype(np.float32)
+    write_bundle(list(arrays.items()), path, source.features)
+    return path
+
+
+def test_fused_bundle_matches_source(tmp_path):
+    fused_path = str(tmp_path / "fused")
+    report = compile_bundle(SOURCE_PATH, fused_path)
+
+    assert report["installed"]
+    fused = load_bundle(fused_path)
+    assert fused.fused
+    assert fused.header["source_sha256"] == load_bundle(SOURCE_PATH).sha256
+    assert max_diff(SOURCE_PATH, fused_path) <= TOLERANCE
+
+
+def test_fused_bundle_matches_source_with_random_scaler(tmp_path):
+    source_path = random_scaler_source(str(tmp_path / "source"))
+    fused_path = str(tmp_path / "fused")
+    report = compile_bundle(source_path, fused_path)
+
+    assert report["installed"]
+    assert report["random_scaler_max_abs_diff"] <= TOLERANCE
+    assert max_diff(source_path, fused_path) <= TOLERANCE
+
+
+def test_compile_bundle_refuses_to_install_when_tolerance_exceeded(tmp_path, monkeypatch):
+    fused_path = str(tmp_path / "fused")
+    assert compile_bundle(SOURCE_PATH, fused_path)["installed"]
+    with open(os.path.join(fused_path, HEADER_FILE)) as file:
+        installed_header = json.load(file)
+
+    # Lipatan yang salah: bias layer pertama bergeser
+    fuse_arrays = kompilasi.fuse_arrays
+
+    def broken_fuse(arrays):
+        arrays = dict(fuse_arrays(arrays))
+        arrays["lstm/bias"] = arrays["lstm/bias"] + np.float32(0.5)
+        return list(arrays.items())
+
+    monkeypatch.setattr(kompilasi, "fuse_arrays", broken_fuse)
+    report = compile_bundle(SOURCE_PATH, fused_path)
+
+    assert not report["installed"]
+    assert report["max_abs_diff"] > TOLERANCE
+    with open(os.path.join(fused_path, HEADER_FILE)) as file:
+        assert json.load(file) == installed_header
+    assert not os.path.exists(staging_path(fused_path))
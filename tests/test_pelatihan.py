@@ -0,0 +1,50 @@
+"""Promosi model tidak boleh menimpa bundel yang sedang dipetakan proses lain"""
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from bobot import BUNDLE_PATH, SCALER_PATH, bundle_arrays, load_bundle, staging_path, write_bundle
+from inferensi import MODEL_PATH
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_promote_keeps_open_bundle_readable(tmp_path, monkeypatch):
+    pelatihan = pytest.importorskip("pelatihan")
+
+    for name in (MODEL_PATH, SCALER_PATH):
+        shutil.copyfile(os.path.join(ROOT, name), tmp_path / name)
+    shutil.copytree(os.path.join(ROOT, BUNDLE_PATH), tmp_path / BUNDLE_PATH)
+    monkeypatch.chdir(tmp_path)
+
+    # Bundel lama dibuka (mmap) seperti oleh aplikasi yang sedang berjalan
+    old = load_bundle(BUNDLE_PATH)
+    old_arrays = bundle_arrays(old)
+    inputs = np.random.default_rng(0).integers(0, 2, (64, len(old.features))).astype(np.float32)
+    old_result = old.to_model().predict_proba(old.transform(inputs))
+
+    # Artefak baru dengan bobot berbeda
+    output_dir = tmp_path / "artefak"
+    output_dir.mkdir()
+    for name in (MODEL_PATH, SCALER_PATH):
+        shutil.copyfile(tmp_path / name, output_dir / name)
+    new_arrays = [(name, array * 0.5) for name, array in old_arrays]
+    write_bundle(new_arrays, str(output_dir / BUNDLE_PATH), old.features)
+
+    assert pelatihan.promote(str(output_dir)) == []
+
+    # Handle lama tetap membaca bobot lama yang utuh
+    assert old.verify()
+    for name, array in old_arrays:
+        np.testing.assert_array_equal(old[name], array)
+    np.testing.assert_array_equal(old.to_model().predict_proba(old.transform(inputs)), old_result)
+
+    # Pembukaan baru melihat bundel hasil promosi
+    new = load_bundle(BUNDLE_PATH)
+    assert new.verify()
+    assert new.sha256 != old.sha256
+    for name, array in new_arrays:
+        np.testing.assert_array_equal(new[name], array)
+    assert not os.path.exists(staging_path(BUNDLE_PATH))